@@ -2,31 +2,227 @@
 
 # Database connection and session management
 
-from sqlalchemy import create_engine
+import threading
+from typing import Optional
+
+from pymongo import WriteConcern, monitoring
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
 import motor.motor_asyncio
 from decouple import config
 
 # SQLAlchemy (Relational DB) Configuration
-DATABASE_URL = config("DATABASE_URL", default="sqlite:///./trading.db")
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+DATABASE_URL = config("DATABASE_URL", default="sqlite+aiosqlite:///./trading.db")
+SQL_POOL_SIZE = config("SQL_POOL_SIZE", default=5, cast=int)  # Connections kept open
+SQL_MAX_OVERFLOW = config("SQL_MAX_OVERFLOW", default=10, cast=int)  # Extra connections under load
+SQL_POOL_TIMEOUT = config("SQL_POOL_TIMEOUT", default=30, cast=float)  # Seconds to wait for a connection
+SQL_POOL_RECYCLE = config("SQL_POOL_RECYCLE", default=1800, cast=int)  # Seconds before a connection is replaced
+SQLITE_BUSY_TIMEOUT = config("SQLITE_BUSY_TIMEOUT", default=5000, cast=int)  # Milliseconds to wait on a locked database
+
+# Async drivers for URLs configured with the default (sync) driver
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg", "mysql": "mysql+aiomysql"}
+
+
+def async_database_url(url: str):
+    """
+    The database URL with an async driver (e.g. `sqlite:///` becomes `sqlite+aiosqlite:///`).
+    """
+    url = make_url(url)
+    if url.drivername in ASYNC_DRIVERS:
+        url = url.set(drivername=ASYNC_DRIVERS[url.drivername])
+    return url
+
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def _engine_options(url) -> dict:
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # An in-memory database only exists on its single connection
+        return {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}}
+    options = {
+        "pool_size": SQL_POOL_SIZE,
+        "max_overflow": SQL_MAX_OVERFLOW,
+        "pool_timeout": SQL_POOL_TIMEOUT,
+        "pool_recycle": SQL_POOL_RECYCLE,
+    }
+    if url.get_backend_name() == "sqlite":
+        # aiosqlite defaults to opening a connection (and a thread) per checkout
+        options["poolclass"] = AsyncAdaptedQueuePool
+    else:
+        options["pool_pre_ping"] = True
+    return options
+
+
+_url = async_database_url(DATABASE_URL)
+engine = create_async_engine(_url, **_engine_options(_url))
+
+if _url.get_backend_name() == "sqlite":
+    @event.listens_for(engine.sync_engine, "connect")
+    def _configure_sqlite(dbapi_connection, connection_record):
+        # WAL lets readers proceed while a write is in progress; NORMAL sync is safe with WAL
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
 Base = declarative_base()
 
 # MongoDB (NoSQL) Configuration
 MONGO_URI = config("MONGO_URI", default="mongodb://localhost:27017")
-MONGO_DB_NAME = config("MONGO_DB_NAME", default="trading_platform")
+MONGO_DB_NAME = config("MONGO_DB_NAME", default="trading_db")
+MONGO_MAX_POOL_SIZE = config("MONGO_MAX_POOL_SIZE", default=100, cast=int)  # Connections per server
+MONGO_MIN_POOL_SIZE = config("MONGO_MIN_POOL_SIZE", default=5, cast=int)  # Connections kept warm
+MONGO_MAX_IDLE_TIME_MS = config("MONGO_MAX_IDLE_TIME_MS", default=60000, cast=int)  # Idle connections closed after this
+MONGO_CONNECT_TIMEOUT_MS = config("MONGO_CONNECT_TIMEOUT_MS", default=5000, cast=int)
+MONGO_SERVER_SELECTION_TIMEOUT_MS = config("MONGO_SERVER_SELECTION_TIMEOUT_MS", default=5000, cast=int)
+MONGO_SOCKET_TIMEOUT_MS = config("MONGO_SOCKET_TIMEOUT_MS", default=20000, cast=int)  # Per operation on a socket
+MONGO_WAIT_QUEUE_TIMEOUT_MS = config("MONGO_WAIT_QUEUE_TIMEOUT_MS", default=2000, cast=int)  # Wait for a free connection
+MONGO_TICK_WRITE_W = config("MONGO_TICK_WRITE_W", default=1, cast=int)  # Acknowledgements for tick writes
+MONGO_LEDGER_WTIMEOUT_MS = config("MONGO_LEDGER_WTIMEOUT_MS", default=5000, cast=int)
+
+# Write concerns per workload: ticks are high-volume and replayable (the tick writer retries failed
+# batches), so a primary acknowledgement without journaling is enough; balances and orders must
+# survive a failover, so they wait for a journaled write on a majority of the replica set.
+WRITE_CONCERNS = {
+    "ticks": WriteConcern(w=MONGO_TICK_WRITE_W, j=False),
+    "ledger": WriteConcern(w="majority", j=True, wtimeout=MONGO_LEDGER_WTIMEOUT_MS),
+}
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Connection pool usage counters, fed by the driver's pool events.
+    The driver publishes events from its own threads, hence the lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats = {
+            "connections_open": 0,
+            "connections_in_use": 0,
+            "connections_created": 0,
+            "checkouts": 0,
+            "checkout_failures": 0,
+            "checkout_wait_seconds": 0.0,
+            "max_checkout_wait_seconds": 0.0,
+            "pool_clears": 0,
+        }
+
+    def _add(self, **increments):
+        with self._lock:
+            for name, amount in increments.items():
+                self.stats[name] += amount
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.stats)
+
+    def connection_created(self, event):
+        self._add(connections_open=1, connections_created=1)
+
+    def connection_closed(self, event):
+        self._add(connections_open=-1)
+
+    def connection_checked_out(self, event):
+        wait = getattr(event, "duration", 0.0) or 0.0
+        with self._lock:
+            self.stats["connections_in_use"] += 1
+            self.stats["checkouts"] += 1
+            self.stats["checkout_wait_seconds"] += wait
+            self.stats["max_checkout_wait_seconds"] = max(self.stats["max_checkout_wait_seconds"], wait)
+
+    def connection_checked_in(self, event):
+        self._add(connections_in_use=-1)
+
+    def connection_check_out_failed(self, event):
+        self._add(checkout_failures=1)
+
+    def pool_cleared(self, event):
+        self._add(pool_clears=1)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+
+mongo_pool_metrics = PoolMetrics()
+client: Optional[motor.motor_asyncio.AsyncIOMotorClient] = None  # Set by `connect_mongo`
+
+
+def connect_mongo() -> motor.motor_asyncio.AsyncIOMotorDatabase:
+    """
+    The application database on the process-wide Mongo client, creating the client on first use.
+    Call `close_mongo` when the app shuts down.
+    """
+    global client
+    if client is None:
+        client = motor.motor_asyncio.AsyncIOMotorClient(
+            MONGO_URI,
+            maxPoolSize=MONGO_MAX_POOL_SIZE,
+            minPoolSize=MONGO_MIN_POOL_SIZE,
+            maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+            connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+            serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+            waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            event_listeners=[mongo_pool_metrics],
+        )
+    return client[MONGO_DB_NAME]
+
+
+def close_mongo():
+    global client
+    if client is not None:
+        client.close()
+        client = None
+
+
+def mongo_pool_stats() -> dict:
+    """
+    Pool usage counters plus the configured pool limits.
+    """
+    return {**mongo_pool_metrics.snapshot(), "max_pool_size": MONGO_MAX_POOL_SIZE, "min_pool_size": MONGO_MIN_POOL_SIZE}
+
+
+def with_write_concern(collection, workload: str):
+    """
+    A handle on `collection` that writes with the write concern of a workload ("ticks" or "ledger").
+    """
+    return collection.with_options(write_concern=WRITE_CONCERNS[workload])
+
+
+def _create_missing_indexes(connection):
+    # `create_all` skips the indexes of tables that already exist
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
 
-client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_URI)
-database = client[MONGO_DB_NAME]
+async def init_sql_models():
+    """
+    Create the relational tables and indexes that do not exist yet.
+    """
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.run_sync(_create_missing_indexes)
 
 
 # Dependency to get the SQLAlchemy DB session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -4,8 +4,7 @@ from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 
-# Mock database or user retrieval for the sake of demonstration
-from app.models import MongoUser  # Update with your actual user model import
+from app.services.repository import get_repository
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -35,9 +34,9 @@ async def get_current_user_id(token: str = Depends(oauth2_scheme)):
         raise credentials_exception
 
     # Fetch user from database (optional: validate if user exists)
-    user = await MongoUser.get(user_id)
+    user = await get_repository().get_user(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     # Return the user ID
-    return str(user.id)
+    return user.id
@@ -1,10 +1,11 @@
 # trading_platform_backend/app/models.py
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from beanie import Document, PydanticObjectId
 from pydantic import Field
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -49,6 +50,26 @@ class Order(Base):
     payout = Column(Float, nullable=True)  # Payout for the order (if won)
     user = relationship("User")
 
+    __table_args__ = (
+        # Same shapes as the MongoOrder indexes
+        Index("ix_orders_user_status", "user_id", "status"),  # Pending-order counts, per-user stats
+        Index("ix_orders_status_start_time", "status", "start_time"),  # Pending orders: exposure, active users
+    )
+
+
+class PriceTick(Base):
+    __tablename__ = "price_ticks"
+
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String, nullable=False)
+    timestamp = Column(DateTime, nullable=False)  # UTC time the tick was received
+    price = Column(Float, nullable=False)
+
+    __table_args__ = (
+        # Per-symbol history ranges; id orders ticks within the same timestamp
+        Index("ix_price_ticks_symbol_timestamp", "symbol", "timestamp", "id"),
+    )
+
 
 # MongoDB Models (NoSQL Database)
 
@@ -58,9 +79,13 @@ class MongoUser(Document):
     hashed_password: str
     balance: float = 0.0
     is_active: bool = True
+    pending_credits: List[PydanticObjectId] = Field(default_factory=list)  # Payouts being credited
 
     class Settings:
         collection = "users"
+        indexes = [
+            IndexModel([("username", ASCENDING)], unique=True),  # Existing duplicates: scripts/dedupe_usernames.py
+        ]
 
 
 class MongoTradingPair(Document):
@@ -69,6 +94,9 @@ class MongoTradingPair(Document):
 
     class Settings:
         collection = "trading_pairs"
+        indexes = [
+            IndexModel([("symbol", ASCENDING)], unique=True),
+        ]
 
 
 class MongoOrder(Document):
@@ -81,6 +109,52 @@ class MongoOrder(Document):
     locked_price: float  # Price at the time the order was placed
     status: str = 'pending'  # Status: 'pending', 'win', 'lose'
     payout: Optional[float] = None   # Payout for the order (if won)
+    credited: Optional[bool] = None  # False until a won payout is credited to the user's balance
 
     class Settings:
         collection = "orders"
+        indexes = [
+            IndexModel([("user_id", ASCENDING), ("status", ASCENDING)]),  # Pending-order counts, status filters
+            IndexModel([("user_id", ASCENDING), ("start_time", DESCENDING), ("_id", DESCENDING)]),  # Per-user history pages
+            IndexModel([("status", ASCENDING), ("start_time", ASCENDING)]),  # Pending orders by age
+            IndexModel([("start_time", DESCENDING)]),  # Recent orders across all users
+        ]
+
+
+class MongoUserStats(Document):
+    """
+    Per-user order counters, updated incrementally on placement and settlement
+    (see app/services/stats_service.py) so stats queries never scan the orders collection.
+    """
+    user_id: PydanticObjectId
+    username: Optional[str] = None
+    email: Optional[str] = None
+    orders: int = 0  # Orders placed
+    wins: int = 0  # Orders settled as 'win'
+    losses: int = 0  # Orders settled as 'lose'
+    total_staked: float = 0.0  # Sum of order amounts
+    total_paid_out: float = 0.0  # Sum of payouts credited back to the user
+
+    class Settings:
+        collection = "user_stats"
+        indexes = [
+            IndexModel([("user_id", ASCENDING)], unique=True),
+            IndexModel([("wins", DESCENDING)]),
+            IndexModel([("losses", ASCENDING)]),
+        ]
+
+
+class MongoPriceTick(Document):
+    """
+    One recorded price tick, written in batches from the live feeds (see app/services/tick_store.py).
+    """
+    symbol: str
+    timestamp: datetime  # UTC time the tick was received
+    price: float
+
+    class Settings:
+        collection = "price_ticks"
+        indexes = [
+            # Per-symbol history ranges; _id orders ticks within the same millisecond
+            IndexModel([("symbol", ASCENDING), ("timestamp", ASCENDING), ("_id", ASCENDING)]),
+        ]
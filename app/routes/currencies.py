@@ -3,52 +3,53 @@
 # Routes for handling currencies
 
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal, get_db
 from app.models import TradingPair
 from app.schemas import TradingPairResponse, TradingPairCreate
-from app.utils import fetch_real_time_prices, update_or_create_trading_pair
+from app.services.sql_store import upsert_trading_pairs
+from app.utils import fetch_http_prices, latest_prices
 
 router = APIRouter()
 
 @router.get("/trading_pairs", response_model=list[TradingPairResponse])
-def get_all_trading_pairs(db: Session = Depends(get_db)):
+async def get_all_trading_pairs(db: AsyncSession = Depends(get_db)):
     """
     Get all trading pairs with their current prices.
     """
-    trading_pairs = db.query(TradingPair).all()
+    trading_pairs = (await db.execute(select(TradingPair))).scalars().all()
     if not trading_pairs:
         raise HTTPException(status_code=404, detail="No trading pairs found.")
     return trading_pairs
 
 
 @router.post("/trading_pairs", response_model=TradingPairResponse)
-def create_or_update_trading_pair(pair: TradingPairCreate, db: Session = Depends(get_db)):
+async def create_or_update_trading_pair(pair: TradingPairCreate, db: AsyncSession = Depends(get_db)):
     """
     Create a new trading pair or update an existing one manually (admin functionality).
     """
     symbol = pair.symbol.upper()
-    price = pair.price
 
-    trading_pair = db.query(TradingPair).filter(TradingPair.symbol == symbol).first()
+    await upsert_trading_pairs(db, {symbol: pair.price})
+    await db.commit()
+    return (await db.execute(select(TradingPair).where(TradingPair.symbol == symbol))).scalar_one()
 
-    if trading_pair:
-        trading_pair.price = price
-        db.commit()
-        db.refresh(trading_pair)
-        return trading_pair
-    else:
-        trading_pair = TradingPair(symbol=symbol, price=price)
-        db.add(trading_pair)
-        db.commit()
-        db.refresh(trading_pair)
-        return trading_pair
+
+async def refresh_trading_pairs():
+    """
+    Fetch prices once over HTTP and write every known latest price to the trading pairs table.
+    """
+    await fetch_http_prices()
+    async with AsyncSessionLocal() as db:
+        await upsert_trading_pairs(db, dict(latest_prices))
+        await db.commit()
 
 
 @router.post("/update_prices")
-def update_prices(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+async def update_prices(background_tasks: BackgroundTasks):
     """
     Trigger a background task to update the prices of all trading pairs (manual trigger).
     """
-    background_tasks.add_task(fetch_real_time_prices, db)
+    background_tasks.add_task(refresh_trading_pairs)
     return {"message": "Price update initiated in the background."}
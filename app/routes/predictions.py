@@ -2,41 +2,61 @@
 
 # API route for prediction logic
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database import get_db
+from fastapi import APIRouter, HTTPException
 from app.services.prediction_service import (
-    forecast_prices_arima_sqlalchemy,
-    forecast_prices_arima_mongo,
-    predict_price_lstm_sqlalchemy,
-    predict_price_lstm_mongo
+    forecast_prices_arima,
+    predict_price_lstm,
+    predict_batch,
+    prediction_cache
 )
-from app.models import TradingPair, MongoTradingPair
+from app.schemas import BatchPredictionRequest, BatchPredictionResponse
+from app.services.arima_forecaster import arima_forecasters
+from app.services.features import feature_tracker
+from app.services.inference_service import InferenceError, InferenceTimeout
+from app.services.repository import get_repository
 
 router = APIRouter()
 
 
-# ARIMA predictions using SQLAlchemy data
-@router.get("/predict/sqlalchemy/arima/{symbol}", response_model=dict)
-def predict_price_sqlalchemy_arima(symbol: str, db: Session = Depends(get_db)):
-    """
-    Predict the next price for a given trading pair using ARIMA and SQLAlchemy data.
-    """
-    # Fetch historical prices from SQLAlchemy
-    trading_pairs = db.query(TradingPair).filter(TradingPair.symbol == symbol).all()
+async def _predict_arima(symbol: str, source: str) -> dict:
+    # Only a symbol without a fitted model needs its history; check that it exists
+    if arima_forecasters[source].needs_history(symbol):
+        if await get_repository(source).get_price(symbol) is None:
+            raise HTTPException(status_code=404, detail="Trading pair not found")
 
-    if not trading_pairs:
-        raise HTTPException(status_code=404, detail="Trading pair not found")
+    try:
+        # Use the ARIMA model to predict the next price
+        predicted_price = await forecast_prices_arima(symbol, source)
+        return {"symbol": symbol, "predicted_price": predicted_price}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except InferenceTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except InferenceError as e:
+        # Queue full, or the worker crashed or the pool was recycled mid-job
+        raise HTTPException(status_code=503, detail=str(e))
 
-    # Extract historical prices
-    historical_prices = [pair.price for pair in trading_pairs]
 
+async def _predict_lstm(symbol: str, source: str) -> dict:
     try:
-        # Use the ARIMA model to predict the next price
-        predicted_price = forecast_prices_arima_sqlalchemy(historical_prices)
+        predicted_price = await predict_price_lstm(symbol, source)
         return {"symbol": symbol, "predicted_price": predicted_price}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except InferenceTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except InferenceError as e:
+        # Queue full, or the worker crashed or the pool was recycled mid-job
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+# ARIMA predictions using SQLAlchemy data
+@router.get("/predict/sqlalchemy/arima/{symbol}", response_model=dict)
+async def predict_price_sqlalchemy_arima(symbol: str):
+    """
+    Predict the next price for a given trading pair using ARIMA and SQLAlchemy data.
+    """
+    return await _predict_arima(symbol, "sqlalchemy")
 
 
 # ARIMA predictions using MongoDB data
@@ -45,21 +65,7 @@ async def predict_price_mongo_arima(symbol: str):
     """
     Predict the next price for a given trading pair using ARIMA and MongoDB data.
     """
-    # Fetch historical prices from MongoDB
-    trading_pairs = await MongoTradingPair.find(MongoTradingPair.symbol == symbol).to_list(length=100)
-
-    if not trading_pairs:
-        raise HTTPException(status_code=404, detail="Trading pair not found")
-
-    # Extract historical prices
-    historical_prices = [pair.price for pair in trading_pairs]
-
-    try:
-        # Use the ARIMA model to predict the next price
-        predicted_price = await forecast_prices_arima_mongo(symbol)
-        return {"symbol": symbol, "predicted_price": predicted_price}
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    return await _predict_arima(symbol, "mongo")
 
 
 # LSTM predictions using SQLAlchemy data
@@ -68,11 +74,7 @@ async def predict_price_sqlalchemy_lstm(symbol: str):
     """
     Predict the next price for a given trading pair using LSTM and SQLAlchemy data.
     """
-    try:
-        predicted_price = await predict_price_lstm_sqlalchemy(symbol)
-        return {"symbol": symbol, "predicted_price": predicted_price}
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    return await _predict_lstm(symbol, "sqlalchemy")
 
 
 # LSTM predictions using MongoDB data
@@ -81,8 +83,37 @@ async def predict_price_mongo_lstm(symbol: str):
     """
     Predict the next price for a given trading pair using LSTM and MongoDB data.
     """
-    try:
-        predicted_price = await predict_price_lstm_mongo(symbol)
-        return {"symbol": symbol, "predicted_price": predicted_price}
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    return await _predict_lstm(symbol, "mongo")
+
+
+# Several symbols and models in one request
+@router.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_prices_batch(request: BatchPredictionRequest):
+    """
+    Predict the next price for several trading pairs with several models in one request.
+    A forecast that fails (e.g. not enough data, no trained model yet) is reported in its own
+    entry's `error` instead of failing the whole batch.
+    """
+    predictions = await predict_batch(request.symbols, request.models, request.source)
+    return {"predictions": predictions}
+
+
+# Live model-input features
+@router.get("/features/{symbol}", response_model=dict)
+async def get_symbol_features(symbol: str):
+    """
+    Latest log return, rolling volatility and EMAs for a trading pair, maintained from live ticks.
+    """
+    features = feature_tracker.update(symbol)
+    if features is None:
+        raise HTTPException(status_code=404, detail="No ticks received for this trading pair yet")
+    return {"symbol": symbol, **features}
+
+
+# Prediction cache counters
+@router.get("/cache/stats", response_model=dict)
+async def get_prediction_cache_stats():
+    """
+    Hit, miss, coalesced-request and eviction counts of the prediction result cache.
+    """
+    return prediction_cache.snapshot()
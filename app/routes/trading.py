@@ -10,10 +10,20 @@ from typing import List, Dict, Optional
 from beanie import PydanticObjectId
 from bson import ObjectId
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, HTTPException
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pymongo.errors import DuplicateKeyError
 
 from app.models import MongoTradingPair, MongoUser, MongoOrder
 from app.schemas import OrderCreate, OrderResponse
-from app.services import trading_service
+from app.services import trading_service, stats_service
+from app.services.active_user_index import active_user_index
+from app.services.exposure import exposure_book
+from app.services.leaderboard import LEADERBOARD_METRICS, leaderboard
+from app.services.metrics import websocket_clients
+from app.services.pagination import NEXT_CURSOR_HEADER, apply_cursor, encode_cursor, keyset_sort, stream_ndjson
+from app.services.read_models import (
+    find_order_rows, find_order_summary_rows, find_user_summaries, order_row, order_summary_row,
+)
 from app.utils import fetch_real_time_prices
 
 router = APIRouter()
@@ -29,6 +39,7 @@ async def websocket_prices(websocket: WebSocket):
     :return:
     """
     await websocket.accept()
+    websocket_clients.inc("prices")
     try:
         while True:
             prices = await fetch_real_time_prices()
@@ -36,6 +47,37 @@ async def websocket_prices(websocket: WebSocket):
             await asyncio.sleep(1)  # Send updates every second
     except WebSocketDisconnect:
         pass
+    finally:
+        websocket_clients.dec("prices")
+
+
+@router.websocket("/ws/exposure")
+async def websocket_exposure(websocket: WebSocket):
+    """
+    Stream the per-symbol house exposure snapshot whenever it changes.
+    """
+    await websocket.accept()
+    websocket_clients.inc("exposure")
+    try:
+        version = -1
+        while True:
+            if exposure_book.version == version:
+                await exposure_book.wait_for_change(version)
+            version = exposure_book.version
+            await websocket.send_json(exposure_book.snapshot())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        websocket_clients.dec("exposure")
+
+
+@router.get("/risk/exposure", response_model=Dict)
+async def get_house_exposure(symbol: Optional[str] = Query(None, description="Restrict to one trading pair")):
+    """
+    Fetch the live house exposure on pending orders: amount staked on 'rise' and 'fall'
+    and the worst-case payout, per symbol. Served from the in-memory `exposure_book`.
+    """
+    return exposure_book.snapshot(symbol)
 
 
 # Dummy function to simulate getting a user without authentication
@@ -122,37 +164,73 @@ async def get_order(order_id: str):
     return order
 
 
-@router.get("/orders/user/{User_id}", response_model=List[OrderResponse])
-async def get_order_by_user(user_id: str):
+@router.get("/orders/user/{user_id}", response_model=List[OrderResponse], response_class=ORJSONResponse)
+async def get_order_by_user(
+    user_id: str,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header")
+):
     """
-    Retrieve all orders placed by a specific user
+    Retrieve the orders placed by a specific user, newest first, one page at a time.
+    Pages are keyed on (start_time, _id); when more orders remain, the cursor for the
+    next page is returned in the X-Next-Cursor response header.
     :param user_id: The ID of th user as a string.
+    :param limit: Maximum number of orders in the page.
+    :param cursor: Opaque cursor returned with the previous page.
     :return: Alist of the orders placed by the user.
     """
     try:
         # Convert the user_id to a PydanticObjectId
         user_obj_id = PydanticObjectId(user_id)
 
-        # fect all oders with the specified user ID
-        orders = await MongoOrder.find({"user_id": user_obj_id}).to_list()
+        # fect one page of the oders with the specified user ID, projected to the response fields
+        query_filters = apply_cursor({"user_id": user_obj_id}, "start_time", cursor, descending=True)
+        orders = await find_order_rows(query_filters, keyset_sort("start_time", descending=True), limit)
 
         # check if oders were found
-        if not orders:
+        if not orders and not cursor:
             raise HTTPException(status_code=404, detail="No orders found for the specified user.")
 
-        # convert each of the order's id to string for JSON serialization
-        for order in orders:
-            order.id = str(order.id)
-            order.user_id = str(order.user_id)
+        headers = {}
+        if len(orders) == limit:
+            headers[NEXT_CURSOR_HEADER] = encode_cursor(orders[-1]["start_time"], orders[-1]["_id"])
 
-        return orders
+        return ORJSONResponse(content=[order_row(order) for order in orders], headers=headers)
+    except HTTPException as e:
+        raise e
     except Exception as e:
         print(f"Error fecting oders for user {user_id}: {e}")
         raise HTTPException(status_code=500, detail="An error occurred while retrieving user orders.")
 
 
+@router.get("/orders/user/{user_id}/export")
+async def export_orders_by_user(user_id: str):
+    """
+    Stream every order placed by a user as NDJSON (one order per line), newest first.
+    Orders are read in batches from a server-side cursor, so memory stays flat regardless of history size.
+    """
+    try:
+        user_obj_id = PydanticObjectId(user_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid user ID.")
+
+    return StreamingResponse(
+        stream_ndjson(
+            MongoOrder.get_motor_collection(),
+            {"user_id": user_obj_id},
+            keyset_sort("start_time", descending=True),
+        ),
+        media_type="application/x-ndjson"
+    )
+
+
 @router.post("/create_dummy_user", response_model=dict)
 async def create_dummy_user():
+    # Usernames are unique: return the existing dummy user rather than inserting a second one
+    existing_user = await MongoUser.find_one(MongoUser.username == "dummy_user")
+    if existing_user:
+        return {"message": "Dummy user already exists", "user_id": str(existing_user.id)}
+
     dummy_user = MongoUser(
         username="dummy_user",
         email="dummy@example.com",
@@ -160,11 +238,16 @@ async def create_dummy_user():
         balance=1000.0,  # Adjust balance as needed
         is_active=True
     )
-    await dummy_user.insert()
+    try:
+        await dummy_user.insert()
+    except DuplicateKeyError:
+        # Created by a concurrent request since the lookup
+        existing_user = await MongoUser.find_one(MongoUser.username == "dummy_user")
+        return {"message": "Dummy user already exists", "user_id": str(existing_user.id)}
     return {"message": "Dummy user created successfully", "user_id": str(dummy_user.id)}
 
 
-@router.get("/users/orders", response_model=List[Dict])
+@router.get("/users/orders", response_model=List[Dict], response_class=ORJSONResponse)
 async def get_users_with_orders(
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
@@ -176,14 +259,21 @@ async def get_users_with_orders(
     end_date: Optional[date] = Query(None),
     order_status: Optional[str] = Query(None),
     min_balance: Optional[float] = Query(None),
-    max_balance: Optional[float] = Query(None)
+    max_balance: Optional[float] = Query(None),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+    orders_limit: int = Query(20, ge=1, le=100, description="Maximum number of orders embedded per user")
 ):
     """
     Fetch users with their orders, with support for pagination, sorting, and filtering.
+    Passing `cursor` (from the X-Next-Cursor header of the previous page) pages by keyset on
+    (sort_by, _id) instead of skipping `page` offsets, so deep pages cost the same as the first.
+    Each user embeds their `orders_limit` newest matching orders. When more remain, the user's
+    `orders_next_cursor` continues their history, newest first, at /orders/user/{user_id}?cursor=
+    (which lists the user's orders without the order filters).
     """
     skip = (page - 1) * limit
-    sort_order = 1 if sort_order == "asc" else -1
-    sort_criteria = {sort_by: sort_order} if sort_by else None
+    descending = sort_order != "asc"
+    sort_field = sort_by or "_id"
 
     query_filters = {}
     if status:
@@ -195,41 +285,44 @@ async def get_users_with_orders(
     if max_balance is not None:
         query_filters["balance"] = {"$lte": max_balance, **query_filters.get("balance", {})}
 
-    find_query = MongoUser.find(query_filters).skip(skip).limit(limit)
-    if sort_criteria:
-        find_query = find_query.sort(sort_criteria)
+    if cursor:
+        query_filters = apply_cursor(query_filters, sort_field, cursor, descending)
+        skip = 0
+
+    order_filters = {}
+    start_time_range = {}
+    if start_date:
+        start_time_range["$gte"] = datetime.combine(start_date, datetime.min.time())
+    if end_date:
+        # end_date is inclusive: every order placed before the following midnight
+        start_time_range["$lt"] = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+    if start_time_range:
+        order_filters["start_time"] = start_time_range
+    if order_status:
+        order_filters["status"] = order_status
 
     users_with_orders = []
-    async for user in find_query:
-        order_query = MongoOrder.find({"user_id": user.id})
-        if start_date:
-            order_query = order_query.find({"start_time": {"$gte": start_date}})
-        if end_date:
-            order_query = order_query.find({"start_time": {"$lte": end_date}})
-        if order_status:
-            order_query = order_query.find({"status": order_status})
-
-        user_orders = await order_query.to_list()
+    last_user = None
+    order_sort = keyset_sort("start_time", descending=True)
+    async for user in find_user_summaries(query_filters, keyset_sort(sort_field, descending), skip, limit):
+        last_user = user
+        orders = await find_order_summary_rows({"user_id": user["_id"], **order_filters}, order_sort, orders_limit)
         user_data = {
-            "username": user.username,
-            "email": user.email,
-            "balance": user.balance,
-            "orders": [
-                {
-                    "order_id": str(order.id),
-                    "symbol": order.symbol,
-                    "amount": order.amount,
-                    "prediction": order.prediction,
-                    "trade_time": order.trade_time,
-                    "locked_price": order.locked_price,
-                    "status": order.status
-                }
-                for order in user_orders
-            ]
+            "username": user.get("username"),
+            "email": user.get("email"),
+            "balance": user.get("balance"),
+            "orders": [order_summary_row(order) for order in orders],
+            "orders_next_cursor": (
+                encode_cursor(orders[-1]["start_time"], orders[-1]["_id"]) if len(orders) == orders_limit else None
+            ),
         }
         users_with_orders.append(user_data)
 
-    return users_with_orders
+    headers = {}
+    if last_user is not None and len(users_with_orders) == limit:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(last_user.get(sort_field), last_user["_id"])
+
+    return ORJSONResponse(content=users_with_orders, headers=headers)
 
 @router.get("/users/orders/stats", response_model=Dict)
 async def get_users_with_orders_stats(
@@ -240,45 +333,31 @@ async def get_users_with_orders_stats(
 ):
     """
     Fetch aggregated statistics about users and their orders with options to filter by the number of wins and losses.
+    Served from the materialized per-user counters maintained by `stats_service`.
     """
     users_with_orders = []
-    total_users = 0
     total_orders = 0
     most_wins = {"username": None, "wins": 0}
 
-    async for user in MongoUser.find_all():
-        user_orders = await MongoOrder.find(MongoOrder.user_id == user.id).to_list()
-        wins = sum(1 for order in user_orders if order.status == "win")
-        losses = sum(1 for order in user_orders if order.status == "lose")
-
-        # Apply filters for wins and losses
-        if min_wins is not None and wins < min_wins:
-            continue
-        if max_wins is not None and wins > max_wins:
-            continue
-        if min_losses is not None and losses < min_losses:
-            continue
-        if max_losses is not None and losses > max_losses:
-            continue
-
-        total_users += 1
-        total_orders += len(user_orders)
+    user_stats = await stats_service.query_user_stats(min_wins, max_wins, min_losses, max_losses)
+    for stats in user_stats:
+        total_orders += stats.orders
 
         # Update most wins
-        if wins > most_wins["wins"]:
-            most_wins = {"username": user.username, "wins": wins}
+        if stats.wins > most_wins["wins"]:
+            most_wins = {"username": stats.username, "wins": stats.wins}
 
         user_data = {
-            "username": user.username,
-            "email": user.email,
-            "orders": len(user_orders),
-            "wins": wins,
-            "losses": losses
+            "username": stats.username,
+            "email": stats.email,
+            "orders": stats.orders,
+            "wins": stats.wins,
+            "losses": stats.losses
         }
         users_with_orders.append(user_data)
 
     return {
-        "total_users": total_users,
+        "total_users": len(users_with_orders),
         "total_orders": total_orders,
         "users_details": users_with_orders,
         "user_with_most_wins": most_wins
@@ -286,29 +365,33 @@ async def get_users_with_orders_stats(
 
 
 
+@router.get("/users/leaderboard", response_model=Dict)
+async def get_leaderboard(
+    metric: str = Query("wins", description="Ranking metric: 'wins', 'net_payout' or 'win_rate'"),
+    page: int = Query(1, ge=1),
+    limit: int = Query(10, ge=1, le=100)
+):
+    """
+    Fetch one page of the top-traders leaderboard for the given metric.
+    Served from the in-memory `leaderboard`, which is updated as orders are placed and settled.
+    """
+    if metric not in LEADERBOARD_METRICS:
+        raise HTTPException(status_code=400, detail=f"Invalid metric. Must be one of {LEADERBOARD_METRICS}.")
+
+    total, entries = leaderboard.page(metric, offset=(page - 1) * limit, limit=limit)
+    return {
+        "metric": metric,
+        "page": page,
+        "limit": limit,
+        "total": total,
+        "entries": entries
+    }
+
+
 @router.get("/users/active", response_model=List[Dict])
 async def get_active_users():
     """
     Fetch all active users who have pending or recent orders within the last hour.
+    Served from the in-memory `active_user_index`, so no per-user order queries are issued.
     """
-    active_users = []
-    current_time = datetime.utcnow()
-
-    async for user in MongoUser.find(MongoUser.is_active == True):
-        # Find all pending orders or recent orders placed in the last hour
-        recent_orders = await MongoOrder.find({
-            "user_id": user.id,
-            "$or": [
-                {"status": "pending"},  # Orders that are still pending
-                {"start_time": {"$gte": current_time - timedelta(hours=1)}}  # Orders placed in the last hour
-            ]
-        }).to_list()
-
-        if recent_orders:
-            active_users.append({
-                "username": user.username,
-                "email": user.email,
-                "active_orders_count": len(recent_orders)
-            })
-
-    return active_users
+    return active_user_index.active_users()
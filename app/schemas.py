@@ -3,9 +3,11 @@
 # Pydantic schemas for request/response validation
 
 from pydantic import BaseModel, Field, EmailStr
-from typing import Optional
+from typing import List, Literal, Optional, Union
 from datetime import datetime
 
+from app.services.repository import STORAGE_BACKEND
+
 
 # Shared Pydantic Schemas for Validation and Serialization
 
@@ -35,7 +37,7 @@ class TradingPairCreate(BaseModel):
 
 
 class TradingPairResponse(TradingPairCreate):
-    id: Optional[str]  # MongoDB will use a string for the ID, while SQLAlchemy uses an integer.
+    id: Optional[Union[str, int]]  # MongoDB will use a string for the ID, while SQLAlchemy uses an integer.
 
     class Config:
         orm_mode = True
@@ -49,7 +51,7 @@ class OrderCreate(BaseModel):
 
 
 class OrderResponse(BaseModel):
-    id: Optional[str]  # MongoDB will use a string for the ID, while SQLAlchemy uses an integer.
+    id: Optional[Union[str, int]]  # MongoDB will use a string for the ID, while SQLAlchemy uses an integer.
     user_id: Optional[str]  # Add user_id to match the return data
     symbol: str
     amount: float
@@ -62,3 +64,27 @@ class OrderResponse(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+# 3. Prediction Schemas
+MAX_BATCH_SYMBOLS = 50  # Symbols accepted by one batch prediction request
+
+
+class BatchPredictionRequest(BaseModel):
+    symbols: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_SYMBOLS,
+                               description="Trading pair symbols to forecast, e.g., ['BTC/USD'].")
+    models: List[Literal["arima", "lstm"]] = Field(["arima", "lstm"], min_length=1,
+                                                  description="Models to run for every symbol.")
+    source: Literal["mongo", "sqlalchemy"] = Field(STORAGE_BACKEND,
+                                                   description="Storage backend the price history is read from.")
+
+
+class BatchPrediction(BaseModel):
+    symbol: str
+    model: str
+    predicted_price: Optional[float] = None
+    error: Optional[str] = None  # Set instead of predicted_price when this forecast failed
+
+
+class BatchPredictionResponse(BaseModel):
+    predictions: List[BatchPrediction]
@@ -0,0 +1,112 @@
+# trading_platform_backend/app/services/active_user_index.py
+
+# In-memory index of users with pending or recent orders
+
+import heapq
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from app.services.repository import OrderRecord, UserRecord, get_repository
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_WINDOW = timedelta(hours=1)  # Orders placed within this window count as recent
+
+
+class ActiveUserIndex:
+    """
+    Tracks, per user, the orders that are still pending or were placed within `window`.
+    Fed by order placement and settlement events; expired entries are dropped lazily
+    through a min-heap keyed on expiry time, so reads cost O(active users).
+
+    The index is per process: it sees orders placed and settled by this worker plus
+    whatever `load` seeded from storage at startup.
+    """
+
+    def __init__(self, window: timedelta = ACTIVE_WINDOW):
+        self.window = window
+        self._users: Dict[str, dict] = {}  # user_id -> {"username", "email", "is_active", "orders"}
+        self._expiry: List[Tuple[datetime, str, str]] = []  # (expires_at, user_id, order_id)
+
+    def _track(self, user: UserRecord, order_id: str, start_time: datetime, pending: bool):
+        user_id = str(user.id)
+        entry = self._users.setdefault(user_id, {"orders": {}})
+        entry.update(username=user.username, email=user.email, is_active=user.is_active)
+        entry["orders"][order_id] = [start_time, pending]
+        heapq.heappush(self._expiry, (start_time + self.window, user_id, order_id))
+
+    def _drop(self, user_id: str, order_id: str):
+        entry = self._users.get(user_id)
+        if not entry:
+            return
+        entry["orders"].pop(order_id, None)
+        if not entry["orders"]:
+            del self._users[user_id]
+
+    def order_placed(self, order: OrderRecord, user: UserRecord):
+        """
+        Record a newly placed (pending) order.
+        """
+        self._track(user, str(order.id), order.start_time, order.status == "pending")
+
+    def order_settled(self, order: OrderRecord, user: UserRecord, now: Optional[datetime] = None):
+        """
+        Mark an order as no longer pending; it stays listed until its recency window ends.
+        """
+        now = now or datetime.utcnow()
+        user_id, order_id = str(user.id), str(order.id)
+        entry = self._users.get(user_id)
+        if entry is None or order_id not in entry["orders"]:
+            return
+        entry.update(username=user.username, email=user.email, is_active=user.is_active)
+        start_time = entry["orders"][order_id][0]
+        if start_time + self.window <= now:
+            self._drop(user_id, order_id)
+        else:
+            entry["orders"][order_id][1] = False
+
+    def _expire(self, now: datetime):
+        while self._expiry and self._expiry[0][0] <= now:
+            _, user_id, order_id = heapq.heappop(self._expiry)
+            entry = self._users.get(user_id)
+            if entry is None or order_id not in entry["orders"]:
+                continue
+            if not entry["orders"][order_id][1]:  # Settled and past the window
+                self._drop(user_id, order_id)
+
+    def active_users(self, now: Optional[datetime] = None) -> List[dict]:
+        """
+        List active users with their count of pending or recent orders.
+        """
+        self._expire(now or datetime.utcnow())
+        return [
+            {
+                "username": entry["username"],
+                "email": entry["email"],
+                "active_orders_count": len(entry["orders"]),
+            }
+            for entry in self._users.values()
+            if entry["is_active"]
+        ]
+
+    async def load(self):
+        """
+        Seed the index from storage with one orders query and one users query.
+        """
+        now = datetime.utcnow()
+        self._users.clear()
+        self._expiry.clear()
+
+        repository = get_repository()
+        orders = await repository.active_orders(now - self.window)
+        users = await repository.get_users({order.user_id for order in orders})
+
+        for order in orders:
+            user = users.get(order.user_id)
+            if user:
+                self._track(user, order.id, order.start_time, order.status == "pending")
+        logger.info(f"Active user index loaded with {len(self._users)} users.")
+
+
+active_user_index = ActiveUserIndex()
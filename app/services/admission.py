@@ -0,0 +1,190 @@
+# trading_platform_backend/app/services/admission.py
+
+# Admission control for order placement: shared token buckets and load shedding
+
+# Rate limits are token buckets per user and per symbol. The buckets live in memory-mapped files
+# (ADMISSION_STATE_DIR), so every worker process on the host draws from the same buckets without
+# a network hop: a check is a file lock, a hash probe and a few struct reads and writes (a few
+# microseconds). Each file is an open-addressing hash table of (key hash, tokens, last refill)
+# slots; a slot whose bucket has refilled completely is as good as empty and is reused.
+# Refill times are wall-clock (`time.time`), since the files outlive reboots; a clock that steps
+# back only pauses refilling until the next check restamps the bucket.
+#
+# Load shedding is per process: order placement is refused with a fast 503 while too many orders
+# are in flight, or while the recent latency of the order-path storage operations
+# (`repository.ORDER_PATH_OPERATIONS`) is above ORDER_SHED_LATENCY.
+
+import fcntl
+import hashlib
+import logging
+import math
+import mmap
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+from decouple import config
+
+from app.services.metrics import recent_repository_latency
+from app.services.repository import STORAGE_BACKEND
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_STATE_DIR = Path(config("ADMISSION_STATE_DIR", default="admission_state"))
+USER_ORDER_RATE = config("USER_ORDER_RATE", default=2.0, cast=float)  # Orders per second per user
+USER_ORDER_BURST = config("USER_ORDER_BURST", default=10.0, cast=float)
+SYMBOL_ORDER_RATE = config("SYMBOL_ORDER_RATE", default=200.0, cast=float)  # Orders per second per symbol
+SYMBOL_ORDER_BURST = config("SYMBOL_ORDER_BURST", default=400.0, cast=float)
+ORDER_MAX_IN_FLIGHT = config("ORDER_MAX_IN_FLIGHT", default=256, cast=int)  # Per process
+ORDER_SHED_LATENCY = config("ORDER_SHED_LATENCY", default=0.25, cast=float)  # Seconds of recent storage latency
+BUCKET_SLOTS = 65536  # Buckets per table
+BUCKET_MAX_PROBES = 32  # Slots examined per lookup before giving up (the request is then admitted)
+
+TABLE_MAGIC = b"TBKT0002"
+HEADER = struct.Struct("<8sQ")  # magic, slots
+SLOT = struct.Struct("<Qdd")  # key hash (0 = empty), tokens, Unix time of the last refill
+
+
+class SharedTokenBuckets:
+    """
+    Token buckets keyed by string, shared by the processes that map the same file.
+    """
+
+    def __init__(self, path: Path, rate: float, capacity: float, slots: int = BUCKET_SLOTS):
+        self.path = Path(path)
+        self.rate = rate
+        self.capacity = capacity
+        self.slots = slots
+        self._fd: Optional[int] = None
+        self._map: Optional[mmap.mmap] = None
+        self.stats = {"granted": 0, "refused": 0, "table_full": 0}
+
+    def _open(self):
+        size = HEADER.size + self.slots * SLOT.size
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            valid = os.fstat(fd).st_size == size and os.pread(fd, HEADER.size, 0) == HEADER.pack(TABLE_MAGIC, self.slots)
+            if not valid:  # New file, or one with another layout: start empty
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+                os.pwrite(fd, HEADER.pack(TABLE_MAGIC, self.slots), 0)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        self._map = mmap.mmap(fd, size)
+        self._fd = fd
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        # Stable across processes (unlike `hash`), never 0
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") | 1
+
+    def acquire(self, key: str, tokens: float = 1.0) -> float:
+        """
+        Take `tokens` from the key's bucket if it has them.
+        :return: 0.0 if granted, else the seconds until the bucket will have them
+        """
+        if self._map is None:
+            self._open()
+        key_hash = self._hash(key)
+        now = time.time()
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            offset, available = self._find(key_hash, now)
+            if offset is None:
+                self.stats["table_full"] += 1
+                return 0.0  # Fail open rather than refuse everyone sharing a full table
+            if available < tokens:
+                SLOT.pack_into(self._map, offset, key_hash, available, now)
+                self.stats["refused"] += 1
+                return (tokens - available) / self.rate
+            SLOT.pack_into(self._map, offset, key_hash, available - tokens, now)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self.stats["granted"] += 1
+        return 0.0
+
+    def refund(self, key: str, tokens: float = 1.0):
+        """
+        Put back tokens taken by `acquire` for a request that was refused further on.
+        """
+        if self._map is None:
+            return
+        key_hash = self._hash(key)
+        now = time.time()
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            offset, available = self._find(key_hash, now)
+            if offset is not None:
+                SLOT.pack_into(self._map, offset, key_hash, min(available + tokens, self.capacity), now)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _refilled(self, tokens: float, refilled: float, now: float) -> float:
+        # A refill time in the future (the clock stepped back) adds nothing rather than a debt
+        return min(self.capacity, max(tokens, 0.0) + max(now - refilled, 0.0) * self.rate)
+
+    def _find(self, key_hash: int, now: float) -> Tuple[Optional[int], float]:
+        """
+        The offset of the key's slot (or of a free one to claim) and the key's refilled token count.
+        Must be called with the file locked.
+        """
+        free = None
+        start = key_hash % self.slots
+        for probe in range(BUCKET_MAX_PROBES):
+            offset = HEADER.size + ((start + probe) % self.slots) * SLOT.size
+            stored, tokens, refilled = SLOT.unpack_from(self._map, offset)
+            if stored == 0:
+                return (free if free is not None else offset), self.capacity
+            available = self._refilled(tokens, refilled, now)
+            if stored == key_hash:
+                return offset, available
+            if free is None and available >= self.capacity:
+                free = offset  # Idle long enough to be full again: reusable
+        return free, self.capacity
+
+
+class AdmissionControl:
+    """
+    Admission checks run before an order touches storage; see the module comment.
+    """
+
+    def __init__(self, state_dir: Path = ADMISSION_STATE_DIR, max_in_flight: int = ORDER_MAX_IN_FLIGHT,
+                 shed_latency: float = ORDER_SHED_LATENCY):
+        self.users = SharedTokenBuckets(state_dir / "users.bin", USER_ORDER_RATE, USER_ORDER_BURST)
+        self.symbols = SharedTokenBuckets(state_dir / "symbols.bin", SYMBOL_ORDER_RATE, SYMBOL_ORDER_BURST)
+        self.max_in_flight = max_in_flight
+        self.shed_latency = shed_latency
+        self.in_flight = 0
+
+    def check(self, user_id: str, symbol: str) -> Optional[Tuple[str, int, str, float]]:
+        """
+        Shed load, then take a token from the user's and the symbol's buckets.
+        :return: None if the order is admitted, else (reason, HTTP status, detail, seconds to retry after)
+        """
+        if self.in_flight >= self.max_in_flight:
+            return "shed_in_flight", 503, "Order placement is overloaded, try again shortly.", 1.0
+        if recent_repository_latency.value(STORAGE_BACKEND) > self.shed_latency:
+            return "shed_latency", 503, "Order placement is overloaded, try again shortly.", 1.0
+
+        wait = self.users.acquire(f"user:{user_id}")
+        if wait:
+            return "rate_limited_user", 429, "Too many orders, slow down.", wait
+        wait = self.symbols.acquire(f"symbol:{symbol}")
+        if wait:
+            self.users.refund(f"user:{user_id}")
+            return "rate_limited_symbol", 429, "Too many orders on this trading pair, try again shortly.", wait
+        return None
+
+
+def retry_after(seconds: float) -> str:
+    """
+    A `Retry-After` header value (whole seconds, at least 1).
+    """
+    return str(max(1, math.ceil(seconds)))
+
+
+admission_control = AdmissionControl()
@@ -0,0 +1,148 @@
+# trading_platform_backend/app/services/arima_forecaster.py
+
+# Per-symbol ARIMA models updated incrementally from live ticks, with forecast caching
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.services.inference_jobs import fit_arima_params
+from app.services.inference_service import inference_service
+from app.services.repository import STORAGE_SOURCES
+from app.utils import recent_ticks, tick_versions
+
+logger = logging.getLogger(__name__)
+
+ARIMA_ORDER = (5, 1, 0)
+REFIT_EVERY = 200  # Observations appended through the state space before a full refit
+REFIT_INTERVAL = 900  # Seconds before a full refit, regardless of appended observations
+MAX_OBSERVATIONS = 500  # Most recent observations kept for a full refit
+
+
+def _filter(observations: List[float], order, params: np.ndarray):
+    """
+    Run the state-space filter of an ARIMA with already estimated parameters (in a thread).
+    statsmodels is imported here so the API process only loads it on its first forecast.
+    """
+    from statsmodels.tsa.arima.model import ARIMA
+
+    return ARIMA(np.asarray(observations, dtype=float), order=order).filter(params)
+
+
+class ArimaForecaster:
+    """
+    Keeps one fitted ARIMA per symbol.
+
+    New ticks (from `app.utils.recent_ticks`) are absorbed with `ARIMAResults.extend`, which runs
+    the Kalman filter over just the new observations with the fitted parameters instead of
+    re-estimating them; parameters are re-estimated every `refit_every` observations or
+    `refit_interval` seconds. The one-step forecast is cached until the symbol's next tick.
+
+    Parameter estimation runs in the inference worker pool and the state-space filter on the
+    fitted parameters in a thread, so the event loop only does the O(new ticks) `extend`.
+    Updates of a symbol's model are serialized by a per-symbol lock, so concurrent forecasts never
+    fit it twice or absorb the same ticks twice.
+    """
+
+    def __init__(
+        self,
+        order=ARIMA_ORDER,
+        refit_every: int = REFIT_EVERY,
+        refit_interval: int = REFIT_INTERVAL,
+        max_observations: int = MAX_OBSERVATIONS,
+    ):
+        self.order = order
+        self.refit_every = refit_every
+        self.refit_interval = refit_interval
+        self.max_observations = max_observations
+        self._entries: Dict[str, dict] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.stats = {"hits": 0, "appends": 0, "refits": 0}
+
+    def cached_forecast(self, symbol: str) -> Optional[float]:
+        """
+        The cached forecast for a symbol if no tick has arrived since it was computed
+        (and it is not older than `refit_interval`).
+        """
+        entry = self._entries.get(symbol)
+        if (entry is not None
+                and entry["tick_version"] == tick_versions.get(symbol, 0)
+                and time.monotonic() - entry["forecast_at"] < self.refit_interval):
+            self.stats["hits"] += 1
+            return entry["forecast"]
+        return None
+
+    def needs_history(self, symbol: str) -> bool:
+        """
+        Whether `forecast` needs historical prices (no model has been fitted for the symbol yet).
+        """
+        return symbol not in self._entries
+
+    async def _fit(self, symbol: str, observations: List[float]) -> dict:
+        observations = observations[-self.max_observations:]
+        params = await inference_service.run(fit_arima_params, observations, self.order)
+        results = await asyncio.to_thread(_filter, observations, self.order, params)
+        self.stats["refits"] += 1
+        entry = {
+            "results": results,
+            "observations": list(observations),
+            "appended": 0,
+            "fitted_at": time.monotonic(),
+        }
+        self._entries[symbol] = entry
+        return entry
+
+    def _new_observations(self, symbol: str, since_version: int) -> List[float]:
+        return [price for seq, _, price in recent_ticks.get(symbol, ()) if seq > since_version]
+
+    async def forecast(self, symbol: str, historical_prices: Optional[List[float]] = None) -> float:
+        """
+        Forecast the next price for a symbol (1 step ahead).
+        :param symbol: The trading pair symbol
+        :param historical_prices: History to fit on when no model exists yet; on a full refit it
+            replaces the tracked observations if given
+        :return: Predicted next price
+        """
+        cached = self.cached_forecast(symbol)
+        if cached is not None:
+            return cached
+
+        async with self._locks.setdefault(symbol, asyncio.Lock()):
+            # A concurrent call may have brought the model up to date while this one waited
+            cached = self.cached_forecast(symbol)
+            if cached is not None:
+                return cached
+
+            # The ticks absorbed below are exactly those up to this version; later ones are
+            # picked up by the next call
+            version = tick_versions.get(symbol, 0)
+            entry = self._entries.get(symbol)
+            if entry is None:
+                if not historical_prices or len(historical_prices) < 10:
+                    raise ValueError("Not enough data to perform prediction")
+                entry = await self._fit(symbol, historical_prices)
+            else:
+                new_observations = self._new_observations(symbol, entry["tick_version"])
+                observations = (entry["observations"] + new_observations)[-self.max_observations:]
+                due = (entry["appended"] + len(new_observations) >= self.refit_every
+                       or time.monotonic() - entry["fitted_at"] >= self.refit_interval)
+                if due:
+                    entry = await self._fit(symbol, historical_prices or observations)
+                else:
+                    if new_observations:
+                        entry["results"] = entry["results"].extend(np.asarray(new_observations, dtype=float))
+                        entry["appended"] += len(new_observations)
+                        self.stats["appends"] += 1
+                    entry["observations"] = observations
+
+            entry["tick_version"] = version
+            entry["forecast"] = float(entry["results"].forecast(steps=1)[0])
+            entry["forecast_at"] = time.monotonic()
+            return entry["forecast"]
+
+
+# Separate models per storage backend, since their histories differ
+arima_forecasters: Dict[str, ArimaForecaster] = {source: ArimaForecaster() for source in STORAGE_SOURCES}
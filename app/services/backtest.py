@@ -0,0 +1,215 @@
+# trading_platform_backend/app/services/backtest.py
+
+# Backtesting of the forecasters against the rise/fall payout rules over recorded ticks
+
+# At every `stride`-th tick a simulated order is placed in the direction a model forecasts
+# (rise if the forecast is above the current price), for every duration in VALID_TRADE_TIMES,
+# and settled like `evaluate_order_outcome_with_real_time_price`: against the last price known
+# when the trade time has elapsed, winning stake * PAYOUT_MULTIPLIER and losing the stake otherwise.
+#
+# Forecasts are the expensive part; they are computed in worker processes per symbol and per
+# window of decision points (`*_window` functions must stay picklable). Settlement and the
+# statistics are vectorized over all decisions and trade times at once.
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.arima_forecaster import ARIMA_ORDER, REFIT_EVERY
+from app.services.exposure import PAYOUT_MULTIPLIER
+from app.services.features import minmax_scale, minmax_unscale, sliding_windows
+from app.services.model_registry import MODEL_DIR, ModelRegistry
+from app.services.trading_service import VALID_TRADE_TIMES
+
+BACKTEST_MODELS = ["arima", "lstm"]
+DECISION_STRIDE = 15  # Ticks between simulated orders
+DECISION_WINDOW = 2000  # Decision points per worker job
+ARIMA_HISTORY = 200  # Ticks an ARIMA model is (re)fitted on
+CALIBRATION_BINS = 5  # Quantile bins of forecast confidence (predicted move size)
+
+
+def decision_points(n_ticks: int, warmup: int, stride: int = DECISION_STRIDE) -> np.ndarray:
+    """
+    Indices of the ticks at which simulated orders are placed.
+    """
+    return np.arange(warmup, n_ticks, stride)
+
+
+def settle(
+    timestamps: np.ndarray,
+    prices: np.ndarray,
+    decisions: np.ndarray,
+    trade_times: Sequence[int] = VALID_TRADE_TIMES
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Settlement price of an order placed at each decision point, for each trade time.
+    :return: Final prices and a mask of the orders whose trade time ends within the data,
+        both of shape (len(decisions), len(trade_times))
+    """
+    targets = timestamps[decisions][:, np.newaxis] + np.asarray(trade_times, dtype=np.float64)
+    settled_at = np.searchsorted(timestamps, targets, side="right") - 1
+    return prices[settled_at], targets <= timestamps[-1]
+
+
+def evaluate(locked: np.ndarray, final: np.ndarray, rise: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Outcome of rise/fall orders under the payout rules.
+    :param locked: Locked price per order, shape (n,)
+    :param final: Settlement prices, shape (n, trade_times)
+    :param rise: Whether each order predicts a rise, shape (n,)
+    :return: Wins and the profit per unit stake (PAYOUT_MULTIPLIER - 1 on a win, -1 on a loss)
+    """
+    locked = locked[:, np.newaxis]
+    wins = np.where(rise[:, np.newaxis], final > locked, final < locked)
+    return wins, np.where(wins, PAYOUT_MULTIPLIER - 1.0, -1.0)
+
+
+def forecast_arima_window(prices: np.ndarray, decisions: np.ndarray, order=ARIMA_ORDER,
+                          history: int = ARIMA_HISTORY, refit_every: int = REFIT_EVERY) -> np.ndarray:
+    """
+    One-step ARIMA forecasts at each decision point, using only the ticks up to it.
+    Like `ArimaForecaster`, the model absorbs new ticks with `extend` and is refitted on the
+    latest `history` ticks every `refit_every` ticks.
+    """
+    from statsmodels.tsa.arima.model import ARIMA
+
+    forecasts = np.empty(len(decisions))
+    results, fitted_at, last = None, 0, -1
+    for i, decision in enumerate(decisions):
+        if results is None or decision - fitted_at >= refit_every:
+            results = ARIMA(prices[max(0, decision + 1 - history):decision + 1], order=order).fit()
+            fitted_at = last = decision
+        elif decision > last:
+            results = results.extend(prices[last + 1:decision + 1])
+            last = decision
+        forecasts[i] = results.forecast(steps=1)[0]
+    return forecasts
+
+
+def forecast_lstm_window(model_dir: str, symbol: str, version: Optional[int],
+                         prices: np.ndarray, decisions: np.ndarray) -> np.ndarray:
+    """
+    LSTM forecasts at each decision point in one batched forward pass of the NumPy engine.
+    """
+    entry = ModelRegistry(model_dir).load(symbol, version)
+    if entry is None:
+        raise ValueError(f"No trained LSTM model for {symbol}")
+    meta = entry["meta"]
+    time_steps = meta["time_steps"]
+    scaled = minmax_scale(prices, meta["data_min"], meta["data_max"])
+    X = sliding_windows(scaled, time_steps)[decisions - time_steps + 1]
+    return minmax_unscale(entry["model"].predict(X), meta["data_min"], meta["data_max"])[:, 0]
+
+
+def _window_jobs(symbol: str, model: str, prices: np.ndarray, decisions: np.ndarray, lookback: int,
+                 window: int, model_dir: str, version: Optional[int]):
+    """
+    Split a symbol's decision points into worker jobs, each given only the `lookback` ticks
+    before its first decision and the ticks up to its last one.
+    """
+    for chunk in np.array_split(decisions, int(np.ceil(len(decisions) / window))):
+        offset = max(0, chunk[0] + 1 - lookback)
+        segment = prices[offset:chunk[-1] + 1]
+        if model == "arima":
+            yield forecast_arima_window, (segment, chunk - offset)
+        else:
+            yield forecast_lstm_window, (model_dir, symbol, version, segment, chunk - offset)
+
+
+def summarize(symbol: str, model: str, timestamps: np.ndarray, prices: np.ndarray,
+              decisions: np.ndarray, forecasts: np.ndarray,
+              trade_times: Sequence[int] = VALID_TRADE_TIMES, bins: int = CALIBRATION_BINS) -> List[dict]:
+    """
+    Hit rate, simulated PnL and calibration of one model's forecasts, per trade time.
+    PnL is in units of stake (every simulated order stakes 1); the house PnL is its negative.
+    Calibration groups orders into quantile bins of the predicted move size and reports the
+    hit rate per bin: a useful model wins more often when it predicts larger moves.
+    """
+    locked = prices[decisions]
+    traded = np.isfinite(forecasts) & (forecasts != locked)  # No direction, no order
+    final, settled = settle(timestamps, prices, decisions, trade_times)
+    wins, pnl = evaluate(locked, final, forecasts > locked)
+    predicted_move = np.abs(forecasts - locked) / locked
+    edges = np.quantile(predicted_move[traded], np.linspace(0, 1, bins + 1)) if traded.any() else None
+    if edges is not None:
+        which = np.clip(np.searchsorted(edges, predicted_move, side="right") - 1, 0, bins - 1)
+
+    reports = []
+    for j, trade_time in enumerate(trade_times):
+        mask = traded & settled[:, j]
+        trades = int(mask.sum())
+        report = {
+            "symbol": symbol,
+            "model": model,
+            "trade_time": trade_time,
+            "trades": trades,
+            "wins": int(wins[mask, j].sum()),
+            "hit_rate": float(wins[mask, j].mean()) if trades else None,
+            "pnl": float(pnl[mask, j].sum()),
+            "pnl_per_trade": float(pnl[mask, j].mean()) if trades else None,
+            "breakeven_hit_rate": 1.0 / PAYOUT_MULTIPLIER,
+            "calibration": [],
+        }
+        if trades and edges is not None:
+            for b in range(bins):
+                in_bin = mask & (which == b)
+                if in_bin.any():
+                    report["calibration"].append({
+                        "min_predicted_move": float(edges[b]),
+                        "max_predicted_move": float(edges[b + 1]),
+                        "trades": int(in_bin.sum()),
+                        "hit_rate": float(wins[in_bin, j].mean()),
+                    })
+        reports.append(report)
+    return reports
+
+
+def run_backtest(
+    ticks: Dict[str, Tuple[np.ndarray, np.ndarray]],
+    models: Sequence[str] = BACKTEST_MODELS,
+    trade_times: Sequence[int] = VALID_TRADE_TIMES,
+    stride: int = DECISION_STRIDE,
+    window: int = DECISION_WINDOW,
+    max_workers: Optional[int] = None,
+    model_dir: str = str(MODEL_DIR),
+    lstm_versions: Optional[Dict[str, int]] = None,
+) -> List[dict]:
+    """
+    Backtest the models on recorded ticks, spreading forecast windows across processes.
+    :param ticks: (timestamps, prices) per symbol, oldest first
+    :param lstm_versions: LSTM model version per symbol (latest registered by default)
+    :return: One report per symbol, model and trade time (see `summarize`)
+    """
+    lstm_versions = lstm_versions or {}
+    registry = ModelRegistry(model_dir)
+    plans = {}
+    for symbol, (timestamps, prices) in ticks.items():
+        for model in models:
+            if model == "lstm":
+                if not registry.versions(symbol):
+                    continue  # Nothing to backtest until a model is trained
+                lookback = registry.latest_meta(symbol)["time_steps"]
+            else:
+                lookback = ARIMA_HISTORY
+            decisions = decision_points(len(prices), lookback - 1, stride)
+            if len(decisions):
+                plans[(symbol, model)] = decisions, lookback
+
+    reports = []
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(), mp_context=context) as pool:
+        futures = {
+            (symbol, model): [pool.submit(fn, *args) for fn, args in _window_jobs(
+                symbol, model, ticks[symbol][1], decisions, lookback, window, model_dir, lstm_versions.get(symbol)
+            )]
+            for (symbol, model), (decisions, lookback) in plans.items()
+        }
+        for (symbol, model), jobs in futures.items():
+            forecasts = np.concatenate([job.result() for job in jobs])
+            timestamps, prices = ticks[symbol]
+            decisions = plans[(symbol, model)][0]
+            reports.extend(summarize(symbol, model, timestamps, prices, decisions, forecasts, trade_times))
+    return reports
@@ -0,0 +1,116 @@
+# trading_platform_backend/app/services/exposure.py
+
+# Real-time per-symbol house exposure on pending orders
+
+# The book is per process: a worker sees the orders it placed since startup and the orders that
+# were pending when it started, but not the orders placed on other workers since. The house-wide
+# MAX_SYMBOL_EXPOSURE is therefore split evenly across the API_WORKERS processes serving orders,
+# each enforcing its share; set API_WORKERS to the number of workers (e.g. uvicorn --workers).
+# After a restart every worker holds every pending order until it settles, so for at most one
+# trade time (5 minutes) the shares are conservative.
+
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from decouple import config
+
+from app.services.metrics import pending_orders
+from app.services.repository import get_repository
+
+logger = logging.getLogger(__name__)
+
+PAYOUT_MULTIPLIER = 1.02  # Payout paid on a winning order (stake * multiplier)
+MAX_SYMBOL_EXPOSURE = config("MAX_SYMBOL_EXPOSURE", default=50000.0, cast=float)  # Worst-case payout per pair, house-wide
+API_WORKERS = config("API_WORKERS", default=1, cast=int)  # Processes placing orders, each with its own book
+
+
+class ExposureBook:
+    """
+    Running totals of the amount staked on 'rise' and 'fall' across pending orders, per symbol.
+
+    Orders are locked at different prices, so both sides of a symbol can win at once; the
+    worst case is therefore every pending order winning. All updates are O(1) dict arithmetic
+    with no awaits, so a check-and-reserve on order admission cannot interleave with another.
+    The book is per process (see the module comment) and seeded from pending orders in storage by `load`.
+    """
+
+    def __init__(self, max_exposure: float = MAX_SYMBOL_EXPOSURE / API_WORKERS):
+        self.max_exposure = max_exposure
+        self._symbols: Dict[str, Dict[str, float]] = {}
+        self.version = 0
+        self._changed = asyncio.Event()
+
+    def _notify(self):
+        self.version += 1
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def _apply(self, symbol: str, prediction: str, amount: float, count: int):
+        totals = self._symbols.setdefault(symbol, {"rise": 0.0, "fall": 0.0, "pending_orders": 0})
+        totals[prediction] += amount
+        totals["pending_orders"] += count
+        pending_orders.set(max(totals["pending_orders"], 0), symbol)
+        if totals["pending_orders"] <= 0:
+            del self._symbols[symbol]
+        self._notify()
+
+    @staticmethod
+    def _worst_case(totals: Dict[str, float]) -> float:
+        return (totals["rise"] + totals["fall"]) * PAYOUT_MULTIPLIER
+
+    def reserve(self, symbol: str, prediction: str, amount: float) -> bool:
+        """
+        Add a new order's stake unless it would push the symbol's worst-case payout past the limit.
+        :return: True if the stake was reserved, False if it was rejected
+        """
+        totals = self._symbols.get(symbol, {"rise": 0.0, "fall": 0.0})
+        if self._worst_case(totals) + amount * PAYOUT_MULTIPLIER > self.max_exposure:
+            return False
+        self._apply(symbol, prediction, amount, 1)
+        return True
+
+    def release(self, symbol: str, prediction: str, amount: float):
+        """
+        Remove an order's stake once it settles (or if placing it failed after `reserve`).
+        """
+        if symbol in self._symbols:
+            self._apply(symbol, prediction, -amount, -1)
+
+    def snapshot(self, symbol: Optional[str] = None) -> Dict[str, dict]:
+        """
+        Exposure per symbol: staked on each side, pending order count and worst-case payout.
+        """
+        symbols = {symbol: self._symbols[symbol]} if symbol in self._symbols else ({} if symbol else self._symbols)
+        return {
+            name: {
+                "rise": totals["rise"],
+                "fall": totals["fall"],
+                "pending_orders": totals["pending_orders"],
+                "worst_case_payout": self._worst_case(totals),
+                "limit": self.max_exposure,
+            }
+            for name, totals in symbols.items()
+        }
+
+    async def wait_for_change(self, version: int):
+        """
+        Wait until the book changes after `version`.
+        """
+        while self.version == version:
+            await self._changed.wait()
+
+    async def load(self):
+        """
+        Seed the book from pending orders with a single grouped query.
+        """
+        for symbol in self._symbols:
+            pending_orders.set(0, symbol)
+        self._symbols.clear()
+        for symbol, prediction, amount, count in await get_repository().pending_exposure():
+            if prediction in ("rise", "fall"):
+                self._apply(symbol, prediction, amount, count)
+        logger.info(f"Exposure book loaded for {len(self._symbols)} symbols.")
+
+
+exposure_book = ExposureBook()
@@ -0,0 +1,188 @@
+# trading_platform_backend/app/services/features.py
+
+# Vectorized feature pipeline for model inputs
+
+# Batch functions work on whole price histories without Python-level loops: windows are
+# strided views over one float32 array (no per-window copies) and the rolling statistics use
+# cumulative sums or linear filters. `FeatureTracker` maintains the same features per symbol
+# incrementally from live ticks, in amortized O(1) per tick.
+
+import math
+from collections import deque
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+from app.utils import recent_ticks
+
+VOLATILITY_WINDOW = 20  # Log returns per rolling volatility window
+EMA_SPANS = (12, 26)  # Spans of the tracked exponential moving averages
+
+
+def as_float32(prices: Sequence[float]) -> np.ndarray:
+    """
+    Prices as a contiguous float32 array (no copy if they already are one).
+    """
+    return np.ascontiguousarray(prices, dtype=np.float32)
+
+
+def sliding_windows(values: np.ndarray, time_steps: int) -> np.ndarray:
+    """
+    All windows of `time_steps` consecutive values, as a read-only strided view.
+    :return: Array of shape (len(values) - time_steps + 1, time_steps) sharing memory with `values`
+    """
+    return sliding_window_view(values, time_steps)
+
+
+def minmax_scale(values: np.ndarray, data_min: float, data_max: float) -> np.ndarray:
+    """
+    Scale values to [0, 1] given the range a model was fitted on (what `MinMaxScaler.transform` does).
+    """
+    scale = data_max - data_min
+    scaled = np.subtract(values, data_min, dtype=np.float32)
+    if scale:
+        scaled /= scale
+    return scaled
+
+
+def minmax_unscale(scaled: np.ndarray, data_min: float, data_max: float) -> np.ndarray:
+    """
+    Inverse of `minmax_scale`.
+    """
+    return np.asarray(scaled, dtype=np.float64) * (data_max - data_min) + data_min
+
+
+def lstm_training_data(prices: Sequence[float], time_steps: int) -> Tuple[np.ndarray, np.ndarray, float, float]:
+    """
+    Scaled training windows and targets for the LSTM: X[i] are the `time_steps` prices before y[i].
+    :return: X (strided view), y (view), and the price range the scaling was fitted on
+    """
+    prices = as_float32(prices)
+    data_min, data_max = float(prices.min()), float(prices.max())
+    scaled = minmax_scale(prices, data_min, data_max)
+    return sliding_windows(scaled[:-1], time_steps), scaled[time_steps:], data_min, data_max
+
+
+def log_returns(prices: Sequence[float]) -> np.ndarray:
+    """
+    Log returns between consecutive prices (one fewer than there are prices).
+    """
+    return np.diff(np.log(np.asarray(prices, dtype=np.float64))).astype(np.float32)
+
+
+def rolling_volatility(returns: np.ndarray, window: int = VOLATILITY_WINDOW) -> np.ndarray:
+    """
+    Sample standard deviation of every `window` consecutive returns, from cumulative sums.
+    :return: Array of len(returns) - window + 1 values
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    sums = np.cumsum(np.concatenate(([0.0], returns)))
+    squares = np.cumsum(np.concatenate(([0.0], returns * returns)))
+    window_sum = sums[window:] - sums[:-window]
+    window_squares = squares[window:] - squares[:-window]
+    variance = (window_squares - window_sum * window_sum / window) / (window - 1)
+    return np.sqrt(np.maximum(variance, 0.0)).astype(np.float32)
+
+
+def ema(values: Sequence[float], span: int) -> np.ndarray:
+    """
+    Exponential moving average seeded with the first value (pandas' `adjust=False`),
+    computed as a first-order linear filter.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values):
+        return values.astype(np.float32)
+    alpha = 2.0 / (span + 1)
+    smoothed, _ = lfilter([alpha], [1.0, alpha - 1.0], values, zi=[(1.0 - alpha) * values[0]])
+    return smoothed.astype(np.float32)
+
+
+class FeatureTracker:
+    """
+    Latest log return, rolling volatility and EMAs per symbol, updated from the ticks that
+    arrived since the previous call (see `app.utils.recent_ticks`).
+    """
+
+    def __init__(self, volatility_window: int = VOLATILITY_WINDOW, ema_spans: Tuple[int, ...] = EMA_SPANS):
+        self.volatility_window = volatility_window
+        self.ema_spans = ema_spans
+        self._state: Dict[str, dict] = {}
+
+    def _new_state(self, seq: int, price: float) -> dict:
+        return {
+            "seq": seq,
+            "price": price,
+            "log_return": None,
+            "returns": deque(maxlen=self.volatility_window),
+            "sum": 0.0,
+            "squares": 0.0,
+            "pushes": 0,
+            "emas": [price] * len(self.ema_spans),
+        }
+
+    def _push(self, state: dict, price: float):
+        log_return = math.log(price / state["price"])
+        returns = state["returns"]
+        if len(returns) == returns.maxlen:
+            oldest = returns[0]
+            state["sum"] -= oldest
+            state["squares"] -= oldest * oldest
+        returns.append(log_return)
+        state["sum"] += log_return
+        state["squares"] += log_return * log_return
+        state["pushes"] += 1
+        if state["pushes"] % returns.maxlen == 0:
+            # Re-derive the running sums once per window so rounding error cannot accumulate
+            state["sum"] = math.fsum(returns)
+            state["squares"] = math.fsum(r * r for r in returns)
+        for i, span in enumerate(self.ema_spans):
+            alpha = 2.0 / (span + 1)
+            state["emas"][i] += alpha * (price - state["emas"][i])
+        state["price"] = price
+        state["log_return"] = log_return
+
+    def update(self, symbol: str) -> Optional[dict]:
+        """
+        Absorb the symbol's new ticks and return its current features (None before the first tick).
+        """
+        ticks = recent_ticks.get(symbol)
+        state = self._state.get(symbol)
+        if state is None:
+            if not ticks:
+                return None
+            seq, _, price = ticks[0]
+            state = self._state[symbol] = self._new_state(seq, price)
+        new_ticks = []
+        for tick in reversed(ticks or ()):  # Newest first, so only the new ticks are visited
+            if tick[0] <= state["seq"]:
+                break
+            new_ticks.append(tick)
+        for seq, _, price in reversed(new_ticks):
+            if price > 0 and state["price"] > 0:
+                self._push(state, price)
+            state["seq"] = seq
+        return self.features(symbol)
+
+    def features(self, symbol: str) -> Optional[dict]:
+        """
+        The symbol's features as of the last `update`.
+        """
+        state = self._state.get(symbol)
+        if state is None:
+            return None
+        count = len(state["returns"])
+        volatility = None
+        if count > 1:
+            variance = (state["squares"] - state["sum"] * state["sum"] / count) / (count - 1)
+            volatility = math.sqrt(max(variance, 0.0))
+        return {
+            "price": state["price"],
+            "log_return": state["log_return"],
+            "volatility": volatility,
+            **{f"ema_{span}": value for span, value in zip(self.ema_spans, state["emas"])},
+        }
+
+
+feature_tracker = FeatureTracker()
@@ -0,0 +1,125 @@
+# trading_platform_backend/app/services/feed_capture.py
+
+# Capture files of raw price feed frames
+
+# A capture is gzip-compressed JSON lines, one record per websocket frame:
+#   {"t": <seconds since the capture started>, "source": "binance" | "kraken", "frame": "<raw text>"}
+# Files are named `<sources>_<UTC start, YYYYmmddTHHMMSS>.jsonl.gz`. Uncompressed `.jsonl` files
+# (e.g. benchmarks/fixtures/feed_frames.jsonl) are read the same way.
+# `record_feeds` writes captures from the live exchange feeds; app/services/feed_replay.py serves them.
+
+import asyncio
+import gzip
+import json
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from app.utils import (
+    BINANCE_WS_URL, KRAKEN_WS_URL, get_binance_subscription_message, get_kraken_subscription_message,
+    reconnect_with_backoff,
+)
+
+logger = logging.getLogger(__name__)
+
+FEED_SOURCES = ("binance", "kraken")
+CAPTURE_FLUSH_INTERVAL = 5.0  # Seconds between flushes of the compressed stream
+
+
+class CaptureWriter:
+    """
+    Appends frames to a compressed capture file, stamped with the time since the writer opened.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = gzip.open(self.path, "wt", encoding="utf-8")
+        self._started = time.monotonic()
+        self._flushed = self._started
+        self.frames = 0
+
+    def write(self, source: str, frame):
+        now = time.monotonic()
+        if isinstance(frame, bytes):
+            frame = frame.decode("utf-8", errors="replace")
+        self._file.write(json.dumps({"t": round(now - self._started, 6), "source": source, "frame": frame}) + "\n")
+        self.frames += 1
+        if now - self._flushed >= CAPTURE_FLUSH_INTERVAL:
+            self._file.flush()
+            self._flushed = now
+
+    def close(self):
+        self._file.close()
+
+
+def capture_path(directory: Path, sources: Sequence[str]) -> Path:
+    return Path(directory) / f"{'+'.join(sources)}_{datetime.utcnow():%Y%m%dT%H%M%S}.jsonl.gz"
+
+
+def read_capture(path: Path, sources: Optional[Sequence[str]] = None) -> Iterator[Tuple[float, str, str]]:
+    """
+    Frames of a capture file as (seconds since the capture started, source, raw frame), in file order.
+    :param sources: Only yield frames of these sources
+    """
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as capture:
+        for line in capture:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if sources is None or record["source"] in sources:
+                yield record["t"], record["source"], record["frame"]
+
+
+def load_capture(paths: Sequence[Path], source: str) -> List[Tuple[float, str]]:
+    """
+    One source's frames from several capture files, as (offset, frame) on one timeline:
+    each file continues where the previous one ended.
+    """
+    frames: List[Tuple[float, str]] = []
+    offset = 0.0
+    for path in paths:
+        last = 0.0
+        for t, _, frame in read_capture(path, [source]):
+            frames.append((offset + t, frame))
+            last = t
+        offset += last
+    return frames
+
+
+async def record_feeds(directory: Path, duration: Optional[float] = None,
+                       sources: Sequence[str] = FEED_SOURCES) -> Path:
+    """
+    Record the raw frames of the live exchange feeds into one capture file, reconnecting with
+    the same backoff as the API. Stops after `duration` seconds, or when cancelled.
+    :return: Path of the capture file
+    """
+    endpoints = {
+        "binance": (BINANCE_WS_URL, get_binance_subscription_message()),
+        "kraken": (KRAKEN_WS_URL, get_kraken_subscription_message()),
+    }
+    writer = CaptureWriter(capture_path(directory, sources))
+
+    def recorder(source: str):
+        async def on_message(message):
+            writer.write(source, message)
+
+        return on_message
+
+    tasks = [
+        asyncio.create_task(reconnect_with_backoff(*endpoints[source], on_message=recorder(source)))
+        for source in sources
+    ]
+    try:
+        await asyncio.wait(tasks, timeout=duration)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        writer.close()
+        logger.info(f"Recorded {writer.frames} frames to {writer.path}.")
+    return writer.path
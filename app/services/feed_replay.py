@@ -0,0 +1,170 @@
+# trading_platform_backend/app/services/feed_replay.py
+
+# Local websocket server replaying captured price feeds
+
+# Serves the frames of capture files (see app/services/feed_capture.py) at ws://<host>:<port>/binance
+# and ws://<host>:<port>/kraken, so the API can ingest real market shape offline: set
+# BINANCE_WS_URL and KRAKEN_WS_URL to those URLs and `reconnect_with_backoff` connects to the
+# replay instead of the exchanges.
+#
+# Each source plays like a live feed: one timeline, started by the first connection, broadcast to
+# every connected client, so a client misses the frames sent while it is disconnected. The timeline
+# pauses while the source has no client at all. Frames keep their recorded spacing divided by
+# `speed`, or are sent at a fixed synthetic `rate` per second; a player that falls behind still
+# yields to the event loop after every frame, so the server keeps accepting and closing connections.
+# Scripted disconnects (one per new connection, in order) drop a connection after some frames and
+# then refuse new connections for a while, to exercise the client's backoff.
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from http import HTTPStatus
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+import websockets
+
+from app.services.feed_capture import FEED_SOURCES, load_capture
+
+logger = logging.getLogger(__name__)
+
+REPLAY_HOST = "127.0.0.1"
+REPLAY_PORT = 8765
+
+
+@dataclass
+class ScriptedDisconnect:
+    after_frames: int  # Frames sent on the connection before it is dropped
+    downtime: float = 0.0  # Seconds during which new connections are refused afterwards
+    abort: bool = False  # Drop the TCP connection without a close frame
+
+    @classmethod
+    def parse(cls, spec: str) -> "ScriptedDisconnect":
+        """
+        Parse `FRAMES[:DOWNTIME][:abort]`, e.g. `500`, `500:10` or `500:10:abort`.
+        """
+        parts = spec.split(":")
+        if not 1 <= len(parts) <= 3 or (len(parts) == 3 and parts[2] != "abort"):
+            raise ValueError(f"Invalid disconnect {spec!r}; expected FRAMES[:DOWNTIME][:abort]")
+        return cls(int(parts[0]), float(parts[1]) if len(parts) > 1 else 0.0, len(parts) == 3)
+
+
+class FeedReplayServer:
+    """
+    Replays per-source frame timelines to websocket clients.
+    :param frames: source -> [(seconds since the capture started, raw frame)]
+    """
+
+    def __init__(self, frames: Dict[str, List[Tuple[float, str]]], speed: float = 1.0,
+                 rate: Optional[float] = None, disconnects: Sequence[ScriptedDisconnect] = (), loop: bool = False):
+        if speed <= 0 or (rate is not None and rate <= 0):
+            raise ValueError("speed and rate must be positive")
+        self.frames = frames
+        self.speed = speed
+        self.rate = rate
+        self.loop = loop
+        self._disconnects: Deque[ScriptedDisconnect] = deque(disconnects)
+        self._clients: Dict[str, Dict[object, list]] = {source: {} for source in frames}  # websocket -> [sent, disconnect]
+        self._players: Dict[str, asyncio.Task] = {}
+        self._joined: Dict[str, asyncio.Event] = {source: asyncio.Event() for source in frames}
+        self._refuse_until = 0.0
+        self._server = None
+        self.stats = {"connections": 0, "refused": 0, "frames_sent": 0, "disconnects": 0, "replays_finished": 0}
+
+    @classmethod
+    def from_captures(cls, paths: Sequence[Path], **options) -> "FeedReplayServer":
+        """
+        A server over capture files, played back to back.
+        """
+        return cls({source: load_capture(paths, source) for source in FEED_SOURCES}, **options)
+
+    async def start(self, host: str = REPLAY_HOST, port: int = REPLAY_PORT):
+        self._server = await websockets.serve(self._handle, host, port, process_request=self._admit)
+        logger.info(f"Replaying {', '.join(f'{s}: {len(f)} frames' for s, f in self.frames.items())} "
+                    f"on ws://{host}:{port}/<source>")
+
+    async def stop(self):
+        for player in self._players.values():
+            player.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    @staticmethod
+    def _source(path: str) -> str:
+        return path.split("?", 1)[0].strip("/")
+
+    async def _admit(self, path, request_headers):
+        if time.monotonic() < self._refuse_until:
+            self.stats["refused"] += 1
+            return HTTPStatus.SERVICE_UNAVAILABLE, [], b"Replay feed is down (scripted disconnect)\n"
+        if self._source(path) not in self.frames:
+            return HTTPStatus.NOT_FOUND, [], f"Unknown feed; expected one of {list(self.frames)}\n".encode()
+        return None
+
+    async def _handle(self, websocket):
+        source = self._source(websocket.path)
+        self.stats["connections"] += 1
+        disconnect = self._disconnects.popleft() if self._disconnects else None
+        self._clients[source][websocket] = [0, disconnect]
+        self._joined[source].set()
+        if source not in self._players:
+            self._players[source] = asyncio.create_task(self._play(source))
+        try:
+            async for _ in websocket:  # Subscription messages and anything else the client sends
+                pass
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            self._clients[source].pop(websocket, None)
+
+    async def _play(self, source: str):
+        frames = self.frames[source]
+        clock = asyncio.get_running_loop().time
+        while frames:
+            started, first = clock(), frames[0][0]
+            for i, (t, frame) in enumerate(frames):
+                if not self._clients[source]:
+                    paused = clock()
+                    await self._wait_for_client(source)
+                    started += clock() - paused
+                # Scheduled against the start of the pass, so pacing does not drift
+                due = started + (i / self.rate if self.rate else (t - first) / self.speed)
+                if due > clock():
+                    await asyncio.sleep(due - clock())
+                else:
+                    await asyncio.sleep(0)  # Behind schedule: let the server's own tasks run
+                self._broadcast(source, frame)
+            if not self.loop:
+                break
+        self.stats["replays_finished"] += 1
+        logger.info(f"Replay of {source} finished.")
+
+    async def _wait_for_client(self, source: str):
+        joined = self._joined[source]
+        while not self._clients[source]:
+            joined.clear()
+            await joined.wait()
+
+    def _broadcast(self, source: str, frame: str):
+        clients = self._clients[source]
+        websockets.broadcast(clients, frame)
+        self.stats["frames_sent"] += len(clients)
+        for websocket, state in list(clients.items()):
+            state[0] += 1
+            disconnect = state[1]
+            if disconnect is not None and state[0] >= disconnect.after_frames:
+                self._drop(websocket, disconnect)
+                del clients[websocket]
+
+    def _drop(self, websocket, disconnect: ScriptedDisconnect):
+        self.stats["disconnects"] += 1
+        self._refuse_until = time.monotonic() + disconnect.downtime
+        logger.info(f"Scripted disconnect after {disconnect.after_frames} frames "
+                    f"({'abort' if disconnect.abort else 'close'}, {disconnect.downtime}s down).")
+        if disconnect.abort:
+            websocket.transport.abort()
+        else:
+            asyncio.create_task(websocket.close(code=1012, reason="scripted disconnect"))
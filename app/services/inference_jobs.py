@@ -0,0 +1,31 @@
+# trading_platform_backend/app/services/inference_jobs.py
+
+# Model jobs executed inside the inference worker processes
+
+# Everything here runs in a spawned worker process (see app/services/inference_service.py), so
+# functions must be importable at module level and take/return picklable values. Heavy libraries
+# (statsmodels, TensorFlow) are imported inside the jobs so only the workers pay for them.
+
+from typing import List, Tuple
+
+import numpy as np
+
+
+def fit_arima_params(observations: List[float], order: Tuple[int, int, int]) -> np.ndarray:
+    """
+    Estimate ARIMA parameters for a series.
+    :return: The fitted parameter vector
+    """
+    from statsmodels.tsa.arima.model import ARIMA
+
+    return ARIMA(np.asarray(observations, dtype=float), order=order).fit().params
+
+
+def train_lstm(model_dir: str, symbol: str, historical_prices: List[float], epochs: int) -> int:
+    """
+    Train and register a new LSTM model version for a symbol.
+    :return: The new version number
+    """
+    from app.services.model_registry import ModelRegistry
+
+    return ModelRegistry(model_dir).train(symbol, historical_prices, epochs=epochs)
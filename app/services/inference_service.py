@@ -0,0 +1,152 @@
+# trading_platform_backend/app/services/inference_service.py
+
+# Process-pool service that runs model fitting and inference off the event loop
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from decouple import config
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_WORKERS = config("INFERENCE_WORKERS", default=2, cast=int)  # Worker processes
+INFERENCE_QUEUE_SIZE = config("INFERENCE_QUEUE_SIZE", default=16, cast=int)  # Jobs allowed to wait for a worker
+INFERENCE_JOB_TIMEOUT = config("INFERENCE_JOB_TIMEOUT", default=30, cast=float)  # Seconds per job by default
+INFERENCE_MAX_JOBS_PER_WORKER = config("INFERENCE_MAX_JOBS_PER_WORKER", default=200, cast=int)  # Jobs before a worker is replaced
+TRAINING_WORKERS = config("TRAINING_WORKERS", default=1, cast=int)  # Worker processes for model training
+TRAINING_JOB_TIMEOUT = config("TRAINING_JOB_TIMEOUT", default=600, cast=float)  # Seconds per training job
+
+
+class InferenceError(Exception):
+    """Base class for inference service failures."""
+
+
+class InferenceQueueFull(InferenceError):
+    """Raised when every worker is busy and the job queue is full."""
+
+
+class InferenceTimeout(InferenceError):
+    """Raised when a job does not finish within its timeout."""
+
+
+class InferenceService:
+    """
+    Runs model jobs (functions from `app/services/inference_jobs.py`) in a pool of spawned
+    worker processes so statsmodels/TensorFlow work never blocks the event loop.
+
+    - At most `max_workers + max_queue` jobs are admitted; beyond that `run` fails fast with
+      `InferenceQueueFull` instead of queueing unboundedly.
+    - Each job has a timeout. A job still waiting for a worker is cancelled; a job that is already
+      running cannot be interrupted, so the pool is recycled and its processes terminated.
+    - Cancelling the awaiting coroutine (e.g. the client went away) cancels a job not yet started.
+    - Each worker process is replaced after `max_jobs_per_worker` jobs to bound memory growth.
+    """
+
+    def __init__(
+        self,
+        name: str = "inference",
+        max_workers: int = INFERENCE_WORKERS,
+        max_queue: int = INFERENCE_QUEUE_SIZE,
+        job_timeout: float = INFERENCE_JOB_TIMEOUT,
+        max_jobs_per_worker: int = INFERENCE_MAX_JOBS_PER_WORKER,
+    ):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.job_timeout = job_timeout
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots = asyncio.Semaphore(max_workers + max_queue)
+        self.pending = 0  # Jobs currently admitted (running or waiting for a worker)
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "timeouts": 0, "recycles": 0}
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=self.max_jobs_per_worker,
+        )
+
+    def start(self):
+        """
+        Start the worker pool (idempotent).
+        """
+        if self._executor is None:
+            self._executor = self._new_executor()
+            logger.info(f"{self.name.capitalize()} service started with {self.max_workers} workers.")
+
+    async def shutdown(self):
+        """
+        Stop the worker pool, cancelling queued jobs.
+        """
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+            logger.info(f"{self.name.capitalize()} service stopped.")
+
+    def _recycle(self, executor: ProcessPoolExecutor):
+        """
+        Replace the pool and terminate the old one's processes (used when a job hangs or a worker dies).
+        Other jobs of the old pool fail with BrokenProcessPool; they must not recycle its replacement.
+        """
+        if executor is not self._executor:
+            return
+        self._executor = self._new_executor()
+        self.stats["recycles"] += 1
+        # ProcessPoolExecutor has no public way to kill running workers
+        for process in list(getattr(executor, "_processes", {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+        logger.warning(f"{self.name.capitalize()} worker pool recycled.")
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """
+        Run `fn(*args)` in a worker process and return its result.
+        :param fn: Module-level function to run (must be picklable, as must its arguments)
+        :param timeout: Seconds to wait for the result (defaults to `job_timeout`)
+        :raises InferenceQueueFull: if the job queue is full
+        :raises InferenceTimeout: if the job does not finish in time
+        """
+        if self._slots.locked():
+            self.stats["rejected"] += 1
+            raise InferenceQueueFull("Prediction service is busy")
+
+        async with self._slots:
+            self.start()
+            self.stats["submitted"] += 1
+            self.pending += 1
+            executor = self._executor
+            future = executor.submit(fn, *args)
+            try:
+                result = await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.job_timeout)
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                if not future.cancel():
+                    self._recycle(executor)
+                raise InferenceTimeout(f"Prediction job timed out after {timeout or self.job_timeout} seconds")
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for memory); start a fresh pool for later jobs
+                self.stats["failed"] += 1
+                self._recycle(executor)
+                raise InferenceError("Prediction worker crashed")
+            except Exception:
+                self.stats["failed"] += 1
+                raise
+            finally:
+                self.pending -= 1
+            self.stats["completed"] += 1
+            return result
+
+
+inference_service = InferenceService()
+# Training gets its own pool so long jobs never hold the workers that serve predictions
+training_service = InferenceService(
+    name="training", max_workers=TRAINING_WORKERS, max_queue=INFERENCE_QUEUE_SIZE, job_timeout=TRAINING_JOB_TIMEOUT
+)
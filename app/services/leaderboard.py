@@ -0,0 +1,145 @@
+# trading_platform_backend/app/services/leaderboard.py
+
+# In-memory leaderboard of top traders
+
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from sortedcontainers import SortedList
+
+from app.services.repository import OrderRecord, UserRecord, get_repository
+
+logger = logging.getLogger(__name__)
+
+LEADERBOARD_METRICS = ["wins", "net_payout", "win_rate"]
+MIN_SETTLED_FOR_WIN_RATE = 10  # Settled orders needed before a user is ranked by win rate
+LEADERBOARD_REFRESH_INTERVAL = 60  # Seconds between rebuilds from storage
+
+
+class Leaderboard:
+    """
+    Rankings of users by wins, net payout (paid out minus staked) and win rate.
+
+    Each ranking is a SortedList of (-score, user_id) tuples, so an order event moves a
+    user with one O(log n) removal and one O(log n) insertion, and a page is an index slice.
+    The counters are per process; `rebuild` reloads them from the materialized user stats.
+    """
+
+    def __init__(self):
+        self._users: Dict[str, dict] = {}
+        self._rankings: Dict[str, SortedList] = {metric: SortedList() for metric in LEADERBOARD_METRICS}
+
+    @staticmethod
+    def _scores(entry: dict) -> Dict[str, Optional[float]]:
+        settled = entry["wins"] + entry["losses"]
+        return {
+            "wins": entry["wins"],
+            "net_payout": entry["total_paid_out"] - entry["total_staked"],
+            "win_rate": entry["wins"] / settled if settled >= MIN_SETTLED_FOR_WIN_RATE else None,
+        }
+
+    def _unrank(self, user_id: str, entry: dict):
+        for metric, score in self._scores(entry).items():
+            if score is not None:
+                self._rankings[metric].discard((-score, user_id))
+
+    def _rank(self, user_id: str, entry: dict):
+        for metric, score in self._scores(entry).items():
+            if score is not None:
+                self._rankings[metric].add((-score, user_id))
+
+    def _update(self, user_id: str, username: Optional[str], **increments):
+        entry = self._users.get(user_id)
+        if entry is None:
+            entry = self._users[user_id] = {
+                "username": username, "orders": 0, "wins": 0, "losses": 0,
+                "total_staked": 0.0, "total_paid_out": 0.0,
+            }
+        else:
+            self._unrank(user_id, entry)
+        if username is not None:
+            entry["username"] = username
+        for field, amount in increments.items():
+            entry[field] += amount
+        self._rank(user_id, entry)
+
+    def order_placed(self, order: OrderRecord, user: UserRecord):
+        """
+        Count a newly placed order's stake.
+        """
+        self._update(str(user.id), user.username, orders=1, total_staked=order.amount)
+
+    def order_settled(self, order: OrderRecord, user: UserRecord):
+        """
+        Count a settled order's outcome and payout.
+        """
+        increments = {"total_paid_out": order.payout or 0.0}
+        if order.status == "win":
+            increments["wins"] = 1
+        elif order.status == "lose":
+            increments["losses"] = 1
+        self._update(str(user.id), user.username, **increments)
+
+    def page(self, metric: str, offset: int = 0, limit: int = 10) -> Tuple[int, List[dict]]:
+        """
+        Return (ranked user count, entries) for one page of a ranking.
+        :param metric: One of LEADERBOARD_METRICS
+        :param offset: Number of ranks to skip
+        :param limit: Page size
+        """
+        ranking = self._rankings[metric]
+        entries = []
+        for rank, (_, user_id) in enumerate(ranking.islice(offset, offset + limit), start=offset + 1):
+            entry = self._users[user_id]
+            scores = self._scores(entry)
+            entries.append({
+                "rank": rank,
+                "user_id": user_id,
+                "username": entry["username"],
+                "orders": entry["orders"],
+                "wins": entry["wins"],
+                "losses": entry["losses"],
+                "net_payout": scores["net_payout"],
+                "win_rate": scores["win_rate"],
+            })
+        return len(ranking), entries
+
+    async def rebuild(self):
+        """
+        Reload every user's counters from the stored user stats.
+        """
+        users: Dict[str, dict] = {}
+        for stats in await get_repository().user_stats():
+            users[stats["user_id"]] = {
+                "username": stats["username"],
+                "orders": stats["orders"],
+                "wins": stats["wins"],
+                "losses": stats["losses"],
+                "total_staked": stats["total_staked"],
+                "total_paid_out": stats["total_paid_out"],
+            }
+
+        rankings = {metric: SortedList() for metric in LEADERBOARD_METRICS}
+        for user_id, entry in users.items():
+            for metric, score in self._scores(entry).items():
+                if score is not None:
+                    rankings[metric].add((-score, user_id))
+
+        self._users, self._rankings = users, rankings
+        logger.info(f"Leaderboard rebuilt with {len(users)} users.")
+
+
+leaderboard = Leaderboard()
+
+
+async def refresh_leaderboard_periodically(interval: int = LEADERBOARD_REFRESH_INTERVAL):
+    """
+    Periodically rebuild the leaderboard so it also reflects orders settled by other workers.
+    """
+    while True:
+        try:
+            await leaderboard.rebuild()
+        except Exception as e:
+            logger.error(f"Failed to rebuild leaderboard: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,112 @@
+# trading_platform_backend/app/services/loop_watchdog.py
+
+# Event loop stall detector
+
+# A heartbeat task on the event loop stamps the time every LOOP_HEARTBEAT_INTERVAL seconds and
+# records how late each wake-up was (the event loop lag metrics). A daemon thread watches the
+# stamp: once it is older than LOOP_STALL_THRESHOLD, the loop is blocked, and the thread captures
+# the loop thread's stack, i.e. the code that is blocking it (a synchronous HTTP call, a model
+# fit, file I/O). When the loop resumes, the stall is logged with that stack, counted in the
+# metrics and kept in `recent_stalls` (served at /api/debug/stalls).
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Deque, List, Optional
+
+from decouple import config
+
+from app.services.metrics import LAG_BUCKETS, event_loop_lag, event_loop_lag_histogram, metrics
+
+logger = logging.getLogger(__name__)
+
+LOOP_HEARTBEAT_INTERVAL = 0.1  # Seconds between heartbeats
+LOOP_STALL_THRESHOLD = config("LOOP_STALL_THRESHOLD", default=0.25, cast=float)  # Seconds without a heartbeat
+LOOP_STALL_HISTORY = 100  # Stalls kept for /api/debug/stalls
+
+stalls_detected = metrics.counter("event_loop_stalls_total", "Event loop stalls longer than the threshold")
+stall_duration = metrics.histogram("event_loop_stall_seconds", "Duration of event loop stalls", buckets=LAG_BUCKETS)
+
+
+class LoopWatchdog:
+    """
+    Detects event loop stalls and captures the stack that caused them.
+    `start` must be called from the event loop to watch.
+    """
+
+    def __init__(self, threshold: float = LOOP_STALL_THRESHOLD, interval: float = LOOP_HEARTBEAT_INTERVAL,
+                 history: int = LOOP_STALL_HISTORY):
+        self.threshold = threshold
+        self.interval = interval
+        self.recent_stalls: Deque[dict] = deque(maxlen=history)
+        self.stats = {"stalls": 0, "max_stall_seconds": 0.0}
+        self._beat = time.perf_counter()
+        self._loop_thread_id: Optional[int] = None
+        self._stack: Optional[List[str]] = None  # Captured by the watcher during the current stall
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """
+        Start the heartbeat task on the running loop and the watcher thread.
+        """
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.perf_counter()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _heartbeat(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            lag = max(now - started - self.interval, 0.0)
+            self._beat = now
+            event_loop_lag.set(lag)
+            event_loop_lag_histogram.observe(lag)
+            if lag >= self.threshold:
+                self._record_stall(lag)
+            else:
+                self._stack = None
+
+    def _watch(self):
+        while not self._stop.wait(self.interval / 2):
+            # The heartbeat is due every `interval`, so a stall starts `interval` after the last beat
+            if self._stack is None and time.perf_counter() - self._beat > self.interval + self.threshold:
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is not None:
+                    self._stack = traceback.format_stack(frame)
+
+    def _record_stall(self, duration: float):
+        stack, self._stack = self._stack, None
+        stalls_detected.inc()
+        stall_duration.observe(duration)
+        self.stats["stalls"] += 1
+        self.stats["max_stall_seconds"] = max(self.stats["max_stall_seconds"], duration)
+        self.recent_stalls.append({
+            "ended_at": datetime.utcnow().isoformat(),
+            "duration_seconds": round(duration, 4),
+            "stack": stack or [],
+        })
+        logger.warning(
+            f"Event loop blocked for {duration:.3f}s. Blocking stack:\n{''.join(stack or ['(not captured)'])}"
+        )
+
+
+loop_watchdog = LoopWatchdog()
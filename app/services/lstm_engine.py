@@ -0,0 +1,113 @@
+# trading_platform_backend/app/services/lstm_engine.py
+
+# NumPy-only inference for the trained LSTM models
+
+# Serving only needs a forward pass through the small network built by `build_lstm_model`
+# (LSTM(50) -> LSTM(50) -> Dense(25) -> Dense(1); dropout is inactive at inference), so the
+# trained weights are exported to a .npz file and evaluated here without TensorFlow.
+# This module must not import TensorFlow: the API process serves predictions with it.
+
+import json
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0),
+    "tanh": np.tanh,
+    "sigmoid": lambda x: 0.5 * (np.tanh(0.5 * x) + 1.0),  # Overflow-free logistic
+}
+
+
+def export_lstm_weights(model, path: Path):
+    """
+    Save the weights and layer layout of a trained Keras model for `LstmEngine`.
+    :param model: Keras Sequential model built by `build_lstm_model`
+    :param path: Destination .npz file
+    """
+    layers, arrays = [], {}
+    for layer in model.layers:
+        kind = type(layer).__name__
+        if kind == "Dropout":
+            continue  # Identity at inference
+        if kind not in ("LSTM", "Dense"):
+            raise ValueError(f"Cannot export layer {layer.name} of type {kind}")
+        config = layer.get_config()
+        spec = {"kind": kind, "activation": config["activation"]}
+        if kind == "LSTM":
+            spec.update(recurrent_activation=config["recurrent_activation"], return_sequences=config["return_sequences"])
+        for name, weight in zip(("kernel", "recurrent_kernel", "bias") if kind == "LSTM" else ("kernel", "bias"),
+                                layer.get_weights()):
+            arrays[f"{len(layers)}.{name}"] = weight.astype(np.float32)
+        layers.append(spec)
+    with open(path, "wb") as f:
+        np.savez(f, layers=np.array(json.dumps(layers)), **arrays)
+
+
+class LstmEngine:
+    """
+    Forward pass of an exported LSTM model in float32 NumPy.
+    Keras LSTM weights hold the input, forget, cell and output gates side by side (in that order).
+    """
+
+    def __init__(self, layers: List[dict]):
+        for layer in layers:
+            for key in ("activation", "recurrent_activation"):
+                if key in layer and layer[key] not in ACTIVATIONS:
+                    raise ValueError(f"Unsupported activation {layer[key]}")
+        self.layers = layers
+
+    @classmethod
+    def load(cls, path: Path) -> "LstmEngine":
+        """
+        Load weights written by `export_lstm_weights`.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            layers = json.loads(str(data["layers"]))
+            for i, layer in enumerate(layers):
+                names = ("kernel", "recurrent_kernel", "bias") if layer["kind"] == "LSTM" else ("kernel", "bias")
+                layer.update({name: data[f"{i}.{name}"] for name in names})
+        return cls(layers)
+
+    @staticmethod
+    def _lstm(layer: dict, inputs: np.ndarray) -> np.ndarray:
+        activation = ACTIVATIONS[layer["activation"]]
+        recurrent_activation = ACTIVATIONS[layer["recurrent_activation"]]
+        recurrent_kernel = layer["recurrent_kernel"]
+        units = recurrent_kernel.shape[0]
+        batch, time_steps, _ = inputs.shape
+
+        # The input projection does not depend on the state, so do it for all steps at once
+        projected = inputs @ layer["kernel"] + layer["bias"]
+        h = np.zeros((batch, units), dtype=np.float32)
+        c = np.zeros((batch, units), dtype=np.float32)
+        outputs = []
+        for t in range(time_steps):
+            z = projected[:, t] + h @ recurrent_kernel
+            i = recurrent_activation(z[:, :units])
+            f = recurrent_activation(z[:, units:2 * units])
+            g = activation(z[:, 2 * units:3 * units])
+            o = recurrent_activation(z[:, 3 * units:])
+            c = f * c + i * g
+            h = o * activation(c)
+            if layer["return_sequences"]:
+                outputs.append(h)
+        return np.stack(outputs, axis=1) if layer["return_sequences"] else h
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Run the model on scaled windows.
+        :param X: Array of shape (batch, time_steps) or (batch, time_steps, 1)
+        :return: Scaled predictions of shape (batch, 1)
+        """
+        outputs = np.asarray(X, dtype=np.float32)
+        if outputs.ndim == 2:
+            outputs = outputs[..., np.newaxis]
+        for layer in self.layers:
+            if layer["kind"] == "LSTM":
+                outputs = self._lstm(layer, outputs)
+            else:
+                outputs = ACTIVATIONS[layer["activation"]](outputs @ layer["kernel"] + layer["bias"])
+        return outputs
@@ -6,23 +6,21 @@ import numpy as np
 import tensorflow as tf
 from sklearn.preprocessing import MinMaxScaler
 
+from app.services.features import lstm_training_data
+
 def prepare_data(prices, time_steps):
     """
     Prepare the dataset for LSTM, splitting it into features (X) and labels (y).
+    X is a strided float32 view of windows over the scaled prices (see app/services/features.py).
     :param prices: List of historical prices
     :param time_steps: Number of time steps to look back for predictions
     :return: Prepared data for training
     """
-    prices = np.array(prices)
-    scaler = MinMaxScaler(feature_range=(0, 1))
-    prices_scaled = scaler.fit_transform(prices.reshape(-1, 1))
-
-    X, y = [], []
-    for i in range(time_steps, len(prices_scaled)):
-        X.append(prices_scaled[i-time_steps:i, 0])
-        y.append(prices_scaled[i, 0])
+    X, y, data_min, data_max = lstm_training_data(prices, time_steps)
+    # The scaler is persisted with the model; fitting it on the range alone is enough
+    scaler = MinMaxScaler(feature_range=(0, 1)).fit(np.array([[data_min], [data_max]]))
 
-    return np.array(X), np.array(y), scaler
+    return X, y, scaler
 
 def build_lstm_model(time_steps):
     """
@@ -67,6 +65,8 @@ def make_predictions(model, X_test, scaler):
     :return: Predicted prices
     """
     X_test = np.reshape(X_test, (X_test.shape[0], X_test.shape[1], 1))
-    predictions = model.predict(X_test)
+    # Calling the model directly skips the per-call input pipeline of model.predict,
+    # which dominates the cost for the handful of windows predicted per request
+    predictions = model(X_test, training=False).numpy()
     predictions = scaler.inverse_transform(predictions)
     return predictions
@@ -0,0 +1,238 @@
+# trading_platform_backend/app/services/metrics.py
+
+# In-process metrics, exposed in the Prometheus text format at /metrics
+
+# Counters, gauges and histograms are plain dicts keyed by label values. Everything is recorded
+# from the event loop thread, so recording takes no lock: an increment is a dict lookup and an
+# add, a histogram observation adds a bisect over the bucket bounds. The `.stats` dicts of the
+# service singletons are exported at scrape time through collectors (see `register_collector`).
+
+import bisect
+import logging
+import math
+import time
+from typing import Callable, Dict, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+METRICS_PREFIX = "trading_"
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LAG_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Sequence[Tuple[str, object]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = METRICS_PREFIX + name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, object] = {}
+
+    def samples(self) -> List[Tuple[str, Sequence[Tuple[str, object]], float]]:
+        return [
+            (self.name, tuple(zip(self.labelnames, labelvalues)), value)
+            for labelvalues, value in self._values.items()
+        ]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *labelvalues, amount: float = 1.0):
+        """
+        :param labelvalues: One value per label name, in order
+        """
+        self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, *labelvalues):
+        self._values[labelvalues] = value
+
+    def inc(self, *labelvalues, amount: float = 1.0):
+        self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def dec(self, *labelvalues, amount: float = 1.0):
+        self.inc(*labelvalues, amount=-amount)
+
+
+class Ewma(Metric):
+    """
+    Exponentially weighted moving average of observations (exported as a gauge), weighted by
+    time: an observation `dt` seconds after the previous one moves the average by 1 - exp(-dt / tau).
+    The average reads as 0 once nothing has been observed for `stale_after` seconds.
+    """
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 tau: float = 5.0, stale_after: float = 30.0):
+        super().__init__(name, documentation, labelnames)
+        self.tau = tau
+        self.stale_after = stale_after
+
+    def observe(self, value: float, *labelvalues):
+        now = time.monotonic()
+        state = self._values.get(labelvalues)
+        if state is None:
+            self._values[labelvalues] = [value, now]
+            return
+        weight = 1.0 - math.exp(-(now - state[1]) / self.tau)
+        state[0] += (value - state[0]) * weight
+        state[1] = now
+
+    def value(self, *labelvalues) -> float:
+        state = self._values.get(labelvalues)
+        if state is None or time.monotonic() - state[1] > self.stale_after:
+            return 0.0
+        return state[0]
+
+    def samples(self) -> List[Tuple[str, Sequence[Tuple[str, object]], float]]:
+        return [
+            (self.name, tuple(zip(self.labelnames, labelvalues)), self.value(*labelvalues))
+            for labelvalues in self._values
+        ]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labelvalues):
+        state = self._values.get(labelvalues)
+        if state is None:
+            state = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect.bisect_left(self.buckets, value)] += 1  # Bucket `le` bounds are inclusive
+        state[1] += value
+
+    def samples(self) -> List[Tuple[str, Sequence[Tuple[str, object]], float]]:
+        samples = []
+        for labelvalues, (counts, total) in self._values.items():
+            labels = tuple(zip(self.labelnames, labelvalues))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                samples.append((self.name + "_bucket", labels + (("le", _format_value(bound)),), cumulative))
+            samples.append((self.name + "_count", labels, cumulative))
+            samples.append((self.name + "_sum", labels, total))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Holds the metrics and collectors of the process and renders them for a scrape.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Tuple[str, Callable[[], dict], Tuple[Tuple[str, object], ...]]] = []
+
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def ewma(self, name: str, documentation: str, labelnames: Sequence[str] = (), tau: float = 5.0) -> Ewma:
+        return self._register(Ewma(name, documentation, labelnames, tau))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, prefix: str, collect: Callable[[], dict], **labels):
+        """
+        Export the numeric entries of a stats dict as gauges named `<prefix>_<key>`, read at scrape time.
+        :param collect: Returns the stats dict, e.g. `lambda: tick_writer.stats`
+        :param labels: Constant labels of this collector's samples (several collectors may share a prefix)
+        """
+        self._collectors.append((prefix, collect, tuple(labels.items())))
+
+    def render(self) -> str:
+        """
+        All metrics in the Prometheus text exposition format (version 0.0.4).
+        """
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        collected: Dict[str, List[str]] = {}
+        for prefix, collect, labels in self._collectors:
+            try:
+                stats = collect()
+            except Exception as e:
+                logger.error(f"Metrics collector {prefix} failed: {e}")
+                continue
+            for key, value in stats.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    name = f"{METRICS_PREFIX}{prefix}_{key}"
+                    collected.setdefault(name, []).append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for name, samples in collected.items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+# Hot-path metrics
+
+ticks_received = metrics.counter(
+    "ticks_received_total", "Price ticks received from the feeds, by feed and symbol", ["source", "symbol"]
+)
+ticks_recorded = metrics.counter(
+    "ticks_recorded_total", "Price ticks recorded after update throttling, by feed and symbol", ["source", "symbol"]
+)
+message_latency = metrics.histogram(
+    "feed_message_seconds", "Time to process one price feed message (handle_message)", ["source"]
+)
+repository_latency = metrics.histogram(
+    "repository_operation_seconds", "Storage repository call latency", ["backend", "operation"]
+)
+recent_repository_latency = metrics.ewma(
+    "repository_recent_latency_seconds", "Moving average of order-path storage call latency", ["backend"]
+)
+order_placement_latency = metrics.histogram("order_placement_seconds", "Time to place an accepted order")
+order_rejections = metrics.counter("order_rejections_total", "Orders rejected, by reason", ["reason"])
+pending_orders = metrics.gauge("pending_orders", "Pending orders, by symbol", ["symbol"])
+settlement_lag = metrics.histogram(
+    "settlement_lag_seconds", "Settlement time minus order expiry", buckets=LAG_BUCKETS
+)
+websocket_clients = metrics.gauge("websocket_clients", "Connected websocket clients, by endpoint", ["endpoint"])
+event_loop_lag = metrics.gauge("event_loop_lag_seconds", "Latest event loop lag probe (see app.services.loop_watchdog)")
+event_loop_lag_histogram = metrics.histogram(
+    "event_loop_lag_probe_seconds", "Event loop lag probes", buckets=LATENCY_BUCKETS
+)
+
@@ -0,0 +1,263 @@
+# trading_platform_backend/app/services/model_registry.py
+
+# Registry of trained LSTM models, persisted to disk and versioned per symbol
+
+import fcntl
+import json
+import logging
+import os
+import shutil
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+import joblib
+import numpy as np
+from decouple import config
+
+from app.services.features import as_float32, minmax_scale, minmax_unscale
+from app.services.lstm_engine import LstmEngine, export_lstm_weights
+
+logger = logging.getLogger(__name__)
+
+MODEL_DIR = Path(config("MODEL_DIR", default="./models"))
+LSTM_TIME_STEPS = 5  # Look-back window of the LSTM
+LSTM_EPOCHS = 50  # Epochs per (re)training run
+DRIFT_TOLERANCE = 0.2  # Fraction of the recent window outside the training price range that counts as drift
+MAX_LOADED_MODELS = 32  # Inference engines kept resident per process
+MODEL_KEEP_VERSIONS = config("MODEL_KEEP_VERSIONS", default=5, cast=int)  # Newest versions kept per symbol
+WEIGHTS_FILE = "weights.npz"  # Exported weights served by `LstmEngine`
+
+
+class ModelRegistry:
+    """
+    Trained models keyed by symbol and version.
+
+    Each version lives in `<model_dir>/<kind>/<symbol>/v<version>/` as the Keras model, its
+    exported weights, the fitted scaler and a `meta.json`. Training (`train`) imports TensorFlow
+    lazily and runs in a training worker process (see `app/services/inference_jobs.py`);
+    inference (`engine`, `predict`) runs the exported weights with NumPy only.
+
+    Several processes may share the model directory: a version number is picked and its directory
+    moved into place under an exclusive `flock` on the symbol's `.lock` file, and the cached
+    metadata is re-read whenever the symbol's directory changes. Under the same lock, versions
+    older than the newest `keep_versions` are deleted.
+    """
+
+    def __init__(
+        self,
+        model_dir: Path = MODEL_DIR,
+        kind: str = "lstm",
+        time_steps: int = LSTM_TIME_STEPS,
+        keep_versions: int = MODEL_KEEP_VERSIONS,
+    ):
+        self.model_dir = Path(model_dir)
+        self.root = self.model_dir / kind
+        self.time_steps = time_steps
+        self.keep_versions = max(keep_versions, 1)
+        self.tracked_symbols: Set[str] = set()  # Symbols predictions were requested for
+        self.drifted_symbols: Set[str] = set()  # Symbols whose recent prices left the training range
+        self._meta: Dict[str, dict] = {}
+        self._meta_mtimes: Dict[str, int] = {}  # Modification time of the symbol directory when read
+        self._engines: Dict[tuple, dict] = {}  # Resident engines by (symbol, version), oldest first
+
+    def _symbol_dir(self, symbol: str) -> Path:
+        return self.root / symbol.replace("/", "_")
+
+    def versions(self, symbol: str) -> List[int]:
+        """
+        List the stored versions of a symbol's model, oldest first.
+        """
+        symbol_dir = self._symbol_dir(symbol)
+        if not symbol_dir.is_dir():
+            return []
+        return sorted(int(path.name[1:]) for path in symbol_dir.glob("v*") if path.name[1:].isdigit())
+
+    def _dir_mtime(self, symbol: str) -> Optional[int]:
+        try:
+            return self._symbol_dir(symbol).stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    @contextmanager
+    def _locked(self, symbol: str):
+        symbol_dir = self._symbol_dir(symbol)
+        symbol_dir.mkdir(parents=True, exist_ok=True)
+        with open(symbol_dir / ".lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield symbol_dir
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def refresh(self, symbol: str) -> Optional[dict]:
+        """
+        Re-read the metadata of the symbol's latest version from disk.
+        """
+        self._meta_mtimes[symbol] = self._dir_mtime(symbol)
+        versions = self.versions(symbol)
+        if not versions:
+            self._meta.pop(symbol, None)
+            return None
+        meta = json.loads((self._symbol_dir(symbol) / f"v{versions[-1]}" / "meta.json").read_text())
+        if self._meta.get(symbol, {}).get("version") != meta["version"]:
+            self.drifted_symbols.discard(symbol)
+        self._meta[symbol] = meta
+        return meta
+
+    def latest_meta(self, symbol: str) -> Optional[dict]:
+        """
+        Metadata of the symbol's latest version (cached until the symbol's directory changes,
+        e.g. when another process registers a version).
+        """
+        if symbol in self._meta and self._meta_mtimes.get(symbol) == self._dir_mtime(symbol):
+            return self._meta[symbol]
+        return self.refresh(symbol)
+
+    def save(self, symbol: str, model, scaler, meta: dict) -> int:
+        """
+        Persist a trained model as the symbol's next version.
+        :return: The new version number
+        """
+        # Written outside the lock, under a name no other process uses (and `versions` ignores)
+        tmp_dir = self._symbol_dir(symbol) / f".tmp-{os.getpid()}-{uuid.uuid4().hex}"
+        tmp_dir.mkdir(parents=True)
+        try:
+            model.save(tmp_dir / "model.keras")
+            export_lstm_weights(model, tmp_dir / WEIGHTS_FILE)
+            joblib.dump(scaler, tmp_dir / "scaler.joblib")
+
+            with self._locked(symbol) as symbol_dir:
+                version = max(self.versions(symbol), default=0) + 1
+                meta = {**meta, "symbol": symbol, "version": version}
+                (tmp_dir / "meta.json").write_text(json.dumps(meta))
+                os.replace(tmp_dir, symbol_dir / f"v{version}")
+                self._prune(symbol)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)  # Left behind only if saving failed
+
+        self.refresh(symbol)
+        logger.info(f"Registered {symbol} model version {version}.")
+        return version
+
+    def _prune(self, symbol: str):
+        """
+        Delete the versions older than the newest `keep_versions` (called under the symbol's lock).
+        Each is first renamed out of the `v<version>` namespace, so `versions` never lists a
+        half-deleted directory.
+        """
+        symbol_dir = self._symbol_dir(symbol)
+        for version in self.versions(symbol)[:-self.keep_versions]:
+            doomed = symbol_dir / f".pruned-{version}-{uuid.uuid4().hex}"
+            os.replace(symbol_dir / f"v{version}", doomed)
+            shutil.rmtree(doomed, ignore_errors=True)
+            logger.info(f"Pruned {symbol} model version {version}.")
+
+    def load(self, symbol: str, version: Optional[int] = None) -> Optional[dict]:
+        """
+        Load the inference engine of a stored version (the latest by default) from disk.
+        :return: None if the symbol has no such version (never trained, or pruned)
+        """
+        versions = self.versions(symbol)
+        version = version or (versions[-1] if versions else None)
+        if version not in versions:
+            return None
+        version_dir = self._symbol_dir(symbol) / f"v{version}"
+        if not (version_dir / WEIGHTS_FILE).exists():
+            raise ValueError(
+                f"LSTM model {symbol} v{version} has no exported weights; run scripts/export_lstm_weights.py"
+            )
+        return {
+            "version": version,
+            "model": LstmEngine.load(version_dir / WEIGHTS_FILE),
+            "meta": json.loads((version_dir / "meta.json").read_text()),
+        }
+
+    def load_keras(self, symbol: str, version: int) -> dict:
+        """
+        Load the Keras model and scaler of a stored version (imports TensorFlow).
+        """
+        import tensorflow as tf
+
+        version_dir = self._symbol_dir(symbol) / f"v{version}"
+        return {
+            "version": version,
+            "model": tf.keras.models.load_model(version_dir / "model.keras"),
+            "scaler": joblib.load(version_dir / "scaler.joblib"),
+            "meta": json.loads((version_dir / "meta.json").read_text()),
+        }
+
+    def export(self, symbol: str, version: int) -> Path:
+        """
+        (Re-)export the weights of a stored version for NumPy inference (imports TensorFlow).
+        """
+        path = self._symbol_dir(symbol) / f"v{version}" / WEIGHTS_FILE
+        export_lstm_weights(self.load_keras(symbol, version)["model"], path)
+        return path
+
+    def engine(self, symbol: str, version: int) -> dict:
+        """
+        The inference engine of a stored version, kept resident after the first load.
+        """
+        key = (symbol, version)
+        if key not in self._engines:
+            entry = self.load(symbol, version)
+            if entry is None:
+                raise ValueError(f"No trained LSTM model for {symbol}")
+            for stale in [loaded for loaded in self._engines if loaded[0] == symbol]:
+                del self._engines[stale]  # Older versions of the same model
+            while len(self._engines) >= MAX_LOADED_MODELS:
+                del self._engines[next(iter(self._engines))]
+            self._engines[key] = entry
+        return self._engines[key]
+
+    def train(self, symbol: str, historical_prices: List[float], epochs: int = LSTM_EPOCHS) -> int:
+        """
+        Train a fresh model on the given history and register it.
+        :return: The new version number
+        """
+        from app.services.lstm_model import prepare_data, build_lstm_model, train_lstm_model
+
+        if len(historical_prices) <= self.time_steps:
+            raise ValueError("Not enough data to train a model")
+
+        X, y, scaler = prepare_data(historical_prices, self.time_steps)
+        model = build_lstm_model(self.time_steps)
+        train_lstm_model(model, X, y, epochs=epochs)
+        meta = {
+            "trained_at": datetime.utcnow().isoformat(),
+            "time_steps": self.time_steps,
+            "samples": len(historical_prices),
+            "epochs": epochs,
+            "data_min": float(scaler.data_min_[0]),
+            "data_max": float(scaler.data_max_[0]),
+        }
+        return self.save(symbol, model, scaler, meta)
+
+    def predict(self, entry: dict, historical_prices: List[float]) -> float:
+        """
+        Predict the next price from the latest window of prices with a loaded engine.
+        Scaling uses the price range stored in the metadata, like the persisted scaler.
+        """
+        meta = entry["meta"]
+        window = as_float32(historical_prices[-self.time_steps:])
+        X = minmax_scale(window, meta["data_min"], meta["data_max"]).reshape(1, self.time_steps)
+        return float(minmax_unscale(entry["model"].predict(X), meta["data_min"], meta["data_max"])[-1][0])
+
+    def check_drift(self, symbol: str, meta: dict, historical_prices: List[float]) -> bool:
+        """
+        Flag the symbol for retraining when too much of the recent window falls outside
+        the price range the model's scaler was fitted on.
+        """
+        recent = np.array(historical_prices[-self.time_steps * 4:], dtype=float)
+        low, high = meta["data_min"], meta["data_max"]
+        outside = np.mean((recent < low) | (recent > high)) if len(recent) else 0.0
+        if outside > DRIFT_TOLERANCE:
+            self.drifted_symbols.add(symbol)
+            return True
+        return False
+
+
+lstm_registry = ModelRegistry()
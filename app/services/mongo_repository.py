@@ -0,0 +1,276 @@
+# trading_platform_backend/app/services/mongo_repository.py
+
+# MongoDB implementation of the storage repository
+
+# Works on the raw Motor collections of the Beanie models (no document validation on the
+# hot paths); balance changes and settlement are single atomic updates. Writes to balances and
+# orders use the "ledger" write concern, tick and price writes the relaxed "ticks" one.
+#
+# A winning settlement spans two documents and is made idempotent instead of transactional
+# (transactions need a replica set): the order is settled with `credited: False`, then the user's
+# balance is incremented together with a push of the order id onto `pending_credits`, guarded by
+# the id not being there yet, then the order is marked credited and the id pulled. A credit
+# interrupted at any step is completed exactly once by `reconcile_payouts`.
+
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+
+from app.database import with_write_concern
+from app.models import MongoOrder, MongoPriceTick, MongoTradingPair, MongoUser, MongoUserStats
+from app.services.repository import (
+    STATS_FIELDS, OrderRecord, Repository, UserRecord, instrument_repository, ticks_to_arrays
+)
+
+logger = logging.getLogger(__name__)
+
+TICK_LOAD_BATCH_SIZE = 10000  # Documents per cursor batch when loading history
+USER_FIELDS = {"username": 1, "email": 1, "balance": 1, "is_active": 1}
+
+
+def _ledger(model):
+    return with_write_concern(model.get_motor_collection(), "ledger")
+
+
+def _ticks(model):
+    return with_write_concern(model.get_motor_collection(), "ticks")
+
+
+def _object_id(value) -> Optional[ObjectId]:
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        return None
+
+
+def _user(document: dict) -> UserRecord:
+    return UserRecord(
+        id=str(document["_id"]),
+        username=document.get("username"),
+        email=document.get("email"),
+        balance=document.get("balance", 0.0),
+        is_active=document.get("is_active", True),
+    )
+
+
+def _order(document: dict) -> OrderRecord:
+    return OrderRecord(
+        id=str(document["_id"]),
+        user_id=str(document["user_id"]),
+        symbol=document["symbol"],
+        amount=document["amount"],
+        prediction=document["prediction"],
+        trade_time=document["trade_time"],
+        locked_price=document["locked_price"],
+        start_time=document["start_time"],
+        status=document.get("status", "pending"),
+        payout=document.get("payout"),
+    )
+
+
+def _time_filter(symbol: str, start: Optional[datetime], end: Optional[datetime]) -> dict:
+    query = {"symbol": symbol}
+    if start is not None or end is not None:
+        query["timestamp"] = {}
+        if start is not None:
+            query["timestamp"]["$gte"] = start
+        if end is not None:
+            query["timestamp"]["$lt"] = end
+    return query
+
+
+@instrument_repository
+class MongoRepository(Repository):
+    name = "mongo"
+
+    async def get_user(self, user_id: str) -> Optional[UserRecord]:
+        object_id = _object_id(user_id)
+        if object_id is None:
+            return None
+        document = await MongoUser.get_motor_collection().find_one({"_id": object_id}, USER_FIELDS)
+        return _user(document) if document else None
+
+    async def get_users(self, user_ids: Iterable[str]) -> Dict[str, UserRecord]:
+        object_ids = [object_id for object_id in map(_object_id, user_ids) if object_id is not None]
+        cursor = MongoUser.get_motor_collection().find({"_id": {"$in": object_ids}}, USER_FIELDS)
+        return {str(document["_id"]): _user(document) async for document in cursor}
+
+    async def find_user_by_username(self, username: str) -> Optional[UserRecord]:
+        document = await MongoUser.get_motor_collection().find_one({"username": username}, USER_FIELDS)
+        return _user(document) if document else None
+
+    async def create_user(self, username: str, email: str, hashed_password: str,
+                          balance: float = 0.0, is_active: bool = True) -> UserRecord:
+        user = MongoUser(username=username, email=email, hashed_password=hashed_password,
+                         balance=balance, is_active=is_active)
+        await user.insert()
+        return UserRecord(str(user.id), username, email, balance, is_active)
+
+    async def adjust_balance(self, user_id: str, delta: float,
+                             min_balance: Optional[float] = None) -> Optional[UserRecord]:
+        object_id = _object_id(user_id)
+        if object_id is None:
+            return None
+        query = {"_id": object_id}
+        if min_balance is not None:
+            query["balance"] = {"$gte": min_balance}
+        document = await _ledger(MongoUser).find_one_and_update(
+            query, {"$inc": {"balance": delta}}, projection=USER_FIELDS, return_document=ReturnDocument.AFTER
+        )
+        return _user(document) if document else None
+
+    async def upsert_price(self, symbol: str, price: float):
+        await _ticks(MongoTradingPair).update_one(
+            {"symbol": symbol}, {"$set": {"price": price}}, upsert=True
+        )
+
+    async def get_price(self, symbol: str) -> Optional[float]:
+        document = await MongoTradingPair.get_motor_collection().find_one({"symbol": symbol}, {"price": 1})
+        return document["price"] if document else None
+
+    async def list_prices(self) -> Dict[str, float]:
+        cursor = MongoTradingPair.get_motor_collection().find({}, {"_id": 0, "symbol": 1, "price": 1})
+        return {document["symbol"]: document["price"] async for document in cursor}
+
+    async def insert_ticks(self, ticks: List[Tuple[str, float, float]]):
+        documents = [
+            {"symbol": symbol, "timestamp": datetime.utcfromtimestamp(timestamp), "price": price}
+            for symbol, timestamp, price in ticks
+        ]
+        if documents:
+            await _ticks(MongoPriceTick).insert_many(documents, ordered=False)
+
+    async def recent_prices(self, symbol: str, limit: int = 100) -> List[float]:
+        cursor = MongoPriceTick.get_motor_collection().find(
+            {"symbol": symbol}, {"_id": 0, "price": 1}
+        ).sort([("timestamp", -1), ("_id", -1)]).limit(limit)
+        return [document["price"] for document in reversed(await cursor.to_list(None))]
+
+    async def load_ticks(self, symbol: str, start: Optional[datetime] = None,
+                         end: Optional[datetime] = None) -> Tuple[np.ndarray, np.ndarray]:
+        cursor = MongoPriceTick.get_motor_collection().find(
+            _time_filter(symbol, start, end), {"_id": 0, "timestamp": 1, "price": 1}
+        ).sort([("timestamp", 1), ("_id", 1)]).batch_size(TICK_LOAD_BATCH_SIZE)
+        timestamps, prices = [], []
+        async for document in cursor:
+            timestamps.append(document["timestamp"])
+            prices.append(document["price"])
+        return ticks_to_arrays(timestamps, prices)
+
+    async def tick_symbols(self) -> List[str]:
+        return sorted(await MongoPriceTick.get_motor_collection().distinct("symbol"))
+
+    async def insert_order(self, order: OrderRecord) -> OrderRecord:
+        document = {
+            "user_id": ObjectId(order.user_id),
+            "symbol": order.symbol,
+            "amount": order.amount,
+            "prediction": order.prediction,
+            "trade_time": order.trade_time,
+            "start_time": order.start_time,
+            "locked_price": order.locked_price,
+            "status": order.status,
+            "payout": order.payout,
+        }
+        result = await _ledger(MongoOrder).insert_one(document)
+        order.id = str(result.inserted_id)
+        return order
+
+    async def get_order(self, order_id: str) -> Optional[OrderRecord]:
+        object_id = _object_id(order_id)
+        if object_id is None:
+            return None
+        document = await MongoOrder.get_motor_collection().find_one({"_id": object_id})
+        return _order(document) if document else None
+
+    async def settle_order(self, order_id: str, status: str, payout: float) -> Optional[OrderRecord]:
+        object_id = _object_id(order_id)
+        if object_id is None:
+            return None
+        document = await _ledger(MongoOrder).find_one_and_update(
+            {"_id": object_id, "status": "pending"},
+            {"$set": {"status": status, "payout": payout, "credited": not payout}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if not document:
+            return None
+        if payout:
+            try:
+                await self._credit(document)
+            except Exception:
+                logger.exception(f"Crediting the payout of order {order_id} failed; reconcile_payouts will retry it.")
+        return _order(document)
+
+    async def _credit(self, order: dict):
+        """
+        Idempotently credit a settled order's payout (see the module comment).
+        """
+        await _ledger(MongoUser).update_one(
+            {"_id": order["user_id"], "pending_credits": {"$ne": order["_id"]}},
+            {"$inc": {"balance": order["payout"]}, "$push": {"pending_credits": order["_id"]}},
+        )
+        await _ledger(MongoOrder).update_one({"_id": order["_id"]}, {"$set": {"credited": True}})
+        await _ledger(MongoUser).update_one({"_id": order["user_id"]}, {"$pull": {"pending_credits": order["_id"]}})
+
+    async def reconcile_payouts(self) -> int:
+        credited = 0
+        async for document in MongoOrder.get_motor_collection().find({"credited": False}):
+            await self._credit(document)
+            credited += 1
+        return credited
+
+    async def count_pending_orders(self, user_id: str) -> int:
+        object_id = _object_id(user_id)
+        if object_id is None:
+            return 0
+        return await MongoOrder.get_motor_collection().count_documents({"user_id": object_id, "status": "pending"})
+
+    async def active_orders(self, since: datetime) -> List[OrderRecord]:
+        cursor = MongoOrder.get_motor_collection().find({
+            "$or": [
+                {"status": "pending"},
+                {"start_time": {"$gte": since}}
+            ]
+        })
+        return [_order(document) async for document in cursor]
+
+    async def pending_exposure(self) -> List[Tuple[str, str, float, int]]:
+        pipeline = [
+            {"$match": {"status": "pending"}},
+            {"$group": {
+                "_id": {"symbol": "$symbol", "prediction": "$prediction"},
+                "amount": {"$sum": "$amount"},
+                "count": {"$sum": 1},
+            }},
+        ]
+        rows = await MongoOrder.get_motor_collection().aggregate(pipeline).to_list(None)
+        return [(row["_id"]["symbol"], row["_id"]["prediction"], row["amount"], row["count"]) for row in rows]
+
+    async def increment_user_stats(self, user: UserRecord, increments: Dict[str, float]):
+        await MongoUserStats.get_motor_collection().update_one(
+            {"user_id": ObjectId(user.id)},
+            {
+                "$inc": increments,
+                "$set": {"username": user.username, "email": user.email},
+                # Every counter exists from the first upsert, so e.g. `wins <= 0` matches users without wins
+                "$setOnInsert": {name: 0 for name in STATS_FIELDS if name not in increments},
+            },
+            upsert=True,
+        )
+
+    async def user_stats(self) -> List[dict]:
+        cursor = MongoUserStats.get_motor_collection().find({}, {"_id": 0})
+        return [
+            {
+                "user_id": str(document["user_id"]),
+                "username": document.get("username"),
+                "email": document.get("email"),
+                **{name: document.get(name, 0) for name in STATS_FIELDS},
+            }
+            async for document in cursor
+        ]
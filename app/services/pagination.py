@@ -0,0 +1,99 @@
+# trading_platform_backend/app/services/pagination.py
+
+# Keyset (cursor) pagination and NDJSON streaming helpers for MongoDB listings
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from bson import ObjectId, json_util
+from bson.errors import InvalidId
+from fastapi import HTTPException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"  # Response header carrying the cursor for the next page
+STREAM_BATCH_SIZE = 500  # Documents fetched per round trip when streaming exports
+
+
+def encode_cursor(value: Any, last_id: ObjectId) -> str:
+    """
+    Encode the sort key and `_id` of the last row of a page into an opaque cursor.
+    :param value: Value of the sort field on the last row (datetime, number or string)
+    :param last_id: `_id` of the last row, used as a tie-breaker
+    :return: URL-safe cursor string
+    """
+    raw = json_util.dumps({"v": value, "id": ObjectId(str(last_id))})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, ObjectId]:
+    """
+    Decode a cursor produced by `encode_cursor`.
+    :param cursor: Opaque cursor string from a previous page
+    :return: (sort value, last `_id`)
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json_util.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        return data["v"], ObjectId(data["id"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
+
+
+def keyset_filter(field: str, value: Any, last_id: ObjectId, descending: bool) -> Dict:
+    """
+    Build the filter selecting rows strictly after (`value`, `last_id`) in (`field`, `_id`) order.
+    """
+    op = "$lt" if descending else "$gt"
+    return {"$or": [
+        {field: {op: value}},
+        {field: value, "_id": {op: last_id}},
+    ]}
+
+
+def apply_cursor(query_filters: Dict, field: str, cursor: Optional[str], descending: bool) -> Dict:
+    """
+    Combine an existing query filter with the keyset filter for `cursor` (if any).
+    """
+    if not cursor:
+        return query_filters
+    value, last_id = decode_cursor(cursor)
+    keyset = keyset_filter(field, value, last_id, descending)
+    if not query_filters:
+        return keyset
+    return {"$and": [query_filters, keyset]}
+
+
+def keyset_sort(field: str, descending: bool) -> List[Tuple[str, int]]:
+    """
+    Sort specification matching `keyset_filter`: the sort field, then `_id` as tie-breaker.
+    """
+    direction = -1 if descending else 1
+    return [(field, direction), ("_id", direction)]
+
+
+def _json_default(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+async def stream_ndjson(
+    collection,
+    query_filters: Dict,
+    sort: List[Tuple[str, int]],
+    projection: Optional[Dict] = None,
+    batch_size: int = STREAM_BATCH_SIZE,
+) -> AsyncIterator[str]:
+    """
+    Stream the matching documents as newline-delimited JSON, one batch in memory at a time.
+    :param collection: Motor collection to read from
+    :param query_filters: MongoDB filter
+    :param sort: Sort specification
+    :param projection: Optional projection limiting the returned fields
+    :param batch_size: Documents fetched per round trip
+    """
+    cursor = collection.find(query_filters, projection).sort(sort).batch_size(batch_size)
+    async for document in cursor:
+        document["id"] = document.pop("_id")
+        yield json.dumps(document, default=_json_default) + "\n"
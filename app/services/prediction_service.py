@@ -2,116 +2,303 @@
 
 # Business logic for price forecasting
 
-import pandas as pd
-from statsmodels.tsa.arima.model import ARIMA
-from app.services.lstm_model import prepare_data, build_lstm_model, train_lstm_model, make_predictions
-from app.database import SessionLocal
-from app.models import TradingPair, MongoTradingPair
-from sqlalchemy.orm import Session
+# ARIMA fitting and LSTM training run in worker process pools (app/services/inference_service.py),
+# so the event loop is never blocked by them. LSTM inference runs in-process on the exported
+# weights with NumPy (app/services/lstm_engine.py), which takes well under a millisecond.
 
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional
 
-# ARIMA Forecasting for SQLAlchemy (Relational Database)
-def forecast_prices_arima_sqlalchemy(historical_prices):
+from app.services.arima_forecaster import arima_forecasters
+from app.services.inference_jobs import train_lstm
+from app.services.inference_service import InferenceError, inference_service, training_service
+from app.services.model_registry import LSTM_EPOCHS, lstm_registry
+from app.services.repository import STORAGE_BACKEND, get_repository
+from app.utils import tick_versions
+
+logger = logging.getLogger(__name__)
+
+RETRAIN_INTERVAL = 3600  # Seconds before a symbol's LSTM model is retrained
+RETRAIN_CHECK_INTERVAL = 60  # Seconds between checks for stale or drifted models
+PREDICTION_CACHE_TTL = 5.0  # Seconds a prediction is served from the cache
+PREDICTION_CACHE_SIZE = 1024  # Predictions kept before the least recently used are evicted
+
+# In-flight background training runs, by symbol
+_training_tasks: Dict[str, asyncio.Task] = {}
+
+
+class PredictionCache:
     """
-    Forecast the next price based on historical data using ARIMA.
-    :param historical_prices: List of historical price data.
-    :return: Predicted next price.
+    Single-flight cache of prediction results with TTL and LRU eviction.
+
+    Keys include the symbol's data version (its tick sequence number, and the model version for
+    LSTM), so a new tick or model makes a fresh key rather than serving a stale result. Concurrent
+    requests for a key that is being computed await the same task instead of starting their own
+    model fit; the task is shielded, so one caller going away does not cancel it for the others.
+    Failures are not cached.
     """
-    if len(historical_prices) < 10:  # Ensure there's enough data for ARIMA
-        raise ValueError("Not enough data to perform prediction")
 
-    # Convert to DataFrame for ARIMA model
-    df = pd.DataFrame(historical_prices, columns=['price'])
+    def __init__(self, ttl: float = PREDICTION_CACHE_TTL, maxsize: int = PREDICTION_CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, expires_at)
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+
+    def _store(self, key: Hashable, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        self._entries[key] = (task.result(), time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable]):
+        """
+        Return the cached value for `key`, or await the computation of it (joining one in flight).
+        :param compute: Coroutine function producing the value
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry[0]
+            del self._entries[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["misses"] += 1
+            task = asyncio.ensure_future(compute())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._store(key, done))
+        return await asyncio.shield(task)
+
+    def snapshot(self) -> dict:
+        """
+        Counters plus the current number of cached and in-flight predictions.
+        """
+        return {**self.stats, "entries": len(self._entries), "in_flight": len(self._inflight)}
 
-    # Fit the ARIMA model
-    model = ARIMA(df['price'], order=(5, 1, 0))
-    model_fit = model.fit()
+    def clear(self):
+        self._entries.clear()
 
-    # Forecast the next price (1 step ahead)
-    forecast = model_fit.forecast(steps=1)[0]
-    return forecast
 
+prediction_cache = PredictionCache()
 
-async def forecast_prices_arima_mongo(symbol: str):
+
+def _cache_key(symbol: str, model: str, source: str) -> tuple:
+    model_version = None
+    if model == "lstm":
+        meta = lstm_registry.latest_meta(symbol)
+        model_version = meta["version"] if meta else None
+    return symbol, model, source, tick_versions.get(symbol, 0), model_version
+
+
+async def fetch_price_history(symbol: str, limit: int = 100, source: Optional[str] = None) -> List[float]:
     """
-    Forecast the next price based on historical data from MongoDB using ARIMA.
+    Fetch the latest `limit` recorded prices for a symbol, oldest first.
+    :param source: Storage backend to read from (STORAGE_BACKEND by default)
+    """
+    return await get_repository(source).recent_prices(symbol, limit)
+
+
+async def forecast_prices_arima(symbol: str, source: Optional[str] = None):
+    """
+    Forecast the next price based on a symbol's recorded history using ARIMA.
+    The per-symbol model is fitted once, then absorbs new ticks incrementally; the forecast
+    is cached until the symbol's next tick arrives.
     :param symbol: The trading pair symbol.
+    :param source: Storage backend the history is read from (STORAGE_BACKEND by default).
     :return: Predicted next price.
     """
-    # Fetch historical prices from MongoDB
-    historical_data = await MongoTradingPair.find(MongoTradingPair.symbol == symbol).to_list(length=100)
+    source = source or STORAGE_BACKEND
+    return await prediction_cache.get_or_compute(
+        _cache_key(symbol, "arima", source), lambda: _forecast_prices_arima(symbol, source)
+    )
 
-    if len(historical_data) < 10:
-        raise ValueError("Not enough data to perform prediction")
 
-    historical_prices = [data.price for data in historical_data]
+async def _forecast_prices_arima(symbol: str, source: str) -> float:
+    forecaster = arima_forecasters[source]
+    cached = forecaster.cached_forecast(symbol)
+    if cached is not None:
+        return cached
+
+    historical_prices = None
+    if forecaster.needs_history(symbol):
+        historical_prices = await fetch_price_history(symbol, source=source)
 
-    # Convert to DataFrame for ARIMA model
-    df = pd.DataFrame(historical_prices, columns=['price'])
+        if len(historical_prices) < 10:
+            raise ValueError("Not enough data to perform prediction")
 
-    # Fit the ARIMA model
-    model = ARIMA(df['price'], order=(5, 1, 0))
-    model_fit = model.fit()
+    return await forecaster.forecast(symbol, historical_prices)
 
-    # Forecast the next price (1 step ahead)
-    forecast = model_fit.forecast(steps=1)[0]
-    return forecast
 
+async def _train_lstm(symbol: str, historical_prices: List[float]):
+    try:
+        await training_service.run(train_lstm, str(lstm_registry.model_dir), symbol, historical_prices, LSTM_EPOCHS)
+        lstm_registry.refresh(symbol)
+    except Exception as e:
+        logger.error(f"Failed to train LSTM model for {symbol}: {e}")
+    finally:
+        _training_tasks.pop(symbol, None)
 
-async def predict_price_lstm_mongo(symbol: str):
+
+def schedule_lstm_training(symbol: str, historical_prices: List[float]):
     """
-    Predict the next price for a given trading pair using an LSTM model from MongoDB data.
-    :param symbol: The trading pair symbol (e.g., BTC/USD)
-    :return: Predicted next price
+    Train a model for the symbol in the background unless a training run is already in flight.
     """
-    # Fetch historical prices for the symbol from MongoDB
-    trading_pairs = await MongoTradingPair.find(MongoTradingPair.symbol == symbol).to_list(length=100)
+    if symbol not in _training_tasks:
+        _training_tasks[symbol] = asyncio.create_task(_train_lstm(symbol, historical_prices))
 
-    if len(trading_pairs) < 10:  # Ensure sufficient data for LSTM
-        raise ValueError("Not enough data to perform prediction")
 
-    historical_prices = [pair.price for pair in trading_pairs]
+async def retrain_lstm_models_periodically(
+    interval: int = RETRAIN_INTERVAL,
+    check_interval: int = RETRAIN_CHECK_INTERVAL
+):
+    """
+    Background job retraining the registered model of every symbol predictions were requested
+    for, once its model is older than `interval` seconds or as soon as drift is detected.
+    """
+    while True:
+        await asyncio.sleep(check_interval)
+        for symbol in list(lstm_registry.tracked_symbols):
+            meta = lstm_registry.latest_meta(symbol)
+            if meta is None or symbol in _training_tasks:
+                continue
+            age = datetime.utcnow() - datetime.fromisoformat(meta["trained_at"])
+            if symbol in lstm_registry.drifted_symbols or age.total_seconds() >= interval:
+                logger.info(f"Retraining LSTM model for {symbol}.")
+                try:
+                    historical_prices = await fetch_price_history(symbol)
+                except Exception as e:
+                    logger.error(f"Failed to fetch history to retrain {symbol}: {e}")
+                    continue
+                schedule_lstm_training(symbol, historical_prices)
+                await _training_tasks[symbol]
 
-    # Prepare the data for the LSTM model
-    time_steps = 5
-    X, y, scaler = prepare_data(historical_prices, time_steps)
 
-    # Build and train the LSTM model
-    model = build_lstm_model(time_steps)
-    train_lstm_model(model, X, y, epochs=50)
+def _registered_lstm_version(symbol: str, historical_prices: List[float]) -> int:
+    """
+    The symbol's latest registered LSTM version, checked for drift against the given prices.
+    Schedules background training (and raises ValueError) if no model is registered yet.
+    """
+    lstm_registry.tracked_symbols.add(symbol)
+    meta = lstm_registry.latest_meta(symbol)
+    if meta is None:
+        schedule_lstm_training(symbol, historical_prices)
+        raise ValueError(f"No trained LSTM model for {symbol} yet; training has been scheduled")
 
-    # Make predictions
-    predicted_prices = make_predictions(model, X, scaler)
+    lstm_registry.check_drift(symbol, meta, historical_prices)
+    return meta["version"]
+
+
+def predict_with_registered_lstm(symbol: str, historical_prices: List[float]) -> float:
+    """
+    Predict the next price with the symbol's latest registered LSTM model.
+    :param symbol: The trading pair symbol
+    :param historical_prices: Recent prices, oldest first
+    :return: Predicted next price
+    """
+    version = _registered_lstm_version(symbol, historical_prices)
 
-    return predicted_prices[-1]  # Return the latest predicted price
+    # Make predictions with the resident NumPy engine
+    return lstm_registry.predict(lstm_registry.engine(symbol, version), historical_prices)
 
 
-def predict_price_lstm_sqlalchemy(symbol: str):
+async def predict_price_lstm(symbol: str, source: Optional[str] = None):
     """
-    Predict the next price for a given trading pair using an LSTM model from SQLAlchemy data.
+    Predict the next price for a given trading pair using the registered LSTM model.
+    Only inference runs here; training happens in the background (see `retrain_lstm_models_periodically`).
     :param symbol: The trading pair symbol (e.g., BTC/USD)
+    :param source: Storage backend the history is read from (STORAGE_BACKEND by default)
     :return: Predicted next price
     """
-    db: Session = SessionLocal()
+    source = source or STORAGE_BACKEND
+    return await prediction_cache.get_or_compute(
+        _cache_key(symbol, "lstm", source), lambda: _predict_price_lstm(symbol, source)
+    )
 
-    # Fetch historical prices for the symbol from the relational database
-    trading_pairs = db.query(TradingPair).filter(TradingPair.symbol == symbol).order_by(TradingPair.id.desc()).limit(
-        100).all()
 
-    if len(trading_pairs) < 10:
+async def _predict_price_lstm(symbol: str, source: str) -> float:
+    historical_prices = await fetch_price_history(symbol, source=source)
+
+    if len(historical_prices) < 10:  # Ensure sufficient data for LSTM
         raise ValueError("Not enough data to perform prediction")
 
-    historical_prices = [pair.price for pair in trading_pairs]
+    return predict_with_registered_lstm(symbol, historical_prices)
+
+
+def _batch_result(symbol: str, model: str, outcome) -> dict:
+    if isinstance(outcome, (ValueError, InferenceError)):
+        return {"symbol": symbol, "model": model, "predicted_price": None, "error": str(outcome)}
+    if isinstance(outcome, BaseException):
+        raise outcome
+    return {"symbol": symbol, "model": model, "predicted_price": outcome, "error": None}
+
+
+async def predict_batch(symbols: List[str], models: List[str], source: Optional[str] = None) -> List[dict]:
+    """
+    Forecast several symbols with several models in one call.
+    Each symbol's history is fetched once (concurrently), ARIMA forecasts run in parallel across
+    the inference workers and LSTM predictions run in-process on the NumPy engines.
+    :param symbols: Trading pair symbols (duplicates are ignored)
+    :param models: Models to run for every symbol ("arima", "lstm")
+    :param source: Storage backend the price history is read from (STORAGE_BACKEND by default)
+    :return: One dict per symbol and model with either `predicted_price` or `error`
+    """
+    source = source or STORAGE_BACKEND
+    symbols = list(dict.fromkeys(symbols))
+    models = list(dict.fromkeys(models))
+    forecaster = arima_forecasters[source]
+
+    # ARIMA symbols with a fitted model only need their live ticks
+    history_symbols = [symbol for symbol in symbols if "lstm" in models or forecaster.needs_history(symbol)]
+    histories = dict(zip(history_symbols, await asyncio.gather(
+        *(fetch_price_history(symbol, source=source) for symbol in history_symbols)
+    )))
+
+    # Keep a batch from filling the whole inference queue on its own
+    arima_slots = asyncio.Semaphore(inference_service.max_workers)
+
+    async def arima(symbol: str) -> float:
+        historical_prices = histories.get(symbol)
+        if historical_prices is not None and len(historical_prices) < 10:
+            raise ValueError("Not enough data to perform prediction")
+
+        async def compute() -> float:
+            async with arima_slots:
+                return await forecaster.forecast(symbol, historical_prices)
 
-    # Prepare the data for the LSTM model
-    time_steps = 5
-    X, y, scaler = prepare_data(historical_prices, time_steps)
+        # Shares results and in-flight fits with the single-symbol routes
+        return await prediction_cache.get_or_compute(_cache_key(symbol, "arima", source), compute)
 
-    # Build and train the LSTM model
-    model = build_lstm_model(time_steps)
-    train_lstm_model(model, X, y, epochs=50)
+    def lstm(symbol: str):
+        historical_prices = histories[symbol]
+        try:
+            if len(historical_prices) < 10:
+                raise ValueError("Not enough data to perform prediction")
+            return predict_with_registered_lstm(symbol, historical_prices)
+        except ValueError as e:
+            return e
 
-    # Make predictions
-    predicted_prices = make_predictions(model, X, scaler)
+    arima_outcomes = {}
+    if "arima" in models:
+        outcomes = await asyncio.gather(*(arima(symbol) for symbol in symbols), return_exceptions=True)
+        arima_outcomes = dict(zip(symbols, outcomes))
+    lstm_outcomes = {symbol: lstm(symbol) for symbol in symbols} if "lstm" in models else {}
 
-    return predicted_prices[-1]  # Return the latest predicted price
+    results = []
+    for symbol in symbols:
+        for model in models:
+            outcome = arima_outcomes[symbol] if model == "arima" else lstm_outcomes[symbol]
+            results.append(_batch_result(symbol, model, outcome))
+    return results
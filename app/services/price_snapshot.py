@@ -0,0 +1,234 @@
+# trading_platform_backend/app/services/price_snapshot.py
+
+# Memory-mapped journal of the latest prices and recent ticks, for warm restarts
+
+# Every live tick (see `app.utils.record_tick`) is also written into a fixed-layout file mapped
+# into memory: one slot per symbol holding its tick sequence number, latest timestamp and price,
+# and a ring of its most recent ticks. Writes are plain memory stores, so they cost no system call
+# and survive a crash of the process (the kernel owns the dirty pages); `sync_periodically` flushes
+# them to disk for machine crashes. At startup the journal is read back into `latest_prices`,
+# `tick_versions` and `recent_ticks`, so orders can be placed before the feeds deliver a tick.
+#
+# A restored price is flagged until the symbol's first live tick. A flagged price older than
+# PRICE_SNAPSHOT_MAX_AGE seconds (a few seconds: short restarts only) is stale, and trading on it
+# is refused; otherwise an order could lock a price the market has already left.
+#
+# Every worker process maps the same file. A symbol's slot is claimed under an exclusive `flock`
+# after re-reading the symbol column, so two workers never claim one slot for different symbols.
+
+import asyncio
+import fcntl
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from decouple import config
+
+logger = logging.getLogger(__name__)
+
+PRICE_SNAPSHOT_PATH = Path(config("PRICE_SNAPSHOT_PATH", default="price_snapshot.bin"))
+PRICE_SNAPSHOT_MAX_AGE = config("PRICE_SNAPSHOT_MAX_AGE", default=5.0, cast=float)  # Seconds
+PRICE_SNAPSHOT_SYNC_INTERVAL = 5.0  # Seconds between flushes of the mapped pages to disk
+PRICE_SNAPSHOT_SLOTS = 64  # Symbols the journal has room for
+PRICE_SNAPSHOT_TICKS = 1000  # Recent ticks kept per symbol (app.utils.RECENT_TICKS_MAXLEN)
+
+SNAPSHOT_MAGIC = b"PSNAP001"
+HEADER_DTYPE = np.dtype([("magic", "S8"), ("slots", "<i8"), ("ticks", "<i8"), ("reserved", "V40")])
+TICK_DTYPE = np.dtype([("seq", "<i8"), ("timestamp", "<f8"), ("price", "<f8")])
+
+
+def _slot_dtype(ticks: int) -> np.dtype:
+    return np.dtype([
+        ("symbol", "S32"),
+        ("seq", "<i8"),  # Sequence number of the latest tick; written last, so it commits the tick
+        ("timestamp", "<f8"),
+        ("price", "<f8"),
+        ("ring", TICK_DTYPE, (ticks,)),  # Tick `seq` is stored at index `seq % ticks`
+    ])
+
+
+class PriceSnapshot:
+    """
+    Reads and writes the journal file at `path`. The file is created on first use and
+    recreated (empty) if its layout does not match `slots` and `ticks`.
+    """
+
+    def __init__(self, path: Path = PRICE_SNAPSHOT_PATH, slots: int = PRICE_SNAPSHOT_SLOTS,
+                 ticks: int = PRICE_SNAPSHOT_TICKS, max_age: float = PRICE_SNAPSHOT_MAX_AGE):
+        self.path = Path(path)
+        self.slot_count = slots
+        self.tick_count = ticks
+        self.max_age = max_age
+        self._slots: Optional[np.memmap] = None
+        self._fd: Optional[int] = None  # Held open for `flock`
+        self._index: Dict[str, int] = {}  # symbol -> slot
+        self.restored: Dict[str, float] = {}  # symbol -> timestamp of its restored price, until a live tick
+        self.stats = {"writes": 0, "restored": 0, "syncs": 0, "full": 0}
+
+    def open(self):
+        """
+        Map the journal file, creating or resetting it if needed.
+        """
+        if self._slots is not None:
+            return
+        header_size = HEADER_DTYPE.itemsize
+        size = header_size + self.slot_count * _slot_dtype(self.tick_count).itemsize
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            if not self._layout_matches(fd, size):
+                if os.fstat(fd).st_size:
+                    logger.warning(f"Price snapshot {self.path} has another layout; starting an empty one.")
+                header = np.zeros(1, dtype=HEADER_DTYPE)
+                header["magic"], header["slots"], header["ticks"] = SNAPSHOT_MAGIC, self.slot_count, self.tick_count
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+                os.pwrite(fd, header.tobytes(), 0)
+            self._slots = np.memmap(self.path, dtype=_slot_dtype(self.tick_count), mode="r+",
+                                    offset=header_size, shape=(self.slot_count,))
+            self._rescan()
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        self._fd = fd
+
+    def _layout_matches(self, fd: int, size: int) -> bool:
+        if os.fstat(fd).st_size != size:
+            return False
+        header = np.frombuffer(os.pread(fd, HEADER_DTYPE.itemsize, 0), dtype=HEADER_DTYPE)[0]
+        return (header["magic"] == SNAPSHOT_MAGIC and header["slots"] == self.slot_count
+                and header["ticks"] == self.tick_count)
+
+    def _rescan(self):
+        # Slots claimed by any process sharing the file
+        self._index = {
+            symbol.decode(): slot for slot, symbol in enumerate(self._slots["symbol"]) if symbol
+        }
+
+    def load(self) -> Dict[str, Tuple[int, float, float, List[Tuple[int, float, float]]]]:
+        """
+        Read every symbol's journal entry and flag its price as restored.
+        :return: symbol -> (tick sequence number, timestamp, price, recent ticks as (seq, timestamp, price),
+                 oldest first)
+        """
+        self.open()
+        entries = {}
+        for symbol, slot in self._index.items():
+            entry = self._slots[slot]
+            seq = int(entry["seq"])
+            if seq <= 0:
+                continue
+            ring = entry["ring"]
+            ring = ring[(ring["seq"] > max(seq - self.tick_count, 0)) & (ring["seq"] <= seq)]
+            ring = np.sort(ring, order="seq")
+            ticks = list(zip(ring["seq"].tolist(), ring["timestamp"].tolist(), ring["price"].tolist()))
+            entries[symbol] = (seq, float(entry["timestamp"]), float(entry["price"]), ticks)
+            self.restored[symbol] = float(entry["timestamp"])
+        self.stats["restored"] = len(entries)
+        return entries
+
+    def record(self, symbol: str, seq: int, timestamp: float, price: float):
+        """
+        Journal a live tick; this also clears the symbol's restored flag.
+        :param seq: The symbol's tick sequence number (`app.utils.tick_versions`)
+        """
+        self.restored.pop(symbol, None)
+        if self._slots is None:
+            self.open()
+        slot = self._index.get(symbol)
+        if slot is None:
+            slot = self._allocate(symbol)
+            if slot is None:
+                return
+        entry = self._slots[slot]
+        entry["ring"][seq % self.tick_count] = (seq, timestamp, price)
+        entry["timestamp"] = timestamp
+        entry["price"] = price
+        entry["seq"] = seq
+        self.stats["writes"] += 1
+
+    def _allocate(self, symbol: str) -> Optional[int]:
+        """
+        Find or claim the symbol's slot, under the file lock: another worker may have claimed
+        it, or other slots, since this process last read the symbol column.
+        """
+        encoded = symbol.encode()
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            self._rescan()
+            slot = self._index.get(symbol)
+            if slot is not None:
+                return slot
+            if len(self._index) < self.slot_count and len(encoded) <= 32:
+                slot = len(self._index)  # Slots are claimed in order and never released
+                self._slots[slot] = np.zeros((), dtype=self._slots.dtype)
+                self._slots[slot]["symbol"] = encoded
+                self._index[symbol] = slot
+                return slot
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        if not self.stats["full"]:
+            logger.warning(f"No price snapshot slot for {symbol}; it will not be restored after a restart.")
+        self.stats["full"] += 1
+        return None
+
+    def age(self, symbol: str, now: Optional[float] = None) -> Optional[float]:
+        """
+        Seconds since the restored price of a symbol was received, or None if the symbol has
+        no restored price (it was never journaled, or a live tick has replaced it).
+        """
+        restored_at = self.restored.get(symbol)
+        if restored_at is None:
+            return None
+        return (now or time.time()) - restored_at
+
+    def is_stale(self, symbol: str, now: Optional[float] = None) -> bool:
+        """
+        Whether the symbol's current price is a restored one older than `max_age`.
+        """
+        age = self.age(symbol, now)
+        return age is not None and age > self.max_age
+
+    def staleness(self) -> Dict[str, dict]:
+        """
+        Age and stale flag of every price still waiting for its first live tick since startup.
+        """
+        now = time.time()
+        return {
+            symbol: {"age_seconds": round(now - restored_at, 3), "stale": now - restored_at > self.max_age}
+            for symbol, restored_at in self.restored.items()
+        }
+
+    def flush(self):
+        """
+        Write the mapped pages to disk (blocking).
+        """
+        if self._slots is not None:
+            self._slots.flush()
+            self.stats["syncs"] += 1
+
+    def close(self):
+        self.flush()
+        self._slots = None
+        self._index = {}
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    async def sync_periodically(self, interval: float = PRICE_SNAPSHOT_SYNC_INTERVAL):
+        """
+        Background job flushing the journal every `interval` seconds (and once more on cancellation).
+        """
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                await asyncio.to_thread(self.flush)
+        except asyncio.CancelledError:
+            self.flush()
+            raise
+
+
+price_snapshot = PriceSnapshot()
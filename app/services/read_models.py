@@ -0,0 +1,119 @@
+# trading_platform_backend/app/services/read_models.py
+
+# Projection-based read path for listing routes
+
+# Listing routes read plain dicts straight from Motor with a projection of the fields they
+# return, skipping Beanie document construction and response-model re-validation. The rows
+# are already JSON-ready (apart from datetimes, which orjson encodes natively) and are sent
+# with ORJSONResponse.
+
+from typing import Dict, List, Optional, Tuple
+
+from app.models import MongoOrder, MongoUser
+
+# Fields returned by OrderResponse
+ORDER_PROJECTION = {
+    "user_id": 1,
+    "symbol": 1,
+    "amount": 1,
+    "prediction": 1,
+    "trade_time": 1,
+    "start_time": 1,
+    "locked_price": 1,
+    "status": 1,
+    "payout": 1,
+}
+
+# Fields returned per order by /users/orders
+ORDER_SUMMARY_PROJECTION = {
+    "symbol": 1,
+    "amount": 1,
+    "prediction": 1,
+    "trade_time": 1,
+    "locked_price": 1,
+    "status": 1,
+}
+
+# Fields returned per user by /users/orders
+USER_SUMMARY_PROJECTION = {
+    "username": 1,
+    "email": 1,
+    "balance": 1,
+}
+
+
+def order_row(document: Dict) -> Dict:
+    """
+    Shape a raw order document like OrderResponse.
+    """
+    return {
+        "id": str(document["_id"]),
+        "user_id": str(document["user_id"]),
+        "symbol": document["symbol"],
+        "amount": document["amount"],
+        "prediction": document["prediction"],
+        "trade_time": document["trade_time"],
+        "start_time": document["start_time"],
+        "locked_price": document["locked_price"],
+        "status": document.get("status", "pending"),
+        "payout": document.get("payout"),
+    }
+
+
+def order_summary_row(document: Dict) -> Dict:
+    """
+    Shape a raw order document like the order entries of /users/orders.
+    """
+    return {
+        "order_id": str(document["_id"]),
+        "symbol": document["symbol"],
+        "amount": document["amount"],
+        "prediction": document["prediction"],
+        "trade_time": document["trade_time"],
+        "locked_price": document["locked_price"],
+        "status": document.get("status", "pending"),
+    }
+
+
+async def find_order_rows(
+    query_filters: Dict,
+    sort: Optional[List[Tuple[str, int]]] = None,
+    limit: int = 0,
+) -> List[Dict]:
+    """
+    Fetch orders as raw documents restricted to ORDER_PROJECTION.
+    :param query_filters: MongoDB filter
+    :param sort: Optional sort specification
+    :param limit: Maximum number of documents (0 for no limit)
+    """
+    cursor = MongoOrder.get_motor_collection().find(query_filters, ORDER_PROJECTION)
+    if sort:
+        cursor = cursor.sort(sort)
+    if limit:
+        cursor = cursor.limit(limit)
+    return await cursor.to_list(length=None)
+
+
+async def find_order_summary_rows(query_filters: Dict, sort: List[Tuple[str, int]], limit: int) -> List[Dict]:
+    """
+    Fetch up to `limit` orders as raw documents restricted to ORDER_SUMMARY_PROJECTION (plus the
+    sort fields, for keyset cursors); shape them with `order_summary_row`.
+    """
+    projection = dict(ORDER_SUMMARY_PROJECTION)
+    projection.update({field: 1 for field, _ in sort})
+    cursor = MongoOrder.get_motor_collection().find(query_filters, projection).sort(sort).limit(limit)
+    return await cursor.to_list(length=limit)
+
+
+def find_user_summaries(
+    query_filters: Dict,
+    sort: List[Tuple[str, int]],
+    skip: int,
+    limit: int,
+):
+    """
+    Motor cursor over users restricted to USER_SUMMARY_PROJECTION (plus the sort field).
+    """
+    projection = dict(USER_SUMMARY_PROJECTION)
+    projection.update({field: 1 for field, _ in sort})
+    return MongoUser.get_motor_collection().find(query_filters, projection).sort(sort).skip(skip).limit(limit)
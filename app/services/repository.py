@@ -0,0 +1,406 @@
+# trading_platform_backend/app/services/repository.py
+
+# Storage interface for users, prices, ticks and orders
+
+# The hot paths (order placement and settlement, tick recording, price history for predictions)
+# talk to a `Repository` instead of the Beanie or SQLAlchemy models, so each is written once.
+# Backends: "mongo" (app/services/mongo_repository.py), "sqlalchemy" (app/services/sql_repository.py)
+# and "memory" (below), for benchmarks and offline tests. Ids are strings in every backend.
+
+import bisect
+import functools
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from bson import ObjectId
+from decouple import config
+
+from app.services.metrics import recent_repository_latency, repository_latency
+
+STORAGE_BACKEND = config("STORAGE_BACKEND", default="mongo")  # Repository used when no source is named
+STORAGE_SOURCES = ["mongo", "sqlalchemy", "memory"]
+STATS_FIELDS = ("orders", "wins", "losses", "total_staked", "total_paid_out")
+# Operations on the order placement and settlement path; only their latency drives load shedding,
+# so a slow bulk read (tick loads, leaderboard stats, listings) does not refuse orders
+ORDER_PATH_OPERATIONS = frozenset({"get_user", "adjust_balance", "insert_order", "settle_order"})
+
+
+@dataclass
+class UserRecord:
+    id: str
+    username: str
+    email: str
+    balance: float = 0.0
+    is_active: bool = True
+
+
+@dataclass
+class OrderRecord:
+    user_id: str
+    symbol: str
+    amount: float
+    prediction: str  # 'rise' or 'fall'
+    trade_time: int  # Trade duration in seconds
+    locked_price: float
+    start_time: datetime = field(default_factory=datetime.utcnow)
+    status: str = "pending"  # 'pending', 'win' or 'lose'
+    payout: Optional[float] = None
+    id: Optional[str] = None  # Assigned on insert
+
+
+def ticks_to_arrays(timestamps: List[datetime], prices: List[float]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert UTC tick timestamps and prices to Unix seconds (float64) and price (float64) arrays.
+    """
+    seconds = np.array(timestamps, dtype="datetime64[us]").astype(np.int64) / 1e6
+    return seconds, np.array(prices, dtype=np.float64)
+
+
+class Repository(ABC):
+    """
+    Storage operations used by the hot paths. Implementations must be safe to share across
+    concurrent requests of one event loop.
+    """
+
+    name: str
+
+    # Users
+
+    @abstractmethod
+    async def get_user(self, user_id: str) -> Optional[UserRecord]:
+        """
+        The user with this id, or None (also for ids that are invalid in the backend).
+        """
+
+    @abstractmethod
+    async def get_users(self, user_ids: Iterable[str]) -> Dict[str, UserRecord]:
+        """
+        The users among `user_ids` that exist, by id.
+        """
+
+    @abstractmethod
+    async def find_user_by_username(self, username: str) -> Optional[UserRecord]:
+        pass
+
+    @abstractmethod
+    async def create_user(self, username: str, email: str, hashed_password: str,
+                          balance: float = 0.0, is_active: bool = True) -> UserRecord:
+        pass
+
+    @abstractmethod
+    async def adjust_balance(self, user_id: str, delta: float,
+                             min_balance: Optional[float] = None) -> Optional[UserRecord]:
+        """
+        Atomically add `delta` to a user's balance.
+        :param min_balance: Only apply the change if the balance is at least this much
+        :return: The updated user, or None if the user does not exist or the condition failed
+        """
+
+    # Prices (latest price per trading pair)
+
+    @abstractmethod
+    async def upsert_price(self, symbol: str, price: float):
+        pass
+
+    @abstractmethod
+    async def get_price(self, symbol: str) -> Optional[float]:
+        """
+        The stored price of a trading pair, or None if the pair does not exist.
+        """
+
+    @abstractmethod
+    async def list_prices(self) -> Dict[str, float]:
+        pass
+
+    # Ticks (price history)
+
+    @abstractmethod
+    async def insert_ticks(self, ticks: List[Tuple[str, float, float]]):
+        """
+        Record a batch of ticks.
+        :param ticks: (symbol, Unix timestamp, price) tuples
+        """
+
+    @abstractmethod
+    async def recent_prices(self, symbol: str, limit: int = 100) -> List[float]:
+        """
+        The latest `limit` recorded prices of a symbol, oldest first.
+        """
+
+    @abstractmethod
+    async def load_ticks(self, symbol: str, start: Optional[datetime] = None,
+                         end: Optional[datetime] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        A symbol's recorded ticks in a time range, oldest first.
+        :param start: UTC start of the range (inclusive)
+        :param end: UTC end of the range (exclusive)
+        :return: Unix timestamps (float64 seconds) and prices (float64)
+        """
+
+    @abstractmethod
+    async def tick_symbols(self) -> List[str]:
+        """
+        Symbols with recorded ticks, sorted.
+        """
+
+    # Orders
+
+    @abstractmethod
+    async def insert_order(self, order: OrderRecord) -> OrderRecord:
+        """
+        Store a new order.
+        :return: The order with its assigned id
+        """
+
+    @abstractmethod
+    async def get_order(self, order_id: str) -> Optional[OrderRecord]:
+        pass
+
+    @abstractmethod
+    async def settle_order(self, order_id: str, status: str, payout: float) -> Optional[OrderRecord]:
+        """
+        Set the outcome of a pending order and credit its payout to the user's balance, as one unit:
+        a backend that cannot write both atomically leaves an incomplete credit to `reconcile_payouts`.
+        :return: The settled order, or None if it does not exist or is no longer pending
+        """
+
+    @abstractmethod
+    async def reconcile_payouts(self) -> int:
+        """
+        Complete the payout credits of settled orders whose credit was interrupted.
+        :return: Number of payouts credited
+        """
+
+    @abstractmethod
+    async def count_pending_orders(self, user_id: str) -> int:
+        pass
+
+    @abstractmethod
+    async def active_orders(self, since: datetime) -> List[OrderRecord]:
+        """
+        Orders that are pending or were placed at or after `since`.
+        """
+
+    @abstractmethod
+    async def pending_exposure(self) -> List[Tuple[str, str, float, int]]:
+        """
+        Stake on pending orders as (symbol, prediction, total amount, order count) rows.
+        """
+
+    # Per-user order statistics
+
+    @abstractmethod
+    async def increment_user_stats(self, user: UserRecord, increments: Dict[str, float]):
+        """
+        Add to a user's order counters (see STATS_FIELDS).
+        """
+
+    @abstractmethod
+    async def user_stats(self) -> List[dict]:
+        """
+        Every user's order counters, with `user_id` and `username`.
+        """
+
+
+def _timed(method, backend: str):
+    order_path = method.__name__ in ORDER_PATH_OPERATIONS
+
+    @functools.wraps(method)
+    async def timed(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            repository_latency.observe(elapsed, backend, method.__name__)
+            if order_path:
+                recent_repository_latency.observe(elapsed, backend)
+
+    return timed
+
+
+def instrument_repository(cls):
+    """
+    Class decorator recording the latency of every repository operation of a database backend
+    (the `repository_operation_seconds` metric, labelled by backend and operation) and, for the
+    ORDER_PATH_OPERATIONS, their moving average per backend, which drives load shedding on order placement.
+    """
+    for name in Repository.__abstractmethods__:
+        setattr(cls, name, _timed(getattr(cls, name), cls.name))
+    return cls
+
+
+class InMemoryRepository(Repository):
+    """
+    Process-local repository on dicts and lists, for benchmarks and offline tests.
+    Records are copied in and out, so callers never share state with the store.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self._users: Dict[str, UserRecord] = {}
+        self._user_ids_by_name: Dict[str, str] = {}
+        self._prices: Dict[str, float] = {}
+        self._ticks: Dict[str, Tuple[List[float], List[float]]] = {}  # symbol -> (timestamps, prices)
+        self._orders: Dict[str, OrderRecord] = {}
+        self._pending: Dict[str, set] = {}  # user_id -> ids of pending orders
+        self._stats: Dict[str, dict] = {}
+
+    async def get_user(self, user_id: str) -> Optional[UserRecord]:
+        user = self._users.get(user_id)
+        return replace(user) if user else None
+
+    async def get_users(self, user_ids: Iterable[str]) -> Dict[str, UserRecord]:
+        return {user_id: replace(self._users[user_id]) for user_id in user_ids if user_id in self._users}
+
+    async def find_user_by_username(self, username: str) -> Optional[UserRecord]:
+        user_id = self._user_ids_by_name.get(username)
+        return await self.get_user(user_id) if user_id else None
+
+    async def create_user(self, username: str, email: str, hashed_password: str,
+                          balance: float = 0.0, is_active: bool = True) -> UserRecord:
+        if username in self._user_ids_by_name:
+            raise ValueError(f"Username {username} already exists")
+        user = UserRecord(str(ObjectId()), username, email, balance, is_active)
+        self._users[user.id] = user
+        self._user_ids_by_name[username] = user.id
+        return replace(user)
+
+    async def adjust_balance(self, user_id: str, delta: float,
+                             min_balance: Optional[float] = None) -> Optional[UserRecord]:
+        user = self._users.get(user_id)
+        if user is None or (min_balance is not None and user.balance < min_balance):
+            return None
+        user.balance += delta
+        return replace(user)
+
+    async def upsert_price(self, symbol: str, price: float):
+        self._prices[symbol] = price
+
+    async def get_price(self, symbol: str) -> Optional[float]:
+        return self._prices.get(symbol)
+
+    async def list_prices(self) -> Dict[str, float]:
+        return dict(self._prices)
+
+    async def insert_ticks(self, ticks: List[Tuple[str, float, float]]):
+        for symbol, timestamp, price in ticks:
+            timestamp = round(timestamp, 6)  # Microseconds, like the database backends
+            timestamps, prices = self._ticks.setdefault(symbol, ([], []))
+            if not timestamps or timestamp >= timestamps[-1]:
+                timestamps.append(timestamp)
+                prices.append(price)
+            else:
+                i = bisect.bisect_right(timestamps, timestamp)
+                timestamps.insert(i, timestamp)
+                prices.insert(i, price)
+
+    async def recent_prices(self, symbol: str, limit: int = 100) -> List[float]:
+        return self._ticks.get(symbol, ([], []))[1][-limit:]
+
+    async def load_ticks(self, symbol: str, start: Optional[datetime] = None,
+                         end: Optional[datetime] = None) -> Tuple[np.ndarray, np.ndarray]:
+        timestamps, prices = self._ticks.get(symbol, ([], []))
+        lo = bisect.bisect_left(timestamps, _unix(start)) if start is not None else 0
+        hi = bisect.bisect_left(timestamps, _unix(end)) if end is not None else len(timestamps)
+        return np.array(timestamps[lo:hi], dtype=np.float64), np.array(prices[lo:hi], dtype=np.float64)
+
+    async def tick_symbols(self) -> List[str]:
+        return sorted(symbol for symbol, (timestamps, _) in self._ticks.items() if timestamps)
+
+    async def insert_order(self, order: OrderRecord) -> OrderRecord:
+        order = replace(order, id=str(ObjectId()))
+        self._orders[order.id] = order
+        if order.status == "pending":
+            self._pending.setdefault(order.user_id, set()).add(order.id)
+        return replace(order)
+
+    async def get_order(self, order_id: str) -> Optional[OrderRecord]:
+        order = self._orders.get(order_id)
+        return replace(order) if order else None
+
+    async def settle_order(self, order_id: str, status: str, payout: float) -> Optional[OrderRecord]:
+        order = self._orders.get(order_id)
+        if order is None or order.status != "pending":
+            return None
+        order.status, order.payout = status, payout
+        self._pending.get(order.user_id, set()).discard(order_id)
+        if payout and order.user_id in self._users:
+            self._users[order.user_id].balance += payout
+        return replace(order)
+
+    async def reconcile_payouts(self) -> int:
+        return 0  # Settlement and credit happen together
+
+    async def count_pending_orders(self, user_id: str) -> int:
+        return len(self._pending.get(user_id, ()))
+
+    async def active_orders(self, since: datetime) -> List[OrderRecord]:
+        return [
+            replace(order) for order in self._orders.values()
+            if order.status == "pending" or order.start_time >= since
+        ]
+
+    async def pending_exposure(self) -> List[Tuple[str, str, float, int]]:
+        totals: Dict[Tuple[str, str], list] = {}
+        for order_ids in self._pending.values():
+            for order_id in order_ids:
+                order = self._orders[order_id]
+                total = totals.setdefault((order.symbol, order.prediction), [0.0, 0])
+                total[0] += order.amount
+                total[1] += 1
+        return [(symbol, prediction, amount, count) for (symbol, prediction), (amount, count) in totals.items()]
+
+    async def increment_user_stats(self, user: UserRecord, increments: Dict[str, float]):
+        stats = self._stats.setdefault(user.id, {"user_id": user.id, **dict.fromkeys(STATS_FIELDS, 0)})
+        stats.update(username=user.username, email=user.email)
+        for name, amount in increments.items():
+            stats[name] += amount
+
+    async def user_stats(self) -> List[dict]:
+        return [dict(stats) for stats in self._stats.values()]
+
+
+def _unix(timestamp: datetime) -> float:
+    return (np.datetime64(timestamp, "us").astype(np.int64) / 1e6).item()
+
+
+_repositories: Dict[str, Repository] = {}
+
+
+def _create_repository(source: str) -> Repository:
+    # Imported here: the database backends import the models, which must not depend on this module
+    if source == "mongo":
+        from app.services.mongo_repository import MongoRepository
+        return MongoRepository()
+    if source == "sqlalchemy":
+        from app.services.sql_repository import SqlRepository
+        return SqlRepository()
+    if source == "memory":
+        return InMemoryRepository()
+    raise ValueError(f"Unknown storage backend {source!r}; expected one of {STORAGE_SOURCES}")
+
+
+def get_repository(source: Optional[str] = None) -> Repository:
+    """
+    The repository of a storage backend (STORAGE_BACKEND by default), created on first use.
+    :param source: "mongo", "sqlalchemy" or "memory"
+    """
+    source = source or STORAGE_BACKEND
+    repository = _repositories.get(source)
+    if repository is None:
+        repository = _repositories[source] = _create_repository(source)
+    return repository
+
+
+def use_repository(repository: Repository, source: Optional[str] = None):
+    """
+    Install a repository for a backend (STORAGE_BACKEND by default), e.g. a pre-seeded
+    `InMemoryRepository` for a benchmark or test.
+    """
+    _repositories[source or STORAGE_BACKEND] = repository
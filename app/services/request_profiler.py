@@ -0,0 +1,89 @@
+# trading_platform_backend/app/services/request_profiler.py
+
+# Opt-in per-request profiler (ASGI middleware)
+
+# A request is profiled with cProfile when it carries the PROFILE_HEADER with the PROFILE_TOKEN
+# as its value (the header is ignored while no token is configured) or when it is drawn by the
+# PROFILE_SAMPLE_RATE sample (0.0 by default, i.e. off). The profile of a sampled request is written to PROFILE_DIR only if
+# the request took at least PROFILE_SLOW_THRESHOLD seconds; the profile of a requested one always
+# is. Files are `pstats` dumps (open with `python -m pstats` or snakeviz).
+#
+# The profiler is per thread and the event loop runs every request on one thread, so a profile
+# also contains whatever other requests and tasks ran on the loop meanwhile. Only one request is
+# profiled at a time.
+
+import cProfile
+import logging
+import random
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+
+from decouple import config
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = Path(config("PROFILE_DIR", default="profiles"))
+PROFILE_HEADER = b"x-profile"
+PROFILE_TOKEN = config("PROFILE_TOKEN", default="")  # Value of PROFILE_HEADER that requests a profile
+PROFILE_SAMPLE_RATE = config("PROFILE_SAMPLE_RATE", default=0.0, cast=float)  # Fraction of requests
+PROFILE_SLOW_THRESHOLD = config("PROFILE_SLOW_THRESHOLD", default=0.5, cast=float)  # Seconds
+
+
+class ProfilerMiddleware:
+    """
+    Profiles opted-in HTTP requests and writes a `pstats` file per (slow) profiled request.
+    """
+
+    def __init__(self, app, directory: Path = PROFILE_DIR, sample_rate: float = PROFILE_SAMPLE_RATE,
+                 slow_threshold: float = PROFILE_SLOW_THRESHOLD, token: str = PROFILE_TOKEN):
+        self.app = app
+        self.directory = Path(directory)
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.token = token.encode()
+        self._active = False
+
+    def _requested(self, scope) -> bool:
+        if not self.token:
+            return False
+        for name, value in scope.get("headers", ()):
+            if name == PROFILE_HEADER:
+                return value == self.token
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        requested = self._requested(scope)
+        if not requested and not (self.sample_rate and random.random() < self.sample_rate):
+            return await self.app(scope, receive, send)
+        if self._active:
+            return await self.app(scope, receive, send)
+
+        self._active = True
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.disable()
+            self._active = False
+            elapsed = time.perf_counter() - started
+            if requested or elapsed >= self.slow_threshold:
+                self._write(profiler, scope, elapsed)
+
+    def _write(self, profiler: cProfile.Profile, scope, elapsed: float):
+        path_name = re.sub(r"[^A-Za-z0-9]+", "_", scope.get("path", "")).strip("_") or "root"
+        path = self.directory / (
+            f"{datetime.utcnow():%Y%m%dT%H%M%S%f}_{scope.get('method', 'GET')}_{path_name}_{elapsed * 1000:.0f}ms.prof"
+        )
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(path)
+        except OSError as e:
+            logger.error(f"Failed to write request profile {path}: {e}")
+            return
+        logger.info(f"Profiled {scope.get('method')} {scope.get('path')} ({elapsed:.3f}s): {path}")
@@ -0,0 +1,220 @@
+# trading_platform_backend/app/services/sql_repository.py
+
+# Relational (SQLAlchemy) implementation of the storage repository
+
+# Every operation runs in its own short session. The relational schema has no materialized
+# stats table: `increment_user_stats` is a no-op and `user_stats` aggregates the orders table.
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import case, distinct, func, insert, or_, select, update
+
+from app.database import AsyncSessionLocal
+from app.models import Order, PriceTick, TradingPair, User
+from app.services import sql_store
+from app.services.repository import OrderRecord, Repository, UserRecord, instrument_repository, ticks_to_arrays
+
+
+def _int_id(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _user(user: User) -> UserRecord:
+    return UserRecord(str(user.id), user.username, user.email, user.balance or 0.0, user.is_active)
+
+
+def _order(order: Order) -> OrderRecord:
+    return OrderRecord(
+        id=str(order.id),
+        user_id=str(order.user_id),
+        symbol=order.symbol,
+        amount=order.amount,
+        prediction=order.prediction,
+        trade_time=order.trade_time,
+        locked_price=order.locked_price,
+        start_time=order.start_time,
+        status=order.status,
+        payout=order.payout,
+    )
+
+
+@instrument_repository
+class SqlRepository(Repository):
+    name = "sqlalchemy"
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self._sessions = session_factory
+
+    async def get_user(self, user_id: str) -> Optional[UserRecord]:
+        user_id = _int_id(user_id)
+        if user_id is None:
+            return None
+        async with self._sessions() as db:
+            user = await db.get(User, user_id)
+            return _user(user) if user else None
+
+    async def get_users(self, user_ids: Iterable[str]) -> Dict[str, UserRecord]:
+        ids = [user_id for user_id in map(_int_id, user_ids) if user_id is not None]
+        async with self._sessions() as db:
+            users = (await db.execute(select(User).where(User.id.in_(ids)))).scalars()
+            return {str(user.id): _user(user) for user in users}
+
+    async def find_user_by_username(self, username: str) -> Optional[UserRecord]:
+        async with self._sessions() as db:
+            user = (await db.execute(select(User).where(User.username == username))).scalar_one_or_none()
+            return _user(user) if user else None
+
+    async def create_user(self, username: str, email: str, hashed_password: str,
+                          balance: float = 0.0, is_active: bool = True) -> UserRecord:
+        async with self._sessions() as db:
+            user = User(username=username, email=email, hashed_password=hashed_password,
+                        balance=balance, is_active=is_active)
+            db.add(user)
+            await db.commit()
+            return _user(user)
+
+    async def adjust_balance(self, user_id: str, delta: float,
+                             min_balance: Optional[float] = None) -> Optional[UserRecord]:
+        user_id = _int_id(user_id)
+        if user_id is None:
+            return None
+        statement = update(User).where(User.id == user_id)
+        if min_balance is not None:
+            statement = statement.where(User.balance >= min_balance)
+        statement = statement.values(balance=User.balance + delta).returning(User)
+        async with self._sessions() as db:
+            user = (await db.execute(statement)).scalar_one_or_none()
+            await db.commit()
+            return _user(user) if user else None
+
+    async def upsert_price(self, symbol: str, price: float):
+        async with self._sessions() as db:
+            await sql_store.upsert_trading_pairs(db, {symbol: price})
+            await db.commit()
+
+    async def get_price(self, symbol: str) -> Optional[float]:
+        async with self._sessions() as db:
+            row = (await db.execute(select(TradingPair.price).where(TradingPair.symbol == symbol))).first()
+            return row[0] if row else None
+
+    async def list_prices(self) -> Dict[str, float]:
+        async with self._sessions() as db:
+            return dict((await db.execute(select(TradingPair.symbol, TradingPair.price))).all())
+
+    async def insert_ticks(self, ticks: List[Tuple[str, float, float]]):
+        async with self._sessions() as db:
+            await sql_store.bulk_insert_ticks(
+                db, ((symbol, datetime.utcfromtimestamp(timestamp), price) for symbol, timestamp, price in ticks)
+            )
+            await db.commit()
+
+    async def recent_prices(self, symbol: str, limit: int = 100) -> List[float]:
+        async with self._sessions() as db:
+            return await sql_store.recent_prices(db, symbol, limit)
+
+    async def load_ticks(self, symbol: str, start: Optional[datetime] = None,
+                         end: Optional[datetime] = None) -> Tuple[np.ndarray, np.ndarray]:
+        async with self._sessions() as db:
+            rows = await sql_store.price_history(db, symbol, start, end)
+        return ticks_to_arrays([timestamp for timestamp, _ in rows], [price for _, price in rows])
+
+    async def tick_symbols(self) -> List[str]:
+        async with self._sessions() as db:
+            return list((await db.execute(select(distinct(PriceTick.symbol)).order_by(PriceTick.symbol))).scalars())
+
+    async def insert_order(self, order: OrderRecord) -> OrderRecord:
+        values = {
+            "user_id": int(order.user_id),
+            "symbol": order.symbol,
+            "amount": order.amount,
+            "prediction": order.prediction,
+            "trade_time": order.trade_time,
+            "start_time": order.start_time,
+            "locked_price": order.locked_price,
+            "status": order.status,
+            "payout": order.payout,
+        }
+        async with self._sessions() as db:
+            order_id = (await db.execute(insert(Order).values(values).returning(Order.id))).scalar_one()
+            await db.commit()
+        order.id = str(order_id)
+        return order
+
+    async def get_order(self, order_id: str) -> Optional[OrderRecord]:
+        order_id = _int_id(order_id)
+        if order_id is None:
+            return None
+        async with self._sessions() as db:
+            order = await db.get(Order, order_id)
+            return _order(order) if order else None
+
+    async def settle_order(self, order_id: str, status: str, payout: float) -> Optional[OrderRecord]:
+        order_id = _int_id(order_id)
+        if order_id is None:
+            return None
+        statement = (
+            update(Order)
+            .where(Order.id == order_id, Order.status == "pending")
+            .values(status=status, payout=payout)
+            .returning(Order)
+        )
+        # One transaction: the payout is credited if and only if the order is settled
+        async with self._sessions() as db:
+            order = (await db.execute(statement)).scalar_one_or_none()
+            if order and payout:
+                await db.execute(update(User).where(User.id == order.user_id).values(balance=User.balance + payout))
+            await db.commit()
+            return _order(order) if order else None
+
+    async def reconcile_payouts(self) -> int:
+        return 0  # Settlement and credit commit in one transaction
+
+    async def count_pending_orders(self, user_id: str) -> int:
+        user_id = _int_id(user_id)
+        if user_id is None:
+            return 0
+        async with self._sessions() as db:
+            return await db.scalar(
+                select(func.count()).select_from(Order).where(Order.user_id == user_id, Order.status == "pending")
+            )
+
+    async def active_orders(self, since: datetime) -> List[OrderRecord]:
+        async with self._sessions() as db:
+            orders = await db.execute(select(Order).where(or_(Order.status == "pending", Order.start_time >= since)))
+            return [_order(order) for order in orders.scalars()]
+
+    async def pending_exposure(self) -> List[Tuple[str, str, float, int]]:
+        async with self._sessions() as db:
+            rows = await db.execute(
+                select(Order.symbol, Order.prediction, func.sum(Order.amount), func.count())
+                .where(Order.status == "pending")
+                .group_by(Order.symbol, Order.prediction)
+            )
+            return [tuple(row) for row in rows]
+
+    async def increment_user_stats(self, user: UserRecord, increments: Dict[str, float]):
+        pass  # Derived from the orders table on read (see `user_stats`)
+
+    async def user_stats(self) -> List[dict]:
+        query = (
+            select(
+                Order.user_id,
+                User.username,
+                User.email,
+                func.count().label("orders"),
+                func.sum(case((Order.status == "win", 1), else_=0)).label("wins"),
+                func.sum(case((Order.status == "lose", 1), else_=0)).label("losses"),
+                func.sum(Order.amount).label("total_staked"),
+                func.sum(func.coalesce(Order.payout, 0.0)).label("total_paid_out"),
+            )
+            .join(User, User.id == Order.user_id)
+            .group_by(Order.user_id, User.username, User.email)
+        )
+        async with self._sessions() as db:
+            rows = (await db.execute(query)).mappings()
+            return [{**row, "user_id": str(row["user_id"])} for row in rows]
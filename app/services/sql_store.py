@@ -0,0 +1,131 @@
+# trading_platform_backend/app/services/sql_store.py
+
+# Bulk writes and time-ordered history queries for the relational database
+
+# Bulk helpers issue one INSERT ... ON CONFLICT statement per call instead of a query and a
+# commit per row; callers own the session and commit once.
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Order, PriceTick, TradingPair
+
+ORDER_UPDATE_COLUMNS = ("status", "payout")  # Columns an order upsert may change (settlement)
+
+
+def _upsert(session: AsyncSession, model):
+    dialect = session.bind.dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    raise ValueError(f"Upserts are not supported on {dialect}")
+
+
+async def upsert_trading_pairs(session: AsyncSession, prices: Dict[str, float]) -> int:
+    """
+    Insert or update the price of several trading pairs in one statement.
+    :param prices: Latest price per symbol
+    :return: Number of pairs written
+    """
+    if not prices:
+        return 0
+    statement = _upsert(session, TradingPair).values(
+        [{"symbol": symbol, "price": price} for symbol, price in prices.items()]
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[TradingPair.symbol], set_={"price": statement.excluded.price}
+    )
+    await session.execute(statement)
+    return len(prices)
+
+
+async def bulk_insert_orders(session: AsyncSession, orders: List[dict]) -> int:
+    """
+    Insert several orders with one executemany.
+    :param orders: Column values per order (see `app.models.Order`)
+    """
+    if orders:
+        await session.execute(insert(Order), orders)
+    return len(orders)
+
+
+async def upsert_orders(session: AsyncSession, orders: List[dict]) -> int:
+    """
+    Insert orders, or update the status and payout of those whose id already exists
+    (e.g. a batch of settled orders).
+    :param orders: Column values per order, including `id` for existing orders
+    """
+    # A multi-row VALUES clause needs the same columns in every row: orders without an id
+    # (new ones) go through a plain executemany
+    identified = [order for order in orders if order.get("id") is not None]
+    await bulk_insert_orders(session, [order for order in orders if order.get("id") is None])
+    if identified:
+        statement = _upsert(session, Order).values(identified)
+        statement = statement.on_conflict_do_update(
+            index_elements=[Order.id],
+            set_={column: getattr(statement.excluded, column) for column in ORDER_UPDATE_COLUMNS},
+        )
+        await session.execute(statement)
+    return len(orders)
+
+
+async def bulk_insert_ticks(session: AsyncSession, ticks: Iterable[Tuple[str, datetime, float]]) -> int:
+    """
+    Insert recorded ticks with one executemany.
+    :param ticks: (symbol, UTC timestamp, price) tuples
+    """
+    rows = [{"symbol": symbol, "timestamp": timestamp, "price": price} for symbol, timestamp, price in ticks]
+    if rows:
+        await session.execute(insert(PriceTick), rows)
+    return len(rows)
+
+
+async def recent_prices(session: AsyncSession, symbol: str, limit: int = 100) -> List[float]:
+    """
+    The latest `limit` recorded prices of a symbol, oldest first.
+    """
+    latest = (
+        select(PriceTick.id, PriceTick.timestamp, PriceTick.price)
+        .where(PriceTick.symbol == symbol)
+        .order_by(PriceTick.timestamp.desc(), PriceTick.id.desc())
+        .limit(limit)
+        .subquery()
+    )
+    result = await session.execute(select(latest.c.price).order_by(latest.c.timestamp, latest.c.id))
+    return list(result.scalars())
+
+
+async def price_history(
+    session: AsyncSession,
+    symbol: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> List[Tuple[datetime, float]]:
+    """
+    A symbol's recorded ticks in a time range, oldest first.
+    :param start: UTC start of the range (inclusive)
+    :param end: UTC end of the range (exclusive)
+    :return: (timestamp, price) pairs
+    """
+    query = select(PriceTick.timestamp, PriceTick.price).where(PriceTick.symbol == symbol)
+    if start is not None:
+        query = query.where(PriceTick.timestamp >= start)
+    if end is not None:
+        query = query.where(PriceTick.timestamp < end)
+    result = await session.execute(query.order_by(PriceTick.timestamp, PriceTick.id))
+    return [tuple(row) for row in result]
+
+
+async def order_history(session: AsyncSession, user_id: int, limit: int = 100) -> List[Order]:
+    """
+    A user's latest `limit` orders, newest first.
+    """
+    result = await session.execute(
+        select(Order).where(Order.user_id == user_id).order_by(Order.start_time.desc(), Order.id.desc()).limit(limit)
+    )
+    return list(result.scalars())
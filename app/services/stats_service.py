@@ -0,0 +1,120 @@
+# trading_platform_backend/app/services/stats_service.py
+
+# Materialized per-user order statistics
+
+import logging
+from typing import Dict, List, Optional
+
+from app.models import MongoOrder, MongoUser, MongoUserStats
+from app.services.repository import OrderRecord, UserRecord, get_repository
+
+logger = logging.getLogger(__name__)
+
+
+async def _increment_user_stats(user: UserRecord, increments: Dict[str, float]):
+    """
+    Add to a user's order counters through the storage repository.
+    Failures are logged and swallowed so a stats hiccup never fails an order.
+    :param user: The user who owns the order
+    :param increments: Counter field -> amount to add
+    """
+    try:
+        await get_repository().increment_user_stats(user, increments)
+    except Exception as e:
+        logger.error(f"Failed to update order stats for user {user.id}: {e}")
+
+
+async def record_order_placed(order: OrderRecord, user: UserRecord):
+    """
+    Count a newly placed order against the user's stats.
+    :param order: The order that was just inserted
+    :param user: The user who placed it
+    """
+    await _increment_user_stats(user, {"orders": 1, "total_staked": order.amount})
+
+
+async def record_order_settled(order: OrderRecord, user: UserRecord):
+    """
+    Count a settled order's outcome ('win' or 'lose') against the user's stats.
+    :param order: The order after evaluation
+    :param user: The user who placed it
+    """
+    increments = {"total_paid_out": order.payout or 0.0}
+    if order.status == "win":
+        increments["wins"] = 1
+    elif order.status == "lose":
+        increments["losses"] = 1
+    await _increment_user_stats(user, increments)
+
+
+async def rebuild_user_stats():
+    """
+    Recompute every user's stats from the orders collection with a `$group` aggregation
+    and merge the result into `user_stats`. Use this to backfill or repair the counters;
+    increments that land while it runs may be overwritten, so run it off-peak.
+    """
+    pipeline = [
+        {"$group": {
+            "_id": "$user_id",
+            "orders": {"$sum": 1},
+            "wins": {"$sum": {"$cond": [{"$eq": ["$status", "win"]}, 1, 0]}},
+            "losses": {"$sum": {"$cond": [{"$eq": ["$status", "lose"]}, 1, 0]}},
+            "total_staked": {"$sum": "$amount"},
+            "total_paid_out": {"$sum": {"$ifNull": ["$payout", 0]}},
+        }},
+        {"$lookup": {
+            "from": MongoUser.get_settings().name,
+            "localField": "_id",
+            "foreignField": "_id",
+            "as": "user",
+        }},
+        {"$unwind": {"path": "$user", "preserveNullAndEmptyArrays": True}},
+        {"$project": {
+            "_id": 0,
+            "user_id": "$_id",
+            "username": "$user.username",
+            "email": "$user.email",
+            "orders": 1,
+            "wins": 1,
+            "losses": 1,
+            "total_staked": 1,
+            "total_paid_out": 1,
+        }},
+        {"$merge": {
+            "into": MongoUserStats.get_settings().name,
+            "on": "user_id",
+            "whenMatched": "replace",
+            "whenNotMatched": "insert",
+        }},
+    ]
+    await MongoOrder.aggregate(pipeline).to_list()
+    logger.info("Rebuilt user order stats from the orders collection.")
+
+
+async def query_user_stats(
+    min_wins: Optional[int] = None,
+    max_wins: Optional[int] = None,
+    min_losses: Optional[int] = None,
+    max_losses: Optional[int] = None,
+) -> List[MongoUserStats]:
+    """
+    Fetch the stats documents matching the win/loss bounds, in user creation order.
+    """
+    query_filters = {}
+    wins_range = {}
+    if min_wins is not None:
+        wins_range["$gte"] = min_wins
+    if max_wins is not None:
+        wins_range["$lte"] = max_wins
+    if wins_range:
+        query_filters["wins"] = wins_range
+
+    losses_range = {}
+    if min_losses is not None:
+        losses_range["$gte"] = min_losses
+    if max_losses is not None:
+        losses_range["$lte"] = max_losses
+    if losses_range:
+        query_filters["losses"] = losses_range
+
+    return await MongoUserStats.find(query_filters).sort("+user_id").to_list()
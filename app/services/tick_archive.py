@@ -0,0 +1,172 @@
+# trading_platform_backend/app/services/tick_archive.py
+
+# Columnar (Parquet) archive of the tick history
+
+# Completed UTC days of ticks are compacted from the storage repository into one Parquet file per
+# symbol and day, laid out as `<root>/symbol=<symbol>/date=<YYYY-MM-DD>/ticks.parquet` (symbols are
+# URL-quoted, e.g. EUR%2FUSD). Files are sorted by timestamp and written in row groups whose footer
+# min/max statistics let a time-range read skip every row group outside the range; whole days are
+# skipped from the directory names alone. Long-horizon reads (backtests, training on months of
+# ticks) load straight from the archive instead of paging documents out of the database.
+#
+# pyarrow is imported inside the methods, so the API runs without it until the archive is used.
+
+import asyncio
+import logging
+import os
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import List, Optional, Tuple
+from urllib.parse import quote, unquote
+
+import numpy as np
+from decouple import config
+
+from app.services.repository import Repository, get_repository
+
+logger = logging.getLogger(__name__)
+
+TICK_ARCHIVE_DIR = Path(config("TICK_ARCHIVE_DIR", default="tick_archive"))
+COMPACTION_INTERVAL = 3600  # Seconds between compaction runs
+COMPACTION_LOOKBACK_DAYS = 7  # Completed days checked for unarchived ticks on each run
+ARCHIVE_ROW_GROUP_SIZE = 65536  # Ticks per row group (the unit skipped by the timestamp statistics)
+ARCHIVE_COMPRESSION = "zstd"
+ARCHIVE_FILE = "ticks.parquet"
+
+
+class TickArchive:
+    """
+    Writes and reads the per-symbol, per-day Parquet partitions under `root`.
+    """
+
+    def __init__(self, root: Path = TICK_ARCHIVE_DIR):
+        self.root = Path(root)
+        self.stats = {"files_written": 0, "ticks_archived": 0, "failed_runs": 0}
+
+    def path(self, symbol: str, day: date) -> Path:
+        return self.root / f"symbol={quote(symbol, safe='')}" / f"date={day.isoformat()}" / ARCHIVE_FILE
+
+    def symbols(self) -> List[str]:
+        """
+        Symbols with archived ticks, sorted.
+        """
+        if not self.root.exists():
+            return []
+        return sorted(unquote(path.name.split("=", 1)[1]) for path in self.root.glob("symbol=*") if path.is_dir())
+
+    def days(self, symbol: str) -> List[date]:
+        """
+        Days archived for a symbol, oldest first.
+        """
+        symbol_dir = self.root / f"symbol={quote(symbol, safe='')}"
+        return sorted(
+            date.fromisoformat(path.parent.name.split("=", 1)[1])
+            for path in symbol_dir.glob(f"date=*/{ARCHIVE_FILE}")
+        )
+
+    def write_day(self, symbol: str, day: date, timestamps: np.ndarray, prices: np.ndarray) -> Path:
+        """
+        Write one day of a symbol's ticks (blocking). The file is written next to its final
+        path and renamed into place, so readers never see a partial file.
+        :param timestamps: Unix timestamps (float64 seconds), ascending
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        micros = np.round(np.asarray(timestamps, dtype=np.float64) * 1e6).astype(np.int64)
+        table = pa.table({
+            "timestamp": pa.array(micros.astype("datetime64[us]"), type=pa.timestamp("us")),
+            "price": pa.array(np.asarray(prices, dtype=np.float64), type=pa.float64()),
+        })
+        path = self.path(symbol, day)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix(".parquet.tmp")
+        pq.write_table(
+            table, partial,
+            row_group_size=ARCHIVE_ROW_GROUP_SIZE,
+            compression=ARCHIVE_COMPRESSION,
+            write_statistics=["timestamp"],
+        )
+        os.replace(partial, path)
+        return path
+
+    def _read(self, symbol: str, start: Optional[datetime], end: Optional[datetime]):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        filters = []
+        if start is not None:
+            filters.append(("timestamp", ">=", start))
+        if end is not None:
+            filters.append(("timestamp", "<", end))
+        tables = []
+        for day in self.days(symbol):
+            day_start = datetime.combine(day, time.min)
+            if (start is not None and day_start + timedelta(days=1) <= start) or (end is not None and day_start >= end):
+                continue  # Partition pruning on the directory name
+            tables.append(pq.read_table(
+                self.path(symbol, day), columns=["timestamp", "price"], filters=filters or None, partitioning=None
+            ))
+        if not tables:
+            return pa.table({"timestamp": pa.array([], type=pa.timestamp("us")), "price": pa.array([], type=pa.float64())})
+        return pa.concat_tables(tables)
+
+    def load(self, symbol: str, start: Optional[datetime] = None,
+             end: Optional[datetime] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        A symbol's archived ticks in a time range, oldest first (blocking).
+        :param start: UTC start of the range (inclusive)
+        :param end: UTC end of the range (exclusive)
+        :return: Unix timestamps (float64 seconds) and prices (float64), like `Repository.load_ticks`
+        """
+        table = self._read(symbol, start, end)
+        micros = table.column("timestamp").to_numpy().astype("datetime64[us]").astype(np.int64)
+        return micros / 1e6, table.column("price").to_numpy()
+
+    def load_frame(self, symbol: str, start: Optional[datetime] = None, end: Optional[datetime] = None):
+        """
+        A symbol's archived ticks in a time range as a pandas DataFrame (`timestamp`, `price`).
+        """
+        return self._read(symbol, start, end).to_pandas()
+
+    async def compact(self, repository: Optional[Repository] = None,
+                      lookback_days: int = COMPACTION_LOOKBACK_DAYS, today: Optional[date] = None) -> int:
+        """
+        Archive every completed day within `lookback_days` that has ticks in the repository
+        and no Parquet file yet. Files are written in a thread.
+        :return: Number of files written
+        """
+        repository = repository or get_repository()
+        today = today or datetime.utcnow().date()
+        written = 0
+        for symbol in await repository.tick_symbols():
+            archived = set(self.days(symbol))
+            for offset in range(lookback_days, 0, -1):
+                day = today - timedelta(days=offset)
+                if day in archived:
+                    continue
+                day_start = datetime.combine(day, time.min)
+                timestamps, prices = await repository.load_ticks(symbol, day_start, day_start + timedelta(days=1))
+                if not len(prices):
+                    continue
+                await asyncio.to_thread(self.write_day, symbol, day, timestamps, prices)
+                self.stats["files_written"] += 1
+                self.stats["ticks_archived"] += len(prices)
+                written += 1
+                logger.info(f"Archived {len(prices)} ticks for {symbol} on {day}.")
+        return written
+
+    async def compact_periodically(self, interval: int = COMPACTION_INTERVAL):
+        """
+        Background job compacting completed days every `interval` seconds.
+        """
+        while True:
+            try:
+                await self.compact()
+            except Exception as e:
+                self.stats["failed_runs"] += 1
+                logger.error(f"Tick archive compaction failed: {e}")
+            await asyncio.sleep(interval)
+
+
+tick_archive = TickArchive()
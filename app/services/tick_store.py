@@ -0,0 +1,80 @@
+# trading_platform_backend/app/services/tick_store.py
+
+# Persistent per-symbol tick history
+
+# Live ticks (see `app.utils.record_tick`) are buffered in memory and written to the storage
+# repository in batches, so the feeds never wait on a database round trip. History is read
+# back through the repository (`recent_prices`, `load_ticks`).
+
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Tuple
+
+from app.services.repository import get_repository
+
+logger = logging.getLogger(__name__)
+
+TICK_FLUSH_INTERVAL = 1.0  # Seconds between batch writes
+TICK_BUFFER_MAXLEN = 100000  # Unwritten ticks kept while the database is unavailable (oldest dropped first)
+
+
+class TickWriter:
+    """
+    Buffers ticks and writes them with one batch insert per flush.
+    A failed write puts the batch back in front of the buffer; if the buffer overflows,
+    the oldest ticks are dropped and counted.
+    """
+
+    def __init__(self, maxlen: int = TICK_BUFFER_MAXLEN):
+        self._buffer: Deque[Tuple[str, float, float]] = deque(maxlen=maxlen)
+        self.stats = {"written": 0, "dropped": 0, "failed_flushes": 0}
+
+    def add(self, symbol: str, timestamp: float, price: float):
+        """
+        Queue a tick for writing.
+        :param timestamp: Unix time the tick was received
+        """
+        if len(self._buffer) == self._buffer.maxlen:
+            self.stats["dropped"] += 1
+        self._buffer.append((symbol, timestamp, price))
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    async def flush(self) -> int:
+        """
+        Write all buffered ticks.
+        :return: Number of ticks written
+        """
+        if not self._buffer:
+            return 0
+        batch = list(self._buffer)
+        self._buffer.clear()
+        try:
+            await get_repository().insert_ticks(batch)
+        except Exception as e:
+            self.stats["failed_flushes"] += 1
+            logger.error(f"Failed to write {len(batch)} ticks: {e}")
+            requeued = deque(batch + list(self._buffer), maxlen=self._buffer.maxlen)
+            self.stats["dropped"] += len(batch) + len(self._buffer) - len(requeued)
+            self._buffer = requeued
+            return 0
+        self.stats["written"] += len(batch)
+        return len(batch)
+
+    async def flush_periodically(self, interval: float = TICK_FLUSH_INTERVAL):
+        """
+        Background job writing buffered ticks every `interval` seconds (and once more on cancellation).
+        """
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                await self.flush()
+        except asyncio.CancelledError:
+            await self.flush()
+            raise
+
+
+tick_writer = TickWriter()
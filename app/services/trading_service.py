@@ -1,15 +1,22 @@
 import asyncio
 import logging
 import re
+import time
 from datetime import datetime
 from typing import Optional
 
-from beanie import PydanticObjectId
 from cachetools import TTLCache
 from fastapi import HTTPException
 
-from app.models import MongoOrder, MongoUser
 from app.schemas import OrderCreate
+from app.services import stats_service
+from app.services.active_user_index import active_user_index
+from app.services.admission import admission_control, retry_after
+from app.services.exposure import PAYOUT_MULTIPLIER, exposure_book
+from app.services.leaderboard import leaderboard
+from app.services.metrics import order_placement_latency, order_rejections, settlement_lag
+from app.services.price_snapshot import price_snapshot
+from app.services.repository import OrderRecord, UserRecord, get_repository
 from app.utils import latest_prices
 
 # Configure TTLCache with a maxsize of 1000 and TTL of 60 seconds for each price entry
@@ -26,6 +33,7 @@ MIN_TRADE_AMOUNT = 10.0  # Minimum trade amount in dollars
 MAX_TRADE_AMOUNT = 1000.0  # Maximum trade amount in dollars
 VALID_TRADE_TIMES = [30, 60, 90, 120, 150, 180, 210, 240, 270, 300]  # 30 seconds to 5 minutes
 VALID_CURRENCY_TYPES = ["BTC", "ETH", "LTC", "XRP", "BNB", "KES", "USD", "JPY", "EUR"]
+EVALUATION_RETRY_DELAY = 5  # Seconds before retrying an evaluation that found no live price
 
 
 # Function to validate the trade based on system's trading rules
@@ -65,11 +73,34 @@ def validate_trade(order: OrderCreate):
         raise HTTPException(status_code=400, detail="Invalid currency type.")
 
 
+async def on_order_placed(order: OrderRecord, user: UserRecord):
+    """
+    Propagate a newly placed order to the derived views (stats, active users, leaderboard).
+    """
+    active_user_index.order_placed(order, user)
+    leaderboard.order_placed(order, user)
+    await stats_service.record_order_placed(order, user)
+
+
+async def on_order_settled(order: OrderRecord, user: UserRecord):
+    """
+    Propagate a settled order to the derived views (stats, active users, leaderboard).
+    """
+    active_user_index.order_settled(order, user)
+    leaderboard.order_settled(order, user)
+    await stats_service.record_order_settled(order, user)
+
+
+def _rejected(reason: str, status_code: int, detail: str, headers: Optional[dict] = None) -> HTTPException:
+    order_rejections.inc(reason)
+    return HTTPException(status_code=status_code, detail=detail, headers=headers)
+
+
 async def count_pending_orders_for_user(user_id: str) -> int:
     """
     Count how many pending orders a user currently has in the system.
     """
-    return await MongoOrder.find({"user_id": PydanticObjectId(user_id), "status": "pending"}).count()
+    return await get_repository().count_pending_orders(user_id)
 
 
 async def place_order_with_real_time_price(order: OrderCreate, user_id: Optional[str] = None):  # , user_id: str
@@ -78,6 +109,8 @@ async def place_order_with_real_time_price(order: OrderCreate, user_id: Optional
     If no user_id is provided, a temporary user ID will be used.
     """
 
+    started = time.perf_counter()
+
     # Use a temporary user ID if none is provided
 
     if user_id is None:
@@ -88,71 +121,104 @@ async def place_order_with_real_time_price(order: OrderCreate, user_id: Optional
         validate_trade(order)
     except HTTPException as e:
         logger.error(f"Trade validation failed: {e.detail}")
+        order_rejections.inc("invalid_trade")
         raise e
 
+    # Shed load and apply the per-user and per-symbol rate limits before any storage work
+    rejection = admission_control.check(user_id, order.symbol)
+    if rejection:
+        reason, status_code, detail, wait = rejection
+        raise _rejected(reason, status_code, detail, headers={"Retry-After": retry_after(wait)})
+
     # Acquire the latest prices safely using a lock to avoid race conditions
     async with latest_prices_lock:
         if order.symbol not in latest_prices:
-            raise HTTPException(status_code=404, detail="Real-time price not available for the trading pair.")
+            raise _rejected("no_price", 404, "Real-time price not available for the trading pair.")
+        if price_snapshot.is_stale(order.symbol):
+            # Restored at startup and no live tick since: too old to lock an order on
+            raise _rejected("stale_price", 404, "Real-time price not available for the trading pair.")
         locked_price = latest_prices[order.symbol]
 
-    # fecting the user to updated his/her balance
-    user = await MongoUser.get(PydanticObjectId(user_id))
-
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found.")
-
-    # check if the user has enough balance in account to allow betting
-    if user.balance < order.amount:
-        raise HTTPException(status_code=400, detail="Insufficient balance to place the order")
-
-    # make deduction of order amount from the user's balance
-    user.balance -= order.amount
-    await user.save()  # save the new updated useer's balnce
-
-    # Lock the price and proceed with placing the order
-    order_data = {
-        "user_id": PydanticObjectId(user_id),
-        "symbol": order.symbol,
-        "amount": order.amount,
-        "prediction": order.prediction,
-        "trade_time": order.trade_time,
-        "locked_price": locked_price,
-        "start_time": datetime.utcnow(),
-        "status": "pending",
-    }
+    # Reserve the stake against the pair's house exposure limit before touching the balance
+    if not exposure_book.reserve(order.symbol, order.prediction, order.amount):
+        logger.error(f"House exposure limit reached for {order.symbol}.")
+        raise _rejected("exposure_limit", 400, "House exposure limit reached for the trading pair.")
+
+    repository = get_repository()
+    admission_control.in_flight += 1
+    try:
+        # fecting the user to updated his/her balance
+        user = await repository.get_user(user_id)
 
-    # Insert the order into the MongoDB collection
-    mongo_order = MongoOrder(**order_data)
-    await mongo_order.insert()
-    print(f"Order placed: {order_data}")
+        if not user:
+            raise _rejected("unknown_user", 404, "User not found.")
+
+        # check if the user has enough balance in account to allow betting
+        if user.balance < order.amount:
+            raise _rejected("insufficient_balance", 400, "Insufficient balance to place the order")
+
+        # make deduction of order amount from the user's balance, unless a concurrent order spent it first
+        user = await repository.adjust_balance(user_id, -order.amount, min_balance=order.amount)
+        if not user:
+            raise _rejected("insufficient_balance", 400, "Insufficient balance to place the order")
+
+        # Lock the price and proceed with placing the order
+        placed_order = await repository.insert_order(OrderRecord(
+            user_id=user_id,
+            symbol=order.symbol,
+            amount=order.amount,
+            prediction=order.prediction,
+            trade_time=order.trade_time,
+            locked_price=locked_price,
+            start_time=datetime.utcnow(),
+            status="pending",
+        ))
+    except Exception as e:
+        exposure_book.release(order.symbol, order.prediction, order.amount)
+        if not isinstance(e, HTTPException):
+            order_rejections.inc("error")
+        raise
+    finally:
+        admission_control.in_flight -= 1
+
+    print(f"Order placed: {placed_order}")
+    await on_order_placed(placed_order, user)
 
     # Schedule the order evaluation after the specified trade time
-    schedule_evaluation(mongo_order.trade_time, str(mongo_order.id))
+    schedule_evaluation(placed_order.trade_time, placed_order.id)
+
+    order_placement_latency.observe(time.perf_counter() - started)
 
     # Return the order data with the ID
     return {
-        "id": str(mongo_order.id),
-        "user_id": str(mongo_order.user_id),
-        "symbol": mongo_order.symbol,
-        "amount": mongo_order.amount,
-        "prediction": mongo_order.prediction,
-        "trade_time": mongo_order.trade_time,
-        "locked_price": mongo_order.locked_price,
-        "start_time": mongo_order.start_time,
-        "status": mongo_order.status,
+        "id": placed_order.id,
+        "user_id": placed_order.user_id,
+        "symbol": placed_order.symbol,
+        "amount": placed_order.amount,
+        "prediction": placed_order.prediction,
+        "trade_time": placed_order.trade_time,
+        "locked_price": placed_order.locked_price,
+        "start_time": placed_order.start_time,
+        "status": placed_order.status,
     }
 
 
 async def evaluate_order_outcome_with_real_time_price(order_id: str):
     """
     Evaluates the outcome of an order based on real-time prices without blocking the WebSocket connection.
+    Without a live price for the pair, or on a storage error, the evaluation is retried after
+    EVALUATION_RETRY_DELAY seconds. Otherwise the order's stake is released from this process's
+    exposure book once the evaluation is over, whichever process settles the order: every process
+    evaluating an order holds its stake (reserved on placement, or seeded by `ExposureBook.load`).
     """
     print(f"Starting evaluation for order {order_id}...")
 
+    order = None
+    retry = False
     try:
-        # Fetch the order from MongoDB
-        order = await MongoOrder.get(PydanticObjectId(order_id))
+        # Fetch the order from storage
+        repository = get_repository()
+        order = await repository.get_order(order_id)
         if not order:
             print(f"Order {order_id} not found.")
             return
@@ -163,53 +229,53 @@ async def evaluate_order_outcome_with_real_time_price(order_id: str):
 
         # Acquire latest prices safely
         async with latest_prices_lock:
-            if order.symbol not in latest_prices:
-                print(f"Real-time price for {order.symbol} not found.")
+            final_price = latest_prices.get(order.symbol)
+            if final_price is None or price_snapshot.is_stale(order.symbol):
+                # No price to settle on yet: keep the order pending and try again shortly
+                logger.warning(f"No live price for {order.symbol}; retrying evaluation of order {order_id} "
+                               f"in {EVALUATION_RETRY_DELAY}s.")
+                retry = True
                 return
-            final_price = latest_prices[order.symbol]
 
         print(f"Evaluating order {order_id} with final price {final_price} and locked price {order.locked_price}")
 
-        # Fetch the user from MongoDB
-        user = await MongoUser.get(order.user_id)
+        # Fetch the user from storage
+        user = await repository.get_user(order.user_id)
         if not user:
-            print(f"User with ID {order.user_id} not found.")
+            logger.error(f"User with ID {order.user_id} not found; order {order_id} is left pending.")
             return
 
-        payout = 0
-
-        # Determine if the prediction was correct and update order status
+        # Determine if the prediction was correct
         if order.prediction == "rise" and final_price > order.locked_price:
-            order.status = "win"
-            payout = order.amount * 1.02  # 2% payout for correct prediction
-            order.payout = payout  # setting payout value
+            status, payout = "win", order.amount * PAYOUT_MULTIPLIER  # 2% payout for correct prediction
             print(f"Order {order_id}: User won! Final price: {final_price}, Locked price: {order.locked_price}.")
-
-            # Update user's balance
-            user.balance += payout
         elif order.prediction == "fall" and final_price < order.locked_price:
-            order.status = "win"
-            payout = order.amount * 1.02
-            order.payout = payout
+            status, payout = "win", order.amount * PAYOUT_MULTIPLIER
             print(f"Order {order_id}: User won! Final price: {final_price}, Locked price: {order.locked_price}.")
-
-            # Update user's balance
-            user.balance += payout
         else:
-            order.status = "lose"
-            order.payout = 0  # setting payout to 0 (zero) if the user loses
+            status, payout = "lose", 0  # setting payout to 0 (zero) if the user loses
             print(f"Order {order_id}: User lost. Final price: {final_price}, Locked price: {order.locked_price}.")
 
-        # Save the updated order status and user balance in a non-blocking way
-        await order.save()
-        await user.save()
-        print(f"Order {order_id} evaluated with real-time price: {final_price}, Status: {order.status}")
+        # Update the order status and credit the payout; only one evaluation can settle a pending order
+        settled = await repository.settle_order(order_id, status, payout)
+        if not settled:
+            print(f"Order {order_id} was settled concurrently.")
+            return
+        settlement_lag.observe((datetime.utcnow() - settled.start_time).total_seconds() - settled.trade_time)
+        await on_order_settled(settled, user)
+        print(f"Order {order_id} evaluated with real-time price: {final_price}, Status: {settled.status}")
 
-    except Exception as e:
-        print(f"Error evaluating order {order_id}: {e}")
+    except Exception:
+        logger.exception(f"Error evaluating order {order_id}; retrying in {EVALUATION_RETRY_DELAY}s.")
+        retry = True
+    finally:
+        if retry:
+            schedule_evaluation(EVALUATION_RETRY_DELAY, order_id)
+        elif order is not None:
+            exposure_book.release(order.symbol, order.prediction, order.amount)
 
 
-def schedule_evaluation(trade_time: int, order_id: str):
+def schedule_evaluation(trade_time: float, order_id: str):
     """
     Schedules the evaluation of the order outcome after trade_time seconds.
     """
@@ -220,3 +286,24 @@ def schedule_evaluation(trade_time: int, order_id: str):
 
     # Schedule evaluation as a background task
     asyncio.create_task(evaluate())
+
+
+async def resume_pending_orders() -> int:
+    """
+    Schedule the evaluation of every order still pending in storage, e.g. after a restart dropped
+    the in-memory evaluation tasks: after the rest of its trade time, or at once if it is overdue.
+    Every process resumes every pending order; only one evaluation settles each. Payouts whose
+    credit was interrupted (see `Repository.reconcile_payouts`) are credited first.
+    :return: Number of orders scheduled
+    """
+    repository = get_repository()
+    credited = await repository.reconcile_payouts()
+    if credited:
+        logger.warning(f"Credited {credited} interrupted payouts.")
+    now = datetime.utcnow()
+    pending = [order for order in await repository.active_orders(now) if order.status == "pending"]
+    for order in pending:
+        remaining = (order.start_time - now).total_seconds() + order.trade_time
+        schedule_evaluation(max(remaining, 0.0), order.id)
+    logger.info(f"Resumed the evaluation of {len(pending)} pending orders.")
+    return len(pending)
@@ -2,12 +2,18 @@ import asyncio
 import json
 import logging
 import time
+from collections import deque
+from typing import Deque, Dict, Tuple
 
 import requests
 import websockets
 from cachetools import TTLCache
+from decouple import config
 
-from app.models import MongoTradingPair
+from app.services.metrics import message_latency, ticks_received, ticks_recorded
+from app.services.price_snapshot import price_snapshot
+from app.services.repository import get_repository
+from app.services.tick_store import tick_writer
 
 logger = logging.getLogger(__name__)
 
@@ -19,9 +25,14 @@ last_update_times = TTLCache(maxsize=10000, ttl=2)  # Store last update times wi
 latest_prices = {}
 latest_prices_lock = asyncio.Lock()
 
-# WebSocket URLs for different sources
-BINANCE_WS_URL = "wss://stream.binance.com:9443/ws"
-KRAKEN_WS_URL = "wss://ws.kraken.com"
+# Per-symbol tick sequence numbers and buffers of the most recent ticks as (seq, timestamp, price)
+RECENT_TICKS_MAXLEN = 1000
+tick_versions: Dict[str, int] = {}
+recent_ticks: Dict[str, Deque[Tuple[int, float, float]]] = {}
+
+# WebSocket URLs for different sources (point them at scripts/replay_feeds.py to replay captured feeds)
+BINANCE_WS_URL = config("BINANCE_WS_URL", default="wss://stream.binance.com:9443/ws")
+KRAKEN_WS_URL = config("KRAKEN_WS_URL", default="wss://ws.kraken.com")
 
 # Mapping of symbols to our internal representation
 WEBSOCKET_CURRENCY_PAIRS = {
@@ -47,6 +58,40 @@ WEBSOCKET_CURRENCY_PAIRS = {
 cache_lock = asyncio.Lock()
 
 
+def record_tick(symbol: str, price: float, source: str = "unknown"):
+    """
+    Record a new price for a trading pair: update `latest_prices`, bump the symbol's tick
+    version, append the tick to its recent-ticks buffer and queue it for the tick history.
+    :param symbol: Symbol of the trading pair
+    :param price: Latest price of the trading pair
+    :param source: Feed the price came from (metrics label)
+    """
+    latest_prices[symbol] = price
+    seq = tick_versions.get(symbol, 0) + 1
+    tick_versions[symbol] = seq
+    if symbol not in recent_ticks:
+        recent_ticks[symbol] = deque(maxlen=RECENT_TICKS_MAXLEN)
+    timestamp = time.time()
+    recent_ticks[symbol].append((seq, timestamp, price))
+    tick_writer.add(symbol, timestamp, price)
+    price_snapshot.record(symbol, seq, timestamp, price)
+    ticks_recorded.inc(source, symbol)
+
+
+def restore_price_snapshot() -> int:
+    """
+    Seed `latest_prices`, `tick_versions` and `recent_ticks` from the price snapshot journal
+    (see `app.services.price_snapshot`). Restored prices are flagged until their first live tick.
+    :return: Number of symbols restored
+    """
+    entries = price_snapshot.load()
+    for symbol, (seq, timestamp, price, ticks) in entries.items():
+        latest_prices[symbol] = price
+        tick_versions[symbol] = seq
+        recent_ticks[symbol] = deque(ticks, maxlen=RECENT_TICKS_MAXLEN)
+    return len(entries)
+
+
 async def should_update(symbol: str, interval: int = 2):
     """
     Determines whether a trading pair should be updated based on the throttling interval.
@@ -103,12 +148,14 @@ async def send_pings(websocket, interval=30):
             break
 
 
-async def reconnect_with_backoff(url, subscription_message):
+async def reconnect_with_backoff(url, subscription_message, on_message=None):
     """
     Reconnect to the WebSocket with exponential backoff on connection failures.
     :param url: WebSocket URL to connect to
     :param subscription_message: The message to send to subscribe to the WebSocket updates
+    :param on_message: Coroutine function called with every message (default: `handle_message`)
     """
+    on_message = on_message or handle_message
     delay = 2  # Initial delay in seconds
     max_delay = 60  # Maximum delay in seconds
     while True:
@@ -118,11 +165,12 @@ async def reconnect_with_backoff(url, subscription_message):
             logger.info(f"Connected to WebSocket at {url} and subscribing to currency pairs.")
             await websocket.send(subscription_message)
             asyncio.create_task(send_pings(websocket, interval=120))  # Start sending pings
+            delay = 2  # Connected: the next failure starts the backoff over
 
             # Listen for messages
             while True:
                 message = await websocket.recv()
-                await handle_message(message)
+                await on_message(message)
 
         except websockets.exceptions.ConnectionClosed as e:
             logger.error(f"Connection closed: {e}. Retrying in {delay} seconds...")
@@ -139,39 +187,47 @@ async def handle_message(message):
     Handle incoming WebSocket messages and update trading pairs in the database.
     :param message: The WebSocket message
     """
+    started = time.perf_counter()
+    source = "unknown"
     try:
         data = json.loads(message)
 
         # Handle Binance messages: They usually come as a dictionary
         if isinstance(data, dict) and data.get("e") == "trade":  # Filter for trade events
+            source = "binance"
             symbol = data["s"].lower()
             price = float(data["p"])
             if symbol in WEBSOCKET_CURRENCY_PAIRS:
                 mapped_symbol = WEBSOCKET_CURRENCY_PAIRS[symbol]
+                ticks_received.inc(source, mapped_symbol)  # Every tick, before the update throttle
                 if await should_update(mapped_symbol):
                     async with cache_lock:
                         price_cache[mapped_symbol] = price
 
                     async with latest_prices_lock:
-                        latest_prices[mapped_symbol] = price
+                        record_tick(mapped_symbol, price, source)
                     await update_or_create_trading_pair(mapped_symbol, price)
 
         # Handle Kraken messages
         elif isinstance(data, list) and len(data) > 1 and isinstance(data[1], dict):
+            source = "kraken"
             pair = data[3]  # The trading pair (e.g., XBT/USD)
             price = float(data[1]['c'][0])  # Current price from the response
             mapped_symbol = WEBSOCKET_CURRENCY_PAIRS.get(pair)
             if mapped_symbol:
+                ticks_received.inc(source, mapped_symbol)  # Every tick, before the update throttle
                 if await should_update(mapped_symbol):
                     async with cache_lock:
                         price_cache[mapped_symbol] = price
 
                     async with latest_prices_lock:
-                        latest_prices[mapped_symbol] = price
+                        record_tick(mapped_symbol, price, source)
                     await update_or_create_trading_pair(mapped_symbol, price)
 
     except Exception as e:
         logger.error(f"Error handling message: processing WebSocket message: {e}")
+    finally:
+        message_latency.observe(time.perf_counter() - started, source)
 
 
 async def binance_websocket_listener():
@@ -212,14 +268,16 @@ async def fetch_http_prices():
         "vs_currencies": "usd"
     }
     try:
-        response = requests.get(COINGECKO_API_URL, params=params)
+        # In a thread: a synchronous request would block the event loop for the whole round trip
+        response = await asyncio.to_thread(requests.get, COINGECKO_API_URL, params=params, timeout=10)
         if response.status_code == 200:
             data = response.json()
             for symbol, price_data in data.items():
                 price = price_data['usd']
                 mapped_symbol = WEBSOCKET_CURRENCY_PAIRS.get(f"{symbol}usd", None)
                 if mapped_symbol:
-                    latest_prices[mapped_symbol] = price
+                    ticks_received.inc("coingecko", mapped_symbol)
+                    record_tick(mapped_symbol, price, "coingecko")
                     await update_or_create_trading_pair(mapped_symbol, price)
             logger.info(f"Prices fetched via HTTP fallback: {latest_prices}")
         else:
@@ -230,18 +288,12 @@ async def fetch_http_prices():
 
 async def update_or_create_trading_pair(symbol: str, price: float):
     """
-    Update the trading pair in MongoDB.
+    Update the trading pair's stored price, creating the pair if needed.
     :param symbol: Symbol of the trading pair (e.g., BTC, EUR/USD)
     :param price: Latest price of the trading pair
     """
     try:
-        mongo_trading_pair = await MongoTradingPair.find_one(MongoTradingPair.symbol == symbol)
-        if mongo_trading_pair:
-            mongo_trading_pair.price = price
-            await mongo_trading_pair.save()
-        else:
-            mongo_trading_pair = MongoTradingPair(symbol=symbol, price=price)
-            await mongo_trading_pair.insert()
-        logger.info(f"Updated/created trading pair {symbol} with price {price}.")
+        await get_repository().upsert_price(symbol, price)
+        logger.debug(f"Updated/created trading pair {symbol} with price {price}.")
     except Exception as e:
         logger.error(f"Failed to update or create trading pair {symbol}: {e}")
@@ -0,0 +1,113 @@
+# Benchmark for the model-input feature pipeline
+
+# trading_platform_backend/benchmarks/bench_feature_pipeline.py
+
+# Compares the original loop-based LSTM window preparation (reproduced below) with the strided
+# float32 windows of app/services/features.py, and loop implementations of log returns,
+# rolling volatility and EMAs with their vectorized versions, on synthetic random-walk histories.
+# Also reports the per-tick cost of the incremental FeatureTracker.
+#
+# Usage: python -m benchmarks.bench_feature_pipeline --points 10000 --points 1000000
+
+import argparse
+import math
+import time
+
+import numpy as np
+from sklearn.preprocessing import MinMaxScaler
+
+from app.services import features
+from app.utils import record_tick
+
+TIME_STEPS = 5
+
+
+def prepare_data_loop(prices, time_steps):
+    """
+    The original `prepare_data`: fit a scaler, then build windows one list entry per step.
+    """
+    prices = np.array(prices)
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    prices_scaled = scaler.fit_transform(prices.reshape(-1, 1))
+
+    X, y = [], []
+    for i in range(time_steps, len(prices_scaled)):
+        X.append(prices_scaled[i - time_steps:i, 0])
+        y.append(prices_scaled[i, 0])
+
+    return np.array(X), np.array(y), scaler
+
+
+def rolling_features_loop(prices, window, spans):
+    returns = [math.log(prices[i] / prices[i - 1]) for i in range(1, len(prices))]
+    volatility = [float(np.std(returns[i - window:i], ddof=1)) for i in range(window, len(returns) + 1)]
+    emas = []
+    for span in spans:
+        alpha = 2.0 / (span + 1)
+        value, smoothed = prices[0], []
+        for price in prices:
+            value += alpha * (price - value)
+            smoothed.append(value)
+        emas.append(smoothed)
+    return returns, volatility, emas
+
+
+def rolling_features_vectorized(prices, window, spans):
+    returns = features.log_returns(prices)
+    return returns, features.rolling_volatility(returns, window), [features.ema(prices, span) for span in spans]
+
+
+def best_of(repeat, fn, *args):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def run(points: int, repeat: int):
+    prices = (100 * np.exp(np.cumsum(np.random.normal(0, 0.001, points)))).tolist()
+    print(f"points={points} (best of {repeat})")
+
+    loop_time, (X_loop, y_loop, _) = best_of(repeat, prepare_data_loop, prices, TIME_STEPS)
+    strided_time, (X, y, _, _) = best_of(repeat, features.lstm_training_data, prices, TIME_STEPS)
+    assert np.allclose(X, X_loop, atol=1e-5) and np.allclose(y, y_loop, atol=1e-5)
+    assert np.shares_memory(X, y)  # Both are views of one scaled float32 buffer
+    print(f"  windows   loop={loop_time * 1e3:9.2f} ms  strided={strided_time * 1e3:9.2f} ms  "
+          f"speedup={loop_time / strided_time:7.1f}x  "
+          f"bytes: loop={X_loop.nbytes + y_loop.nbytes:,} strided={points * 4:,}")
+
+    spans = features.EMA_SPANS
+    window = features.VOLATILITY_WINDOW
+    # The loop version is O(points * window); keep it to a manageable size
+    loop_points = min(points, 100000)
+    loop_time, _ = best_of(1, rolling_features_loop, prices[:loop_points], window, spans)
+    loop_time *= points / loop_points
+    vector_time, _ = best_of(repeat, rolling_features_vectorized, prices, window, spans)
+    print(f"  rolling   loop={loop_time * 1e3:9.2f} ms{'*' if loop_points < points else ' '} "
+          f"vectorized={vector_time * 1e3:6.2f} ms  speedup={loop_time / vector_time:7.1f}x")
+
+    tracker = features.FeatureTracker(window, spans)
+    ticks = prices[-10000:]
+    started = time.perf_counter()
+    for price in ticks:
+        record_tick("BENCH", price)
+        tracker.update("BENCH")
+    per_tick = (time.perf_counter() - started) / len(ticks)
+    print(f"  tracker   {per_tick * 1e6:.2f} us per tick (record + update)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, action="append", help="History length (repeatable)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for points in args.points or [10000, 100000, 1000000]:
+        run(points, args.repeat)
+    print("* extrapolated from the first 100000 points")
+
+
+if __name__ == "__main__":
+    main()
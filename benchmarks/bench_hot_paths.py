@@ -0,0 +1,278 @@
+# Micro-benchmarks for the trading hot paths
+
+# trading_platform_backend/benchmarks/bench_hot_paths.py
+
+# Times the per-operation cost of the feed, order and model-input hot paths against an
+# in-memory repository (no database needed):
+#   handle_message on Binance and Kraken frames (benchmarks/fixtures/feed_frames.jsonl, in the
+#   feed recorder's format), should_update throttling, record_tick, validate_trade, order
+#   placement, the admission check, settlement, OrderResponse serialization and prepare_data.
+#
+# Results are printed and, with --json, written as JSON. Each case has a ceiling in
+# benchmarks/hot_path_thresholds.json (microseconds per operation); --check exits with status 1
+# if a case exceeds its ceiling, or with --baseline, if it is more than --tolerance slower
+# than in an earlier --json result.
+#
+# Usage: python -m benchmarks.bench_hot_paths --json results.json --check
+#        python -m benchmarks.bench_hot_paths --baseline results.json --check --case place_order
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+from pydantic import TypeAdapter
+
+from app import utils
+from app.schemas import OrderCreate, OrderResponse
+from app.services import trading_service
+from app.services.admission import SharedTokenBuckets, admission_control
+from app.services.feed_capture import read_capture
+from app.services.price_snapshot import price_snapshot
+from app.services.repository import InMemoryRepository, use_repository
+
+FIXTURE_FRAMES = Path(__file__).parent / "fixtures" / "feed_frames.jsonl"
+THRESHOLDS_FILE = Path(__file__).parent / "hot_path_thresholds.json"
+BENCH_SYMBOLS = ["BTC", "ETH", "LTC", "XRP", "BNB"]
+PREPARE_DATA_POINTS = 1000
+ORDER_RESPONSE_ADAPTER = TypeAdapter(OrderResponse)
+
+
+def load_frames(source: str) -> List[str]:
+    """
+    Raw frames of one feed ("binance" or "kraken") from the recorded fixture.
+    """
+    return [frame for _, _, frame in read_capture(FIXTURE_FRAMES, [source])]
+
+
+class HotPathBench:
+    """
+    Benchmark state: a seeded in-memory repository, a funded user and the fixture inputs.
+    Each case runs `ops` operations and returns how many it ran, or (operations, seconds) when
+    only part of the round is timed.
+    """
+
+    def __init__(self, ops: int):
+        self.ops = ops
+        self.binance_frames = load_frames("binance")
+        self.kraken_frames = load_frames("kraken")
+        self.user_id = None
+        self.devnull = open(os.devnull, "w")  # The order paths print on every order
+
+    async def setup(self, scratch: Path):
+        repository = InMemoryRepository()
+        use_repository(repository)
+        price_snapshot.close()
+        price_snapshot.path = scratch / "price_snapshot.bin"
+        # One user places every order: buckets that never run dry, in scratch files
+        admission_control.users = SharedTokenBuckets(scratch / "users.bin", rate=1e12, capacity=1e12)
+        admission_control.symbols = SharedTokenBuckets(scratch / "symbols.bin", rate=1e12, capacity=1e12)
+        user = await repository.create_user("bench_user", "bench@example.com", "x", balance=1e12)
+        self.user_id = user.id
+        for i, symbol in enumerate(BENCH_SYMBOLS):
+            utils.record_tick(symbol, 100.0 + i, "bench")
+            await repository.upsert_price(symbol, 100.0 + i)
+
+    def _orders(self) -> List[OrderCreate]:
+        return [
+            OrderCreate(symbol=BENCH_SYMBOLS[i % len(BENCH_SYMBOLS)], amount=10.0 + i % 90,
+                        prediction="rise" if i % 2 else "fall", trade_time=30)
+            for i in range(self.ops)
+        ]
+
+    async def handle_message_binance(self) -> int:
+        frames = self.binance_frames
+        for i in range(self.ops):
+            await utils.handle_message(frames[i % len(frames)])
+        return self.ops
+
+    async def handle_message_kraken(self) -> int:
+        frames = self.kraken_frames
+        for i in range(self.ops):
+            await utils.handle_message(frames[i % len(frames)])
+        return self.ops
+
+    async def should_update(self) -> int:
+        for i in range(self.ops):
+            await utils.should_update(BENCH_SYMBOLS[i % len(BENCH_SYMBOLS)])
+        return self.ops
+
+    async def record_tick(self) -> int:
+        for i in range(self.ops):
+            utils.record_tick(BENCH_SYMBOLS[i % len(BENCH_SYMBOLS)], 100.0 + (i % 7) * 0.01, "bench")
+        return self.ops
+
+    async def validate_trade(self) -> Tuple[int, float]:
+        orders = self._orders()
+        started = time.perf_counter()
+        for order in orders:
+            trading_service.validate_trade(order)
+        return self.ops, time.perf_counter() - started
+
+    async def admission_check(self) -> int:
+        for i in range(self.ops):
+            admission_control.check(self.user_id, BENCH_SYMBOLS[i % len(BENCH_SYMBOLS)])
+        return self.ops
+
+    async def _place(self, orders: List[OrderCreate]) -> List[str]:
+        return [
+            (await trading_service.place_order_with_real_time_price(order, self.user_id))["id"] for order in orders
+        ]
+
+    async def _settle(self, order_ids: List[str]):
+        for order_id in order_ids:
+            await trading_service.evaluate_order_outcome_with_real_time_price(order_id)
+
+    async def place_order(self) -> Tuple[int, float]:
+        orders = self._orders()
+        with redirect_stdout(self.devnull):
+            started = time.perf_counter()
+            order_ids = await self._place(orders)
+            elapsed = time.perf_counter() - started
+            await self._settle(order_ids)  # Release the exposure for the next round
+        return self.ops, elapsed
+
+    async def settle_order(self) -> Tuple[int, float]:
+        with redirect_stdout(self.devnull):
+            order_ids = await self._place(self._orders())
+            started = time.perf_counter()
+            await self._settle(order_ids)
+            return self.ops, time.perf_counter() - started
+
+    async def serialize_order_response(self) -> int:
+        """
+        What FastAPI does with a placed order: validate it against OrderResponse, dump it in
+        JSON mode and encode it with the stdlib json module.
+        """
+        response = {
+            "id": "6706b0b9571ca603c9868675", "user_id": "6706b0b9571ca603c9868674", "symbol": "BTC",
+            "amount": 25.0, "prediction": "rise", "trade_time": 60, "locked_price": 67250.12,
+            "start_time": "2024-10-19T11:00:00.123456", "status": "pending",
+        }
+        for _ in range(self.ops):
+            content = ORDER_RESPONSE_ADAPTER.dump_python(ORDER_RESPONSE_ADAPTER.validate_python(response), mode="json")
+            json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+        return self.ops
+
+    async def prepare_data(self) -> Tuple[int, float]:
+        from app.services.lstm_model import prepare_data  # Imports TensorFlow
+
+        prices = (100 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.001, PREPARE_DATA_POINTS)))).tolist()
+        calls = max(self.ops // 100, 1)
+        started = time.perf_counter()
+        for _ in range(calls):
+            prepare_data(prices, 5)
+        return calls, time.perf_counter() - started
+
+    def cases(self) -> Dict[str, Callable]:
+        return {
+            "handle_message_binance": self.handle_message_binance,
+            "handle_message_kraken": self.handle_message_kraken,
+            "should_update": self.should_update,
+            "record_tick": self.record_tick,
+            "validate_trade": self.validate_trade,
+            "place_order": self.place_order,
+            "admission_check": self.admission_check,
+            "settle_order": self.settle_order,
+            "serialize_order_response": self.serialize_order_response,
+            "prepare_data": self.prepare_data,
+        }
+
+
+async def time_case(case: Callable, repeat: int) -> dict:
+    """
+    Run a case `repeat` times. Cases that need unmeasured setup per round return (ops, seconds);
+    the others are timed as a whole.
+    """
+    per_op = []
+    ops = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = await case()
+        elapsed = time.perf_counter() - started
+        ops, elapsed = result if isinstance(result, tuple) else (result, elapsed)
+        per_op.append(elapsed / ops * 1e6)
+    return {"ops": ops, "us_per_op": min(per_op), "median_us_per_op": statistics.median(per_op)}
+
+
+def check(results: Dict[str, dict], thresholds: Dict[str, float], baseline: Dict[str, dict],
+          tolerance: float) -> List[str]:
+    """
+    :return: One message per case over its ceiling or slower than the baseline by more than `tolerance`
+    """
+    failures = []
+    for name, result in results.items():
+        ceiling = thresholds.get(name)
+        if ceiling is not None and result["us_per_op"] > ceiling:
+            failures.append(f"{name}: {result['us_per_op']:.2f} us/op is over its ceiling of {ceiling:.2f}")
+        previous = baseline.get(name)
+        if previous and result["us_per_op"] > previous["us_per_op"] * (1 + tolerance):
+            failures.append(f"{name}: {result['us_per_op']:.2f} us/op is more than {tolerance:.0%} slower "
+                            f"than the baseline {previous['us_per_op']:.2f}")
+    return failures
+
+
+async def run(args) -> int:
+    bench = HotPathBench(args.ops)
+    cases = bench.cases()
+    selected = args.case or list(cases)
+    unknown = set(selected) - set(cases)
+    if unknown:
+        raise SystemExit(f"Unknown case(s): {', '.join(sorted(unknown))}; expected {', '.join(cases)}")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        await bench.setup(Path(scratch))
+        results = {}
+        for name in selected:
+            results[name] = await time_case(cases[name], args.repeat)
+            print(f"  {name:<26} {results[name]['us_per_op']:10.2f} us/op  "
+                  f"(median {results[name]['median_us_per_op']:.2f}, {results[name]['ops']} ops, best of {args.repeat})")
+        price_snapshot.close()
+
+    # Evaluations scheduled by the placed orders
+    for task in asyncio.all_tasks():
+        if task is not asyncio.current_task():
+            task.cancel()
+
+    thresholds = json.loads(THRESHOLDS_FILE.read_text())
+    baseline = json.loads(Path(args.baseline).read_text())["cases"] if args.baseline else {}
+    failures = check(results, thresholds, baseline, args.tolerance)
+    if args.json:
+        report = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "ops": args.ops,
+            "repeat": args.repeat,
+            "cases": {name: {**result, "threshold_us_per_op": thresholds.get(name)} for name, result in results.items()},
+            "failures": failures,
+        }
+        Path(args.json).write_text(json.dumps(report, indent=2))
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    return 1 if failures and args.check else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the trading hot paths")
+    parser.add_argument("--ops", type=int, default=2000, help="Operations per round")
+    parser.add_argument("--repeat", type=int, default=5, help="Rounds per case (the best is reported)")
+    parser.add_argument("--case", action="append", help="Case to run (repeatable; default: all)")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Earlier --json result to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown against the baseline")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 on a regression")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
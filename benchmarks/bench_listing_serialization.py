@@ -0,0 +1,119 @@
+# Benchmark for the order listing read path
+
+# trading_platform_backend/benchmarks/bench_listing_serialization.py
+
+# Compares the per-row cost of the original listing path (Beanie documents, string id
+# overwrite, OrderResponse validation, stdlib json) with the projection read path
+# (raw Motor rows, order_row, orjson) on a scratch database seeded with synthetic orders.
+#
+# Usage: python -m benchmarks.bench_listing_serialization --rows 10000 --rows 100000
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import orjson
+from beanie import PydanticObjectId, init_beanie
+from decouple import config
+from motor.motor_asyncio import AsyncIOMotorClient
+from pydantic import TypeAdapter
+
+from app.models import MongoOrder
+from app.schemas import OrderResponse
+from app.services.read_models import find_order_rows, order_row
+
+BENCH_DB_NAME = "trading_benchmark"
+ORDER_LIST_ADAPTER = TypeAdapter(List[OrderResponse])
+
+
+async def seed_orders(user_id: PydanticObjectId, rows: int):
+    collection = MongoOrder.get_motor_collection()
+    await collection.delete_many({})
+    start = datetime.utcnow() - timedelta(days=30)
+    documents = [
+        {
+            "user_id": user_id,
+            "symbol": random.choice(["BTC", "ETH", "LTC", "XRP", "BNB"]),
+            "amount": round(random.uniform(10, 1000), 2),
+            "prediction": random.choice(["rise", "fall"]),
+            "trade_time": random.choice([30, 60, 90, 120]),
+            "start_time": start + timedelta(seconds=i),
+            "locked_price": random.uniform(100, 60000),
+            "status": random.choice(["win", "lose"]),
+            "payout": random.choice([0.0, 102.0]),
+        }
+        for i in range(rows)
+    ]
+    for i in range(0, rows, 10000):
+        await collection.insert_many(documents[i:i + 10000])
+
+
+def serialize_documents(orders: List[MongoOrder]) -> bytes:
+    """
+    What the original route did: overwrite ids with strings, then FastAPI validated the
+    list against List[OrderResponse] and rendered it with the stdlib json encoder.
+    """
+    for order in orders:
+        order.id = str(order.id)
+        order.user_id = str(order.user_id)
+    validated = ORDER_LIST_ADAPTER.validate_python(orders, from_attributes=True)
+    content = ORDER_LIST_ADAPTER.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def serialize_rows(rows: List[dict]) -> bytes:
+    """
+    The projection read path: shape raw rows and render them with orjson.
+    """
+    return orjson.dumps([order_row(row) for row in rows])
+
+
+async def run(rows: int, repeat: int):
+    user_id = PydanticObjectId()
+    await seed_orders(user_id, rows)
+
+    results = {"documents": {"fetch": [], "serialize": []}, "projection": {"fetch": [], "serialize": []}}
+    for _ in range(repeat):
+        started = time.perf_counter()
+        orders = await MongoOrder.find({"user_id": user_id}).to_list()
+        results["documents"]["fetch"].append(time.perf_counter() - started)
+        started = time.perf_counter()
+        serialize_documents(orders)
+        results["documents"]["serialize"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        order_rows = await find_order_rows({"user_id": user_id})
+        results["projection"]["fetch"].append(time.perf_counter() - started)
+        started = time.perf_counter()
+        serialize_rows(order_rows)
+        results["projection"]["serialize"].append(time.perf_counter() - started)
+
+    print(f"rows={rows} (best of {repeat}, microseconds per row)")
+    for path, timings in results.items():
+        fetch = min(timings["fetch"]) / rows * 1e6
+        serialize = min(timings["serialize"]) / rows * 1e6
+        print(f"  {path:<10} fetch={fetch:8.2f}  serialize={serialize:8.2f}  total={fetch + serialize:8.2f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, action="append", help="Result set size (repeatable)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    MONGO_URI = config("MONGO_URI", default="mongodb://localhost:27017")
+    client = AsyncIOMotorClient(MONGO_URI)
+    await init_beanie(database=client[BENCH_DB_NAME], document_models=[MongoOrder])
+    try:
+        for rows in args.rows or [10000, 100000]:
+            await run(rows, args.repeat)
+    finally:
+        await client.drop_database(BENCH_DB_NAME)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -5,61 +5,172 @@
 import asyncio
 import logging
 import os
+from contextlib import asynccontextmanager
 
 from beanie import init_beanie
-from decouple import config
 from fastapi import FastAPI
-from motor.motor_asyncio import AsyncIOMotorClient
+from fastapi.responses import PlainTextResponse
 from websockets.exceptions import ConnectionClosed, ConnectionClosedError
 from slowapi.middleware import SlowAPIMiddleware
 from slowapi import Limiter
 from slowapi.util import get_remote_address
-from app.models import MongoUser, MongoTradingPair, MongoOrder  # MongoDB models
+from app.database import close_mongo, connect_mongo, engine, init_sql_models, mongo_pool_stats
+from app.models import MongoUser, MongoTradingPair, MongoOrder, MongoUserStats, MongoPriceTick  # MongoDB models
 from app.routes import trading, predictions, currencies
-from app.utils import fetch_real_time_prices  # Removed get_redis_connection import
+from app.services.active_user_index import active_user_index
+from app.services.admission import admission_control
+from app.services.arima_forecaster import arima_forecasters
+from app.services.exposure import exposure_book
+from app.services.inference_service import inference_service, training_service
+from app.services.leaderboard import refresh_leaderboard_periodically
+from app.services.loop_watchdog import loop_watchdog
+from app.services.metrics import metrics
+from app.services.prediction_service import prediction_cache, retrain_lstm_models_periodically
+from app.services.price_snapshot import price_snapshot
+from app.services.request_profiler import ProfilerMiddleware
+from app.services.tick_archive import tick_archive
+from app.services.tick_store import tick_writer
+from app.services.trading_service import resume_pending_orders
+from app.utils import fetch_real_time_prices, restore_price_snapshot  # Removed get_redis_connection import
 import dotenv
 
-# FastAPI app initialization
-app = FastAPI()
-dotenv.load_dotenv(".env")
-BASE_URL = os.getenv("BASE_URL")
-
-# Rate limiting configuration
-limiter = Limiter(key_func=get_remote_address)
-app.state.limiter = limiter
-app.add_middleware(SlowAPIMiddleware)
-
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Load MongoDB URI and Database name from environment variables
-MONGO_URI = config("MONGO_URI", default="mongodb://localhost:27017")
-MONGO_DB_NAME = config("MONGO_DB_NAME", default="trading_db")
 
-# Initialize MongoDB client and Beanie ODM
-client = AsyncIOMotorClient(MONGO_URI)
-db = client[MONGO_DB_NAME]
+def register_metric_collectors():
+    """
+    Export the stats of the service singletons on /metrics.
+    """
+    metrics.register_collector("prediction_cache", prediction_cache.snapshot)
+    metrics.register_collector("inference", lambda: inference_service.stats, pool="inference")
+    metrics.register_collector("inference", lambda: training_service.stats, pool="training")
+    metrics.register_collector("tick_writer", lambda: {**tick_writer.stats, "pending": tick_writer.pending})
+    metrics.register_collector("mongo_pool", mongo_pool_stats)
+    metrics.register_collector("tick_archive", lambda: tick_archive.stats)
+    metrics.register_collector("price_snapshot", lambda: price_snapshot.stats)
+    metrics.register_collector("loop_watchdog", lambda: loop_watchdog.stats)
+    metrics.register_collector("admission", lambda: admission_control.users.stats, bucket="user")
+    metrics.register_collector("admission", lambda: admission_control.symbols.stats, bucket="symbol")
+    metrics.register_collector("orders", lambda: {"in_flight": admission_control.in_flight})
+    for source, forecaster in arima_forecasters.items():
+        metrics.register_collector("arima", lambda forecaster=forecaster: forecaster.stats, source=source)
 
 
-@app.on_event("startup")
 async def startup_event():
-    # Initialize MongoDB (NoSQL) with Beanie
-    await init_beanie(database=db, document_models=[MongoUser, MongoTradingPair, MongoOrder])
+    # Restore the latest prices and recent ticks journaled before the last shutdown
+    restored = restore_price_snapshot()
+    logger.info(f"Restored prices for {restored} symbols from the price snapshot.")
+    asyncio.create_task(price_snapshot.sync_periodically())
+
+    # Measure event loop lag and capture the stacks that block the loop
+    register_metric_collectors()
+    loop_watchdog.start()
+
+    # Initialize MongoDB (NoSQL) with Beanie on the process-wide client
+    await init_beanie(database=connect_mongo(), document_models=[MongoUser, MongoTradingPair, MongoOrder, MongoUserStats, MongoPriceTick])
+
+    # Create missing relational (SQLAlchemy) tables
+    await init_sql_models()
+
+    # Seed the in-memory index of users with pending or recent orders
+    await active_user_index.load()
+
+    # Seed the per-symbol house exposure from pending orders, and settle those orders on time
+    await exposure_book.load()
+    await resume_pending_orders()
+
+    # Keep the in-memory leaderboard in sync with the materialized user stats
+    asyncio.create_task(refresh_leaderboard_periodically())
+
+    # Start the worker processes that run model fitting and inference
+    inference_service.start()
+    training_service.start()
+
+    # Retrain stale or drifted LSTM models in the background
+    asyncio.create_task(retrain_lstm_models_periodically())
+
+    # Write live ticks to the tick history in batches
+    asyncio.create_task(tick_writer.flush_periodically())
+
+    # Compact completed days of ticks into the Parquet archive
+    asyncio.create_task(tick_archive.compact_periodically())
 
     # Start the background task for fetching real-time prices
     asyncio.create_task(start_price_fetching_task())
 
 
-@app.on_event("shutdown")
 async def shutdown_event():
     print("Shutting down: canceling outstanding tasks")
+    loop_watchdog.stop()
     tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
     [task.cancel() for task in tasks]
     await asyncio.gather(*tasks, return_exceptions=True)
+    await inference_service.shutdown()
+    await training_service.shutdown()
+    await engine.dispose()
+    close_mongo()
+    price_snapshot.close()
     print("Shutdown complete.")
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await startup_event()
+    try:
+        yield
+    finally:
+        await shutdown_event()
+
+
+# FastAPI app initialization
+app = FastAPI(lifespan=lifespan)
+dotenv.load_dotenv(".env")
+BASE_URL = os.getenv("BASE_URL")
+
+# Rate limiting configuration
+limiter = Limiter(key_func=get_remote_address)
+app.state.limiter = limiter
+app.add_middleware(SlowAPIMiddleware)
+
+# Opt-in request profiling (X-Profile header or PROFILE_SAMPLE_RATE)
+app.add_middleware(ProfilerMiddleware)
+
+
+@app.get("/api/db/pool", response_model=dict)
+async def get_mongo_pool_stats():
+    """
+    Mongo connection pool usage: open and in-use connections, checkouts, checkout waits and failures.
+    """
+    return mongo_pool_stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Hot-path metrics in the Prometheus text format.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/api/debug/stalls", response_model=list)
+async def get_event_loop_stalls():
+    """
+    Recent event loop stalls, newest last, with the stack that was blocking the loop.
+    """
+    return list(loop_watchdog.recent_stalls)
+
+
+@app.get("/api/prices/staleness", response_model=dict)
+async def get_price_staleness():
+    """
+    Prices restored from the snapshot at startup that have not had a live tick yet, with their age
+    and whether they are too old to trade on.
+    """
+    return price_snapshot.staleness()
+
+
 # Function to handle continuous price fetching and reconnections
 async def start_price_fetching_task():
     while True:
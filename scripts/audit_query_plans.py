@@ -0,0 +1,97 @@
+# Script to audit MongoDB query plans for the query shapes used by the API
+
+# trading_platform_backend/scripts/audit_query_plans.py
+
+# Runs `explain` for every query shape issued from app/routes (directly or through the
+# services they call) and flags the ones whose winning plan is a collection scan.
+# Indexes are created by init_beanie from each model's Settings before auditing. Building the
+# unique username index fails while duplicate usernames exist: run
+# `python -m scripts.dedupe_usernames --apply` first (it only reports without --apply).
+
+import asyncio
+import sys
+from datetime import datetime, timedelta
+
+from beanie import PydanticObjectId, init_beanie
+from decouple import config
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.models import MongoUser, MongoTradingPair, MongoOrder, MongoUserStats, MongoPriceTick
+
+SAMPLE_ID = PydanticObjectId("6706b0b9571ca603c9868674")
+NOW = datetime.utcnow()
+
+# (description, model, filter, sort, collection scan expected)
+QUERY_SHAPES = [
+    ("get_dummy_user: user by username", MongoUser, {"username": "dummy_user"}, None, False),
+    ("get_user_balance / MongoRepository.get_user: user by id", MongoUser, {"_id": SAMPLE_ID}, None, False),
+    ("active_user_index.load: users by id list", MongoUser, {"_id": {"$in": [SAMPLE_ID]}}, None, False),
+    ("get_users_with_orders: unfiltered user page", MongoUser, {}, None, True),
+    ("get_users_with_orders: balance range", MongoUser, {"balance": {"$gte": 0, "$lte": 1000}}, None, True),
+    ("get_order: order by id", MongoOrder, {"_id": SAMPLE_ID}, None, False),
+    ("get_order_by_user: orders by user", MongoOrder, {"user_id": SAMPLE_ID}, None, False),
+    ("get_users_with_orders: user orders by date and status", MongoOrder,
+     {"user_id": SAMPLE_ID, "start_time": {"$gte": NOW - timedelta(days=1), "$lte": NOW}, "status": "win"},
+     [("start_time", -1), ("_id", -1)], False),
+    ("MongoRepository.count_pending_orders: pending orders", MongoOrder,
+     {"user_id": SAMPLE_ID, "status": "pending"}, None, False),
+    ("active_user_index.load: pending or recent orders", MongoOrder,
+     {"$or": [{"status": "pending"}, {"start_time": {"$gte": NOW - timedelta(hours=1)}}]}, None, False),
+    ("MongoRepository.upsert_price: pair by symbol", MongoTradingPair, {"symbol": "BTC"}, None, False),
+    ("get_mongo_trading_pairs: all pairs", MongoTradingPair, {}, None, True),
+    ("get_users_with_orders_stats: stats by wins/losses", MongoUserStats,
+     {"wins": {"$gte": 1}, "losses": {"$lte": 10}}, [("user_id", 1)], False),
+    ("MongoRepository.load_ticks: symbol ticks in a time range", MongoPriceTick,
+     {"symbol": "BTC", "timestamp": {"$gte": NOW - timedelta(days=30), "$lt": NOW}}, [("timestamp", 1), ("_id", 1)], False),
+    ("MongoRepository.recent_prices: latest symbol ticks", MongoPriceTick, {"symbol": "BTC"}, [("timestamp", -1), ("_id", -1)], False),
+]
+
+
+def find_stages(plan, stages=None):
+    """
+    Collect every `stage` name in an explain plan tree.
+    """
+    if stages is None:
+        stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            find_stages(value, stages)
+    elif isinstance(plan, list):
+        for item in plan:
+            find_stages(item, stages)
+    return stages
+
+
+async def audit():
+    # Database setup
+    MONGO_URI = config("MONGO_URI", default="mongodb://localhost:27017")
+    MONGO_DB_NAME = config("MONGO_DB_NAME", default="trading_db")
+
+    client = AsyncIOMotorClient(MONGO_URI)
+    db = client[MONGO_DB_NAME]
+    await init_beanie(database=db, document_models=[MongoUser, MongoTradingPair, MongoOrder, MongoUserStats, MongoPriceTick])
+
+    unexpected_scans = 0
+    for description, model, query_filter, sort, scan_expected in QUERY_SHAPES:
+        cursor = model.get_motor_collection().find(query_filter)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        stages = find_stages(explain.get("queryPlanner", {}).get("winningPlan", {}))
+
+        if "COLLSCAN" in stages:
+            flag = "COLLSCAN (expected)" if scan_expected else "COLLSCAN"
+            if not scan_expected:
+                unexpected_scans += 1
+        else:
+            flag = "ok"
+        print(f"[{flag}] {description}: {' <- '.join(stages)}")
+
+    print(f"{unexpected_scans} unexpected collection scan(s) across {len(QUERY_SHAPES)} query shapes")
+    return unexpected_scans
+
+
+if __name__ == "__main__":
+    sys.exit(1 if asyncio.run(audit()) else 0)
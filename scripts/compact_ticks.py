@@ -0,0 +1,35 @@
+# Script to compact recorded ticks into the Parquet tick archive
+
+# trading_platform_backend/scripts/compact_ticks.py
+
+# Usage: python -m scripts.compact_ticks --days 90
+# Backfills every completed day in the last --days that is not archived yet; the API's
+# background job only looks back COMPACTION_LOOKBACK_DAYS days.
+
+import argparse
+import asyncio
+import time
+
+from beanie import init_beanie
+
+from app.database import close_mongo, connect_mongo
+from app.models import MongoPriceTick
+from app.services.repository import STORAGE_BACKEND, get_repository
+from app.services.tick_archive import COMPACTION_LOOKBACK_DAYS, tick_archive
+
+
+async def main(days: int):
+    if STORAGE_BACKEND == "mongo":
+        await init_beanie(database=connect_mongo(), document_models=[MongoPriceTick])
+
+    started = time.perf_counter()
+    written = await tick_archive.compact(get_repository(), lookback_days=days)
+    print(f"Wrote {written} files ({tick_archive.stats['ticks_archived']} ticks) to {tick_archive.root} "
+          f"in {time.perf_counter() - started:.1f}s")
+    close_mongo()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compact recorded ticks into the Parquet tick archive")
+    parser.add_argument("--days", type=int, default=COMPACTION_LOOKBACK_DAYS, help="Completed days to check")
+    asyncio.run(main(parser.parse_args().days))
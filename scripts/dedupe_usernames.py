@@ -0,0 +1,56 @@
+# Script to rename duplicate usernames before the unique username index is built
+
+# trading_platform_backend/scripts/dedupe_usernames.py
+
+# MongoUser declares a unique index on `username`, which init_beanie builds at startup (and in
+# scripts/audit_query_plans.py); it fails on a database that already holds duplicate usernames.
+# For each duplicated username this keeps the oldest user (lowest _id) as is and renames the
+# others to `<username>_<their id>`, so no user, balance or order is lost.
+# Runs on the raw collection, without init_beanie, and only reports unless --apply is given.
+#
+# Usage: python -m scripts.dedupe_usernames [--apply]
+
+import argparse
+import asyncio
+
+from decouple import config
+from motor.motor_asyncio import AsyncIOMotorClient
+
+
+async def dedupe_usernames(apply: bool) -> int:
+    """
+    :return: Number of users renamed (or to rename, without `apply`)
+    """
+    # Database setup
+    MONGO_URI = config("MONGO_URI", default="mongodb://localhost:27017")
+    MONGO_DB_NAME = config("MONGO_DB_NAME", default="trading_db")
+
+    client = AsyncIOMotorClient(MONGO_URI)
+    users = client[MONGO_DB_NAME]["users"]
+
+    duplicates = users.aggregate([
+        {"$sort": {"_id": 1}},
+        {"$group": {"_id": "$username", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ], allowDiskUse=True)
+
+    renamed = 0
+    async for group in duplicates:
+        username, (kept, *others) = group["_id"], group["ids"]
+        print(f"{username!r}: keeping {kept}, renaming {len(others)} duplicate(s)")
+        for user_id in others:
+            new_username = f"{username}_{user_id}"
+            print(f"  {user_id} -> {new_username!r}")
+            if apply:
+                await users.update_one({"_id": user_id}, {"$set": {"username": new_username}})
+            renamed += 1
+
+    print(f"{'Renamed' if apply else 'Would rename'} {renamed} user(s).")
+    client.close()
+    return renamed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rename duplicate usernames before the unique index is built")
+    parser.add_argument("--apply", action="store_true", help="Rename the duplicates (default: only report them)")
+    asyncio.run(dedupe_usernames(parser.parse_args().apply))
@@ -0,0 +1,52 @@
+# Script to export registered LSTM models for NumPy inference
+
+# trading_platform_backend/scripts/export_lstm_weights.py
+
+# Writes weights.npz next to every registered model version that lacks one (or all of them
+# with --force) and checks that the NumPy engine reproduces the Keras model's predictions.
+# Models trained since the NumPy engine was introduced are exported when they are registered.
+
+import argparse
+import sys
+
+import numpy as np
+
+from app.services.lstm_engine import LstmEngine
+from app.services.model_registry import MODEL_DIR, WEIGHTS_FILE, ModelRegistry
+from app.services.lstm_model import make_predictions
+
+TOLERANCE = 1e-4  # Largest accepted difference between engines, in prices
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export registered LSTM models for NumPy inference")
+    parser.add_argument("--model-dir", default=str(MODEL_DIR))
+    parser.add_argument("--force", action="store_true", help="Re-export versions that already have weights")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.model_dir)
+    failures = 0
+    for symbol_dir in sorted(path for path in registry.root.glob("*") if path.is_dir()):
+        symbol = symbol_dir.name
+        for version in registry.versions(symbol):
+            weights = symbol_dir / f"v{version}" / WEIGHTS_FILE
+            if weights.exists() and not args.force:
+                continue
+            registry.export(symbol, version)
+
+            # Compare both engines on random windows inside the training range
+            keras_entry = registry.load_keras(symbol, version)
+            meta = keras_entry["meta"]
+            X = np.random.uniform(0, 1, (64, meta["time_steps"])).astype(np.float32)
+            expected = make_predictions(keras_entry["model"], X, keras_entry["scaler"])
+            scaled = LstmEngine.load(weights).predict(X)
+            actual = keras_entry["scaler"].inverse_transform(scaled)
+            error = float(np.max(np.abs(expected - actual)))
+            status = "ok" if error <= TOLERANCE * max(1.0, abs(meta["data_max"])) else "MISMATCH"
+            failures += status != "ok"
+            print(f"{symbol} v{version}: exported, max difference {error:.2e} ({status})")
+
+    sys.exit(1 if failures else 0)
+
+
+main()
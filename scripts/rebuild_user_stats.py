@@ -0,0 +1,27 @@
+# Script to rebuild the materialized per-user order stats
+
+# trading_platform_backend/scripts/rebuild_user_stats.py
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.models import MongoUser, MongoOrder, MongoUserStats
+from app.services.stats_service import rebuild_user_stats
+from decouple import config
+# Run the function using asyncio
+import asyncio
+
+
+async def main():
+    # Database setup
+    MONGO_URI = config("MONGO_URI", default="mongodb://localhost:27017")
+    MONGO_DB_NAME = config("MONGO_DB_NAME", default="trading_db")
+
+    client = AsyncIOMotorClient(MONGO_URI)
+    db = client[MONGO_DB_NAME]
+    await init_beanie(database=db, document_models=[MongoUser, MongoOrder, MongoUserStats])
+
+    await rebuild_user_stats()
+    print(f"Rebuilt stats for {await MongoUserStats.count()} users")
+
+
+asyncio.run(main())
@@ -0,0 +1,27 @@
+# Script to record the raw Binance and Kraken websocket frames to a capture file
+
+# trading_platform_backend/scripts/record_feeds.py
+
+# Usage: python -m scripts.record_feeds --minutes 60 --out captures
+# Writes captures/<sources>_<UTC start>.jsonl.gz (see app/services/feed_capture.py); replay it
+# with scripts/replay_feeds.py.
+
+import argparse
+import asyncio
+import logging
+
+from app.services.feed_capture import FEED_SOURCES, record_feeds
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record raw price feed frames to a compressed capture file")
+    parser.add_argument("--minutes", type=float, help="Recording length (default: until interrupted)")
+    parser.add_argument("--out", default="captures", help="Directory for the capture file")
+    parser.add_argument("--source", action="append", choices=FEED_SOURCES, help="Feed to record (repeatable; default: all)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    duration = args.minutes * 60 if args.minutes else None
+    try:
+        asyncio.run(record_feeds(args.out, duration, args.source or FEED_SOURCES))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,52 @@
+# Script to replay captured price feeds on a local websocket server
+
+# trading_platform_backend/scripts/replay_feeds.py
+
+# Usage: python -m scripts.replay_feeds captures/binance+kraken_20241019T110000.jsonl.gz --speed 20 \
+#            --disconnect 500:5 --disconnect 2000:30:abort --loop
+# then start the API against the replay:
+#   BINANCE_WS_URL=ws://127.0.0.1:8765/binance KRAKEN_WS_URL=ws://127.0.0.1:8765/kraken uvicorn main:app
+# --rate sends frames at a fixed rate per second instead of their recorded spacing.
+# --disconnect FRAMES[:DOWNTIME][:abort] drops the next connection after FRAMES frames and refuses
+# connections for DOWNTIME seconds (repeatable; one per connection, in order).
+
+import argparse
+import asyncio
+import logging
+
+from app.services.feed_replay import REPLAY_HOST, REPLAY_PORT, FeedReplayServer, ScriptedDisconnect
+
+
+async def main(args):
+    server = FeedReplayServer.from_captures(
+        args.capture,
+        speed=args.speed,
+        rate=args.rate,
+        disconnects=[ScriptedDisconnect.parse(spec) for spec in args.disconnect or []],
+        loop=args.loop,
+    )
+    await server.start(args.host, args.port)
+    try:
+        while True:
+            await asyncio.sleep(10)
+            print(server.stats)
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay captured price feeds over websockets")
+    parser.add_argument("capture", nargs="+", help="Capture files, played back to back")
+    parser.add_argument("--speed", type=float, default=1.0, help="Playback speed (e.g. 1 to 100)")
+    parser.add_argument("--rate", type=float, help="Send frames at this rate per second instead")
+    parser.add_argument("--disconnect", action="append", help="Scripted disconnect FRAMES[:DOWNTIME][:abort]")
+    parser.add_argument("--loop", action="store_true", help="Start over at the end of the capture")
+    parser.add_argument("--host", default=REPLAY_HOST)
+    parser.add_argument("--port", type=int, default=REPLAY_PORT)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(main(args))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,99 @@
+# Script to backtest the forecasters against the payout rules over recorded ticks
+
+# trading_platform_backend/scripts/run_backtest.py
+
+# Usage: python -m scripts.run_backtest --symbol BTC --start 2024-01-01 --end 2024-04-01 --json report.json
+# With --archive, ticks are read from the Parquet tick archive (see scripts/compact_ticks.py) instead of MongoDB.
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+
+from beanie import init_beanie
+from decouple import config
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.models import MongoPriceTick
+from app.services.backtest import BACKTEST_MODELS, DECISION_STRIDE, DECISION_WINDOW, run_backtest
+from app.services.repository import get_repository
+from app.services.tick_archive import tick_archive
+from app.services.trading_service import VALID_TRADE_TIMES
+
+
+async def load_history(symbols, start, end):
+    # Database setup
+    MONGO_URI = config("MONGO_URI", default="mongodb://localhost:27017")
+    MONGO_DB_NAME = config("MONGO_DB_NAME", default="trading_db")
+
+    client = AsyncIOMotorClient(MONGO_URI)
+    await init_beanie(database=client[MONGO_DB_NAME], document_models=[MongoPriceTick])
+
+    repository = get_repository("mongo")
+    ticks = {}
+    for symbol in symbols or await repository.tick_symbols():
+        timestamps, prices = await repository.load_ticks(symbol, start, end)
+        if len(prices):
+            ticks[symbol] = (timestamps, prices)
+    return ticks
+
+
+def load_archived_history(symbols, start, end):
+    ticks = {}
+    for symbol in symbols or tick_archive.symbols():
+        timestamps, prices = tick_archive.load(symbol, start, end)
+        if len(prices):
+            ticks[symbol] = (timestamps, prices)
+    return ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the forecasters over recorded ticks")
+    parser.add_argument("--symbol", action="append", help="Symbol to backtest (repeatable; default: all recorded)")
+    parser.add_argument("--start", type=datetime.fromisoformat, help="UTC start of the range (inclusive)")
+    parser.add_argument("--end", type=datetime.fromisoformat, help="UTC end of the range (exclusive)")
+    parser.add_argument("--model", action="append", choices=BACKTEST_MODELS, help="Model (repeatable; default: all)")
+    parser.add_argument("--trade-time", type=int, action="append", choices=VALID_TRADE_TIMES)
+    parser.add_argument("--stride", type=int, default=DECISION_STRIDE, help="Ticks between simulated orders")
+    parser.add_argument("--window", type=int, default=DECISION_WINDOW, help="Decision points per worker job")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per core)")
+    parser.add_argument("--json", help="Also write the full report, with calibration, to this file")
+    parser.add_argument("--archive", action="store_true", help="Read ticks from the Parquet tick archive")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.archive:
+        ticks = load_archived_history(args.symbol, args.start, args.end)
+    else:
+        ticks = asyncio.run(load_history(args.symbol, args.start, args.end))
+    print(f"Loaded {sum(len(prices) for _, prices in ticks.values())} ticks for {len(ticks)} symbols "
+          f"in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    reports = run_backtest(
+        ticks,
+        models=args.model or BACKTEST_MODELS,
+        trade_times=args.trade_time or VALID_TRADE_TIMES,
+        stride=args.stride,
+        window=args.window,
+        max_workers=args.workers,
+    )
+    print(f"Backtested in {time.perf_counter() - started:.1f}s")
+
+    print(f"{'symbol':<10}{'model':<7}{'time':>6}{'trades':>9}{'hit rate':>10}{'pnl':>12}{'pnl/trade':>11}")
+    for report in reports:
+        hit_rate = f"{report['hit_rate']:.3f}" if report["trades"] else "-"
+        per_trade = f"{report['pnl_per_trade']:.4f}" if report["trades"] else "-"
+        print(f"{report['symbol']:<10}{report['model']:<7}{report['trade_time']:>6}{report['trades']:>9}"
+              f"{hit_rate:>10}{report['pnl']:>12.2f}{per_trade:>11}")
+    if reports:
+        print(f"Break-even hit rate: {reports[0]['breakeven_hit_rate']:.4f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
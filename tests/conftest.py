@@ -0,0 +1,104 @@
+# trading_platform_backend/tests/conftest.py
+
+# Shared fixtures: an in-memory repository and process singletons pointed at scratch files
+
+import pytest
+
+from app.services import repository as repository_module
+from app.services.price_snapshot import price_snapshot
+from app.services.repository import InMemoryRepository, use_repository
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def repository(monkeypatch):
+    """
+    A fresh `InMemoryRepository` installed as the default backend for the test.
+    """
+    monkeypatch.setattr(repository_module, "_repositories", {})
+    repo = InMemoryRepository()
+    use_repository(repo)
+    return repo
+
+
+@pytest.fixture(autouse=True)
+def scratch_price_snapshot(tmp_path):
+    """
+    Journal live ticks into the test's directory rather than the working directory.
+    """
+    price_snapshot.close()
+    price_snapshot.path = tmp_path / "price_snapshot.bin"
+    price_snapshot.restored.clear()
+    yield price_snapshot
+    price_snapshot.close()
+
+
+@pytest.fixture
+async def sql_repository(tmp_path):
+    """
+    A `SqlRepository` on a scratch SQLite database.
+    """
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    import app.models  # noqa: F401 (registers the tables)
+    from app.database import Base
+    from app.services.sql_repository import SqlRepository
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    yield SqlRepository(async_sessionmaker(engine, expire_on_commit=False, autoflush=False))
+    await engine.dispose()
+
+
+@pytest.fixture
+async def mongo_repository(monkeypatch):
+    """
+    A `MongoRepository` on an in-process mock of MongoDB (mongomock-motor).
+    """
+    from beanie import init_beanie
+    from mongomock_motor import AsyncMongoMockClient
+
+    from app.models import MongoOrder, MongoPriceTick, MongoTradingPair, MongoUser, MongoUserStats
+    from app.services import mongo_repository as mongo_module
+
+    # The mock's collections have no async `with_options`
+    monkeypatch.setattr(mongo_module, "with_write_concern", lambda collection, workload: collection)
+    await init_beanie(database=AsyncMongoMockClient()["trading_test"],
+                      document_models=[MongoUser, MongoTradingPair, MongoOrder, MongoUserStats, MongoPriceTick])
+    return mongo_module.MongoRepository()
+
+
+@pytest.fixture(params=["memory", "sqlalchemy", "mongo"])
+def any_repository(request):
+    """
+    Each repository implementation in turn.
+    """
+    return request.getfixturevalue({
+        "memory": "repository", "sqlalchemy": "sql_repository", "mongo": "mongo_repository"
+    }[request.param])
+
+
+@pytest.fixture
+def in_process_models(monkeypatch, tmp_path):
+    """
+    Predictions without worker pools: ARIMA parameters are estimated in-process, LSTM models come
+    from an empty scratch registry, and training is recorded instead of scheduled.
+    :return: Symbols whose LSTM training was requested
+    """
+    from app.services import arima_forecaster, prediction_service
+    from app.services.model_registry import ModelRegistry
+
+    async def run(fn, *args, timeout=None):
+        return fn(*args)
+
+    trainings = []
+    monkeypatch.setattr(arima_forecaster.inference_service, "run", run)
+    monkeypatch.setattr(prediction_service, "lstm_registry", ModelRegistry(tmp_path / "models"))
+    monkeypatch.setattr(prediction_service, "schedule_lstm_training", lambda symbol, prices: trainings.append(symbol))
+    monkeypatch.setattr(prediction_service, "prediction_cache", prediction_service.PredictionCache())
+    return trainings
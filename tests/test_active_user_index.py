@@ -0,0 +1,67 @@
+# trading_platform_backend/tests/test_active_user_index.py
+
+# Active-user index: pending orders, the recency window and seeding from storage
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.active_user_index import ActiveUserIndex
+from app.services.repository import OrderRecord, UserRecord
+
+pytestmark = pytest.mark.anyio
+
+NOW = datetime(2024, 1, 1, 12, 0)
+
+
+def order(order_id: str, user: UserRecord, start_time: datetime, status: str = "pending") -> OrderRecord:
+    return OrderRecord(user.id, "BTC", 10.0, "rise", 30, 1.0, start_time=start_time, status=status, id=order_id)
+
+
+def counts(index: ActiveUserIndex, now: datetime) -> dict:
+    return {row["username"]: row["active_orders_count"] for row in index.active_users(now)}
+
+
+def test_orders_stay_listed_for_the_window_once_settled():
+    index = ActiveUserIndex(window=timedelta(hours=1))
+    alice = UserRecord("a", "alice", "alice@example.com")
+    index.order_placed(order("o1", alice, NOW), alice)
+    index.order_placed(order("o2", alice, NOW + timedelta(minutes=30)), alice)
+    assert counts(index, NOW) == {"alice": 2}
+
+    index.order_settled(order("o1", alice, NOW, "win"), alice, now=NOW + timedelta(minutes=1))
+    assert counts(index, NOW + timedelta(minutes=59)) == {"alice": 2}
+    assert counts(index, NOW + timedelta(hours=1)) == {"alice": 1}
+    assert counts(index, NOW + timedelta(hours=2)) == {"alice": 1}  # o2 is still pending
+
+    index.order_settled(order("o2", alice, NOW, "lose"), alice, now=NOW + timedelta(hours=2))
+    assert counts(index, NOW + timedelta(hours=2)) == {}
+
+
+def test_inactive_users_are_not_listed():
+    index = ActiveUserIndex()
+    bob = UserRecord("b", "bob", "bob@example.com", is_active=False)
+    index.order_placed(order("o1", bob, NOW), bob)
+    assert counts(index, NOW) == {}
+
+
+def test_settling_an_unknown_order_is_ignored():
+    index = ActiveUserIndex()
+    alice = UserRecord("a", "alice", "alice@example.com")
+    index.order_settled(order("o1", alice, NOW, "win"), alice, now=NOW)
+    assert counts(index, NOW) == {}
+
+
+async def test_load_seeds_pending_and_recent_orders(repository):
+    alice = await repository.create_user("alice", "alice@example.com", "x", balance=100.0)
+    bob = await repository.create_user("bob", "bob@example.com", "x", balance=100.0)
+    now = datetime.utcnow()
+    await repository.insert_order(order(None, alice, now - timedelta(hours=3)))  # Overdue but pending
+    recent = await repository.insert_order(order(None, alice, now - timedelta(minutes=5)))
+    await repository.settle_order(recent.id, "win", 10.2)
+    old = await repository.insert_order(order(None, bob, now - timedelta(hours=3)))
+    await repository.settle_order(old.id, "lose", 0)
+
+    index = ActiveUserIndex(window=timedelta(hours=1))
+    await index.load()
+    assert counts(index, now) == {"alice": 2}
@@ -0,0 +1,93 @@
+# trading_platform_backend/tests/test_admission.py
+
+# Shared token buckets: refill, refund, slot reuse and clock resets
+
+import pytest
+
+from app.services import admission
+from app.services.admission import SharedTokenBuckets
+
+
+class FakeClock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock(1_000_000.0)
+    monkeypatch.setattr(admission.time, "time", fake)
+    return fake
+
+
+def drain(buckets: SharedTokenBuckets, key: str):
+    while buckets.acquire(key) == 0.0:
+        pass
+
+
+def test_refill(tmp_path, clock):
+    buckets = SharedTokenBuckets(tmp_path / "b.bin", rate=2.0, capacity=4.0)
+    for _ in range(4):
+        assert buckets.acquire("user:a") == 0.0
+    assert buckets.acquire("user:a") == pytest.approx(0.5)
+    clock.now += 0.5
+    assert buckets.acquire("user:a") == 0.0
+    assert buckets.acquire("user:a") > 0.0
+    assert buckets.acquire("user:b") == 0.0  # Other keys have their own bucket
+
+
+def test_refund(tmp_path, clock):
+    buckets = SharedTokenBuckets(tmp_path / "b.bin", rate=1.0, capacity=2.0)
+    drain(buckets, "user:a")
+    buckets.refund("user:a")
+    assert buckets.acquire("user:a") == 0.0
+    buckets.refund("user:a")
+    buckets.refund("user:a")
+    buckets.refund("user:a")
+    assert buckets.acquire("user:a") == 0.0
+    assert buckets.acquire("user:a") == 0.0
+    assert buckets.acquire("user:a") > 0.0  # Refunds never exceed the capacity
+
+
+def test_full_slots_are_reused(tmp_path, clock):
+    buckets = SharedTokenBuckets(tmp_path / "b.bin", rate=1.0, capacity=1.0, slots=4)
+    for key in ("a", "b", "c", "d"):
+        assert buckets.acquire(key) == 0.0
+    assert buckets.acquire("e") == 0.0  # Table full of empty buckets: fails open
+    assert buckets.stats["table_full"] == 1
+    clock.now += 1.0  # Every bucket has refilled: any slot can be claimed
+    assert buckets.acquire("e") == 0.0
+    assert buckets.acquire("e") > 0.0
+    assert buckets.stats["table_full"] == 1
+
+
+def test_shared_between_instances(tmp_path, clock):
+    first = SharedTokenBuckets(tmp_path / "b.bin", rate=1.0, capacity=3.0)
+    second = SharedTokenBuckets(tmp_path / "b.bin", rate=1.0, capacity=3.0)
+    assert first.acquire("user:a") == 0.0
+    assert second.acquire("user:a") == 0.0
+    assert first.acquire("user:a") == 0.0
+    assert second.acquire("user:a") > 0.0
+
+
+def test_clock_reset_does_not_lock_out(tmp_path, clock):
+    buckets = SharedTokenBuckets(tmp_path / "b.bin", rate=1.0, capacity=10.0)
+    drain(buckets, "user:a")
+    clock.now = 120.0  # Refill stamps far in the future, e.g. a clock stepped back
+    assert buckets.acquire("user:a") == pytest.approx(1.0)
+    clock.now += 1.0
+    assert buckets.acquire("user:a") == 0.0
+    assert buckets.acquire("symbol:BTC") == 0.0
+
+
+def test_negative_tokens_are_not_persisted(tmp_path, clock):
+    buckets = SharedTokenBuckets(tmp_path / "b.bin", rate=1.0, capacity=10.0)
+    assert buckets.acquire("user:a") == 0.0
+    offset, _ = buckets._find(buckets._hash("user:a"), clock.now)
+    admission.SLOT.pack_into(buckets._map, offset, buckets._hash("user:a"), -1e6, clock.now)  # Corrupt slot
+    assert buckets.acquire("user:a") == pytest.approx(1.0)
+    clock.now += 1.0
+    assert buckets.acquire("user:a") == 0.0
@@ -0,0 +1,99 @@
+# trading_platform_backend/tests/test_arima_forecaster.py
+
+# Incremental ARIMA updates from live ticks and forecast caching
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app import utils
+from app.services import arima_forecaster as arima_module
+from app.services.arima_forecaster import ArimaForecaster, _filter
+
+pytestmark = pytest.mark.anyio
+
+ORDER = (1, 1, 0)
+
+
+@pytest.fixture(autouse=True)
+def in_process_fits(monkeypatch):
+    """
+    Run parameter estimation in-process instead of the inference worker pool, counting the calls.
+    """
+    calls = []
+
+    async def run(fn, *args, timeout=None):
+        calls.append(fn.__name__)
+        return fn(*args)
+
+    monkeypatch.setattr(arima_module.inference_service, "run", run)
+    return calls
+
+
+def history(n: int = 60, seed: int = 1) -> list:
+    return list(100.0 + np.cumsum(np.random.default_rng(seed).normal(0, 0.5, n)))
+
+
+def tick(symbol: str, *prices: float):
+    for price in prices:
+        utils.record_tick(symbol, price, "test")
+
+
+async def test_needs_history_until_the_first_fit():
+    forecaster = ArimaForecaster(order=ORDER)
+    assert forecaster.needs_history("ARIMA1")
+    with pytest.raises(ValueError):
+        await forecaster.forecast("ARIMA1", history(5))
+    await forecaster.forecast("ARIMA1", history())
+    assert not forecaster.needs_history("ARIMA1")
+    assert forecaster.stats["refits"] == 1
+
+
+async def test_forecast_is_cached_until_the_next_tick():
+    forecaster = ArimaForecaster(order=ORDER)
+    first = await forecaster.forecast("ARIMA2", history())
+    assert await forecaster.forecast("ARIMA2") == first
+    assert forecaster.stats["hits"] == 1
+
+    tick("ARIMA2", 150.0)
+    assert forecaster.cached_forecast("ARIMA2") is None
+    assert await forecaster.forecast("ARIMA2") != first
+
+
+async def test_new_ticks_extend_the_fitted_model(in_process_fits):
+    forecaster = ArimaForecaster(order=ORDER)
+    prices = history()
+    await forecaster.forecast("ARIMA3", prices)
+    params = forecaster._entries["ARIMA3"]["results"].params
+
+    tick("ARIMA3", 101.0, 101.5, 100.5)
+    forecast = await forecaster.forecast("ARIMA3")
+    assert in_process_fits == ["fit_arima_params"]  # No re-estimation
+    assert forecaster.stats == {"hits": 0, "appends": 1, "refits": 1}
+
+    full = _filter(prices + [101.0, 101.5, 100.5], ORDER, params)
+    assert forecast == pytest.approx(float(full.forecast(steps=1)[0]))
+    assert forecaster._entries["ARIMA3"]["observations"][-3:] == [101.0, 101.5, 100.5]
+
+
+async def test_parameters_are_re_estimated_after_refit_every_ticks(in_process_fits):
+    forecaster = ArimaForecaster(order=ORDER, refit_every=4, max_observations=50)
+    await forecaster.forecast("ARIMA4", history())
+    tick("ARIMA4", 101.0, 101.5)
+    await forecaster.forecast("ARIMA4")
+    assert forecaster.stats["refits"] == 1
+    tick("ARIMA4", 100.5, 100.0)
+    await forecaster.forecast("ARIMA4")
+    assert forecaster.stats["refits"] == 2
+    assert len(in_process_fits) == 2
+    entry = forecaster._entries["ARIMA4"]
+    assert len(entry["observations"]) == 50 and entry["appended"] == 0
+
+
+async def test_concurrent_forecasts_fit_once(in_process_fits):
+    forecaster = ArimaForecaster(order=ORDER)
+    prices = history()
+    results = await asyncio.gather(*(forecaster.forecast("ARIMA5", prices) for _ in range(5)))
+    assert len(set(results)) == 1
+    assert in_process_fits == ["fit_arima_params"]
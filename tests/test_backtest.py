@@ -0,0 +1,86 @@
+# trading_platform_backend/tests/test_backtest.py
+
+# Backtesting engine: settlement rules, reports and the parallel forecast windows
+
+import numpy as np
+import pytest
+
+from app.services.backtest import (
+    decision_points, evaluate, forecast_lstm_window, run_backtest, settle, summarize,
+)
+from app.services.exposure import PAYOUT_MULTIPLIER
+from app.services.model_registry import ModelRegistry
+
+
+def test_orders_settle_on_the_last_price_before_expiry():
+    timestamps = np.array([0.0, 10.0, 25.0, 31.0, 60.0])
+    prices = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+    final, settled = settle(timestamps, prices, np.array([0, 1, 3]), trade_times=[30, 60])
+    assert final.tolist() == [[3.0, 5.0], [4.0, 5.0], [5.0, 5.0]]
+    assert settled.tolist() == [[True, True], [True, False], [False, False]]
+
+
+def test_payout_rules():
+    wins, pnl = evaluate(np.array([10.0, 10.0, 10.0]), np.array([[11.0], [9.0], [10.0]]),
+                         np.array([True, False, True]))
+    assert wins[:, 0].tolist() == [True, True, False]  # An unchanged price loses
+    assert pnl[:, 0] == pytest.approx([PAYOUT_MULTIPLIER - 1.0, PAYOUT_MULTIPLIER - 1.0, -1.0])
+
+
+def test_summary_of_a_perfect_forecaster():
+    timestamps = np.arange(400, dtype=float)
+    prices = 100.0 + timestamps  # Always rising
+    decisions = decision_points(len(prices), 10, stride=20)
+    forecasts = prices[decisions] + 1.0
+    forecasts[0] = prices[decisions[0]]  # No direction: no order
+
+    short, long = summarize("SYM", "test", timestamps, prices, decisions, forecasts, trade_times=[30, 300], bins=2)
+    assert short["trades"] == len(decisions[decisions + 30 <= 399]) - 1  # Later trades expire past the data
+    assert (short["hit_rate"], short["wins"]) == (1.0, short["trades"])
+    assert short["pnl"] == pytest.approx(short["trades"] * (PAYOUT_MULTIPLIER - 1.0))
+    assert long["trades"] == len(decisions[decisions + 300 <= 399]) - 1
+    assert sum(row["trades"] for row in short["calibration"]) == short["trades"]
+    assert short["breakeven_hit_rate"] == pytest.approx(1.0 / PAYOUT_MULTIPLIER)
+
+
+def test_no_trades_report_no_rates():
+    timestamps = np.arange(100, dtype=float)
+    prices = np.full(100, 50.0)
+    decisions = decision_points(100, 10, stride=10)
+    [report] = summarize("SYM", "test", timestamps, prices, decisions, prices[decisions], trade_times=[30])
+    assert (report["trades"], report["hit_rate"], report["pnl_per_trade"], report["calibration"]) == (0, None, None, [])
+
+
+def test_arima_windows_cover_every_decision():
+    rng = np.random.default_rng(5)
+    timestamps = np.arange(700, dtype=float)
+    prices = 100.0 + np.cumsum(rng.normal(0, 0.5, 700))
+    reports = run_backtest({"SYM": (timestamps, prices)}, models=["arima"], trade_times=[30, 60],
+                           stride=25, window=8, max_workers=2)
+    decisions = decision_points(700, 199, stride=25)
+    assert [(row["model"], row["trade_time"]) for row in reports] == [("arima", 30), ("arima", 60)]
+    assert reports[0]["trades"] == int(np.sum(decisions + 30 <= 699))
+    assert 0.0 <= reports[0]["hit_rate"] <= 1.0
+
+
+def test_untrained_symbols_are_skipped_for_lstm(tmp_path):
+    timestamps = np.arange(50, dtype=float)
+    assert run_backtest({"SYM": (timestamps, timestamps + 1.0)}, models=["lstm"], model_dir=str(tmp_path)) == []
+
+
+def test_lstm_window_matches_single_predictions(tmp_path):
+    pytest.importorskip("tensorflow")
+    from sklearn.preprocessing import MinMaxScaler
+
+    from app.services.lstm_model import build_lstm_model
+
+    registry = ModelRegistry(tmp_path)
+    meta = {"trained_at": "2024-01-01T00:00:00", "time_steps": 5, "data_min": 90.0, "data_max": 110.0}
+    registry.save("SYM", build_lstm_model(5), MinMaxScaler().fit([[90.0], [110.0]]), meta)
+
+    prices = 100.0 + np.sin(np.arange(60) / 4.0) * 5.0
+    decisions = decision_points(60, 4, stride=7)
+    forecasts = forecast_lstm_window(str(tmp_path), "SYM", None, prices, decisions)
+    entry = registry.engine("SYM", 1)
+    expected = [registry.predict(entry, list(prices[:decision + 1])) for decision in decisions]
+    assert forecasts == pytest.approx(expected, rel=1e-5)
@@ -0,0 +1,72 @@
+# trading_platform_backend/tests/test_batch_predictions.py
+
+# Batched multi-symbol predictions: per-entry errors, shared history and the request schema
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from app.schemas import MAX_BATCH_SYMBOLS, BatchPredictionRequest
+from app.services import prediction_service
+from app.services.repository import STORAGE_BACKEND
+
+pytestmark = pytest.mark.anyio
+
+
+async def seed_ticks(repository, symbol: str, count: int):
+    prices = 100.0 + np.cumsum(np.random.default_rng(len(symbol)).normal(0, 0.5, count))
+    await repository.insert_ticks([(symbol, 1_700_000_000.0 + i, float(price)) for i, price in enumerate(prices)])
+
+
+async def test_each_symbol_and_model_gets_an_entry(repository, in_process_models):
+    await seed_ticks(repository, "BATCH1", 60)
+    await seed_ticks(repository, "BATCH2", 5)
+
+    results = await prediction_service.predict_batch(["BATCH1", "BATCH2", "BATCH1"], ["arima", "lstm"])
+    assert [(row["symbol"], row["model"]) for row in results] == [
+        ("BATCH1", "arima"), ("BATCH1", "lstm"), ("BATCH2", "arima"), ("BATCH2", "lstm")
+    ]
+    arima1, lstm1, arima2, lstm2 = results
+    assert arima1["error"] is None and np.isfinite(arima1["predicted_price"])
+    assert lstm1["predicted_price"] is None and "training has been scheduled" in lstm1["error"]
+    assert in_process_models == ["BATCH1"]
+    assert arima2["error"] == lstm2["error"] == "Not enough data to perform prediction"
+
+
+async def test_history_is_read_once_per_symbol(repository, in_process_models, monkeypatch):
+    await seed_ticks(repository, "BATCH3", 60)
+    reads = []
+    recent_prices = repository.recent_prices
+
+    async def counted(symbol, limit=100):
+        reads.append(symbol)
+        return await recent_prices(symbol, limit)
+
+    monkeypatch.setattr(repository, "recent_prices", counted)
+    await prediction_service.predict_batch(["BATCH3"], ["arima", "lstm"])
+    assert reads == ["BATCH3"]
+
+    reads.clear()
+    await prediction_service.predict_batch(["BATCH3"], ["arima"])
+    assert reads == []  # The ARIMA model is fitted; live ticks keep it current
+
+
+async def test_batch_results_are_shared_with_the_single_symbol_route(repository, in_process_models):
+    await seed_ticks(repository, "BATCH4", 60)
+    [batch] = await prediction_service.predict_batch(["BATCH4"], ["arima"])
+    assert await prediction_service.forecast_prices_arima("BATCH4") == batch["predicted_price"]
+    assert prediction_service.prediction_cache.stats["hits"] == 1
+
+
+def test_request_defaults_and_limits():
+    request = BatchPredictionRequest(symbols=["BTC/USD"])
+    assert request.models == ["arima", "lstm"]
+    assert request.source == STORAGE_BACKEND
+    for invalid in (
+        {"symbols": []},
+        {"symbols": ["BTC/USD"] * (MAX_BATCH_SYMBOLS + 1)},
+        {"symbols": ["BTC/USD"], "models": ["prophet"]},
+        {"symbols": ["BTC/USD"], "source": "memory"},
+    ):
+        with pytest.raises(ValidationError):
+            BatchPredictionRequest(**invalid)
@@ -0,0 +1,43 @@
+# trading_platform_backend/tests/test_benchmarks.py
+
+# Hot-path micro-benchmark suite: every case runs, and the regression check
+
+import json
+
+import pytest
+
+from app.services import trading_service
+from app.services.admission import admission_control
+from benchmarks.bench_hot_paths import THRESHOLDS_FILE, HotPathBench, check, load_frames, time_case
+
+pytestmark = pytest.mark.anyio
+
+
+def test_every_case_has_a_ceiling():
+    assert set(json.loads(THRESHOLDS_FILE.read_text())) == set(HotPathBench(1).cases())
+
+
+def test_fixture_frames_cover_both_feeds():
+    assert load_frames("binance") and load_frames("kraken")
+
+
+async def test_cases_run_against_the_in_memory_repository(repository, monkeypatch, tmp_path):
+    monkeypatch.setattr(admission_control, "users", admission_control.users)
+    monkeypatch.setattr(admission_control, "symbols", admission_control.symbols)
+    monkeypatch.setattr(trading_service, "schedule_evaluation", lambda delay, order_id: None)
+    bench = HotPathBench(20)
+    await bench.setup(tmp_path)
+    for name, case in bench.cases().items():
+        if name == "prepare_data":
+            continue  # Imports TensorFlow
+        result = await time_case(case, repeat=2)
+        assert result["ops"] == 20 and 0.0 < result["us_per_op"] <= result["median_us_per_op"], name
+    bench.devnull.close()
+
+
+def test_regressions_are_reported():
+    results = {"fast": {"us_per_op": 1.0}, "over_ceiling": {"us_per_op": 30.0}, "slower": {"us_per_op": 13.0}}
+    baseline = {"fast": {"us_per_op": 0.9}, "slower": {"us_per_op": 10.0}}
+    failures = check(results, {"fast": 5.0, "over_ceiling": 20.0}, baseline, tolerance=0.25)
+    assert [failure.split(":")[0] for failure in failures] == ["over_ceiling", "slower"]
+    assert check(results, {}, baseline, tolerance=0.5) == []
@@ -0,0 +1,62 @@
+# trading_platform_backend/tests/test_exposure.py
+
+# Per-symbol house exposure book
+
+import asyncio
+
+import pytest
+
+from app.services.exposure import PAYOUT_MULTIPLIER, ExposureBook
+from app.services.repository import OrderRecord
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_reserve_stops_at_the_worst_case_limit():
+    book = ExposureBook(max_exposure=100.0 * PAYOUT_MULTIPLIER)
+    assert book.reserve("BTC", "rise", 60.0)
+    assert book.reserve("BTC", "fall", 40.0)  # Both sides count: each can win against its own locked price
+    assert not book.reserve("BTC", "rise", 1.0)
+    assert book.reserve("ETH", "rise", 100.0)  # Limits are per symbol
+
+    snapshot = book.snapshot("BTC")["BTC"]
+    assert snapshot["pending_orders"] == 2
+    assert snapshot["worst_case_payout"] == pytest.approx(100.0 * PAYOUT_MULTIPLIER)
+
+
+async def test_release_frees_the_stake_and_forgets_settled_symbols():
+    book = ExposureBook(max_exposure=100.0 * PAYOUT_MULTIPLIER)
+    book.reserve("BTC", "rise", 100.0)
+    book.release("BTC", "rise", 100.0)
+    assert book.snapshot() == {}
+    assert book.reserve("BTC", "fall", 100.0)
+    book.release("LTC", "rise", 10.0)  # Unknown symbol: nothing to release
+    assert book.snapshot("LTC") == {}
+
+
+async def test_wait_for_change_wakes_on_updates():
+    book = ExposureBook()
+    version = book.version
+    waiter = asyncio.create_task(book.wait_for_change(version))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+    book.reserve("BTC", "rise", 10.0)
+    await asyncio.wait_for(waiter, 1)
+    assert book.version == version + 1
+
+
+async def test_load_seeds_the_book_from_pending_orders(repository):
+    user = await repository.create_user("trader", "t@example.com", "x", balance=0.0)
+    for amount, prediction in ((10.0, "rise"), (20.0, "rise"), (5.0, "fall")):
+        await repository.insert_order(OrderRecord(user.id, "BTC", amount, prediction, 30, 1.0))
+    settled = await repository.insert_order(OrderRecord(user.id, "BTC", 50.0, "rise", 30, 1.0))
+    await repository.settle_order(settled.id, "lose", 0)
+
+    book = ExposureBook()
+    book.reserve("ETH", "rise", 1.0)  # Replaced by the load
+    await book.load()
+
+    assert book.snapshot() == {"BTC": {
+        "rise": 30.0, "fall": 5.0, "pending_orders": 3,
+        "worst_case_payout": pytest.approx(35.0 * PAYOUT_MULTIPLIER), "limit": book.max_exposure,
+    }}
@@ -0,0 +1,81 @@
+# trading_platform_backend/tests/test_features.py
+
+# Vectorized feature pipeline and its incremental per-symbol tracker
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import MinMaxScaler
+
+from app import utils
+from app.services.features import (
+    FeatureTracker, as_float32, ema, log_returns, lstm_training_data, minmax_scale, minmax_unscale,
+    rolling_volatility, sliding_windows,
+)
+
+PRICES = list(100.0 + np.cumsum(np.random.default_rng(7).normal(0, 0.5, 200)))
+
+
+def test_windows_are_views_of_the_prices():
+    prices = as_float32(PRICES)
+    assert as_float32(prices) is prices
+    windows = sliding_windows(prices, 5)
+    assert windows.shape == (196, 5)
+    assert np.shares_memory(windows, prices)
+    assert np.array_equal(windows[3], prices[3:8])
+
+
+def test_lstm_training_data_matches_the_scaler():
+    X, y, data_min, data_max = lstm_training_data(PRICES, 5)
+    scaled = MinMaxScaler().fit_transform(np.array(PRICES).reshape(-1, 1)).ravel()
+    assert (data_min, data_max) == pytest.approx((min(PRICES), max(PRICES)), rel=1e-6)
+    assert X.shape == (195, 5) and y.shape == (195,)
+    assert X[0] == pytest.approx(scaled[:5], abs=1e-5)
+    assert y[0] == pytest.approx(scaled[5], abs=1e-5)
+    assert minmax_unscale(minmax_scale(np.array(PRICES), data_min, data_max), data_min, data_max) == pytest.approx(
+        PRICES, rel=1e-5
+    )
+
+
+def test_flat_prices_scale_to_zero():
+    assert np.array_equal(minmax_scale(np.array([5.0, 5.0]), 5.0, 5.0), [0.0, 0.0])
+
+
+def test_rolling_statistics_match_pandas():
+    returns = log_returns(PRICES)
+    expected_returns = np.log(pd.Series(PRICES)).diff().dropna().to_numpy()
+    assert returns == pytest.approx(expected_returns, abs=1e-6)
+
+    expected_volatility = pd.Series(returns, dtype=float).rolling(20).std().dropna().to_numpy()
+    assert rolling_volatility(returns, 20) == pytest.approx(expected_volatility, rel=1e-4)
+
+    expected_ema = pd.Series(PRICES).ewm(span=12, adjust=False).mean().to_numpy()
+    assert ema(PRICES, 12) == pytest.approx(expected_ema, rel=1e-6)
+    assert len(ema([], 12)) == 0
+
+
+def test_tracker_matches_the_batch_features():
+    tracker = FeatureTracker(volatility_window=20, ema_spans=(12, 26))
+    assert tracker.update("FEAT1") is None
+
+    for price in PRICES[:50]:
+        utils.record_tick("FEAT1", price, "test")
+    tracker.update("FEAT1")
+    for price in PRICES[50:]:  # Absorbed over several updates
+        utils.record_tick("FEAT1", price, "test")
+    features = tracker.update("FEAT1")
+
+    returns = log_returns(PRICES)
+    assert features["price"] == PRICES[-1]
+    assert features["log_return"] == pytest.approx(float(returns[-1]), rel=1e-5)
+    assert features["volatility"] == pytest.approx(float(rolling_volatility(returns, 20)[-1]), rel=1e-4)
+    assert features["ema_12"] == pytest.approx(float(ema(PRICES, 12)[-1]), rel=1e-6)
+    assert features["ema_26"] == pytest.approx(float(ema(PRICES, 26)[-1]), rel=1e-6)
+    assert tracker.update("FEAT1") == features  # No new ticks
+
+
+def test_tracker_starts_without_returns():
+    tracker = FeatureTracker()
+    utils.record_tick("FEAT2", 100.0, "test")
+    features = tracker.update("FEAT2")
+    assert (features["price"], features["log_return"], features["volatility"]) == (100.0, None, None)
@@ -0,0 +1,100 @@
+# trading_platform_backend/tests/test_feed_replay.py
+
+# Feed capture files and the local websocket server replaying them
+
+import asyncio
+import gzip
+import json
+
+import pytest
+import websockets
+
+from app.services.feed_capture import CaptureWriter, load_capture, read_capture
+from app.services.feed_replay import FeedReplayServer, ScriptedDisconnect
+
+pytestmark = pytest.mark.anyio
+
+
+def write_capture(path, records):
+    with gzip.open(path, "wt", encoding="utf-8") as capture:
+        for t, source, frame in records:
+            capture.write(json.dumps({"t": t, "source": source, "frame": frame}) + "\n")
+
+
+def test_captured_frames_read_back_in_order(tmp_path):
+    writer = CaptureWriter(tmp_path / "captures" / "binance+kraken.jsonl.gz")
+    writer.write("binance", '{"e": "trade"}')
+    writer.write("kraken", b'[1, {"c": ["1.0"]}, "ticker", "XBT/USD"]')
+    writer.close()
+
+    records = list(read_capture(writer.path))
+    assert [(source, frame) for _, source, frame in records] == [
+        ("binance", '{"e": "trade"}'), ("kraken", '[1, {"c": ["1.0"]}, "ticker", "XBT/USD"]')
+    ]
+    assert 0.0 <= records[0][0] <= records[1][0]
+    assert [frame for _, _, frame in read_capture(writer.path, ["kraken"])] == [records[1][2]]
+
+
+def test_captures_play_back_to_back(tmp_path):
+    write_capture(tmp_path / "a.jsonl.gz", [(0.0, "binance", "a1"), (1.0, "kraken", "k"), (2.0, "binance", "a2")])
+    write_capture(tmp_path / "b.jsonl.gz", [(0.5, "binance", "b1")])
+    assert load_capture([tmp_path / "a.jsonl.gz", tmp_path / "b.jsonl.gz"], "binance") == [
+        (0.0, "a1"), (2.0, "a2"), (2.5, "b1")
+    ]
+
+
+def test_scripted_disconnects_parse():
+    assert ScriptedDisconnect.parse("500") == ScriptedDisconnect(500)
+    assert ScriptedDisconnect.parse("500:10:abort") == ScriptedDisconnect(500, 10.0, True)
+    for spec in ("500:10:close", "", "1:2:abort:3"):
+        with pytest.raises(ValueError):
+            ScriptedDisconnect.parse(spec)
+
+
+@pytest.fixture
+async def replay():
+    servers = []
+
+    async def start(frames, **options):
+        server = FeedReplayServer(frames, **options)
+        await server.start(port=0)
+        servers.append(server)
+        return server, f"ws://127.0.0.1:{server._server.sockets[0].getsockname()[1]}"
+
+    yield start
+    for server in servers:
+        await server.stop()
+
+
+async def test_frames_are_replayed_in_order(replay):
+    frames = [(i * 0.001, f"frame {i}") for i in range(20)]
+    server, url = await replay({"binance": frames, "kraken": []}, rate=2000.0)
+    async with websockets.connect(f"{url}/binance") as websocket:
+        await websocket.send("subscribe")
+        received = [await asyncio.wait_for(websocket.recv(), 5) for _ in range(20)]
+    assert received == [frame for _, frame in frames]
+    assert server.stats["frames_sent"] == 20
+
+    with pytest.raises(websockets.exceptions.InvalidStatusCode) as refused:
+        await websockets.connect(f"{url}/coinbase")
+    assert refused.value.status_code == 404
+
+
+async def test_scripted_disconnects_refuse_reconnects_for_a_while(replay):
+    frames = [(i * 0.001, f"frame {i}") for i in range(1000)]
+    server, url = await replay({"binance": frames}, rate=500.0, disconnects=[ScriptedDisconnect(3, downtime=0.3)])
+    received = []
+    async with websockets.connect(f"{url}/binance") as websocket:
+        with pytest.raises(websockets.exceptions.ConnectionClosedError):
+            while True:
+                received.append(await asyncio.wait_for(websocket.recv(), 5))
+    assert received == ["frame 0", "frame 1", "frame 2"]
+    assert websocket.close_code == 1012
+
+    with pytest.raises(websockets.exceptions.InvalidStatusCode) as refused:
+        await websockets.connect(f"{url}/binance")
+    assert refused.value.status_code == 503
+    await asyncio.sleep(0.4)
+    async with websockets.connect(f"{url}/binance") as websocket:
+        assert (await asyncio.wait_for(websocket.recv(), 5)).startswith("frame ")
+    assert (server.stats["disconnects"], server.stats["refused"]) == (1, 1)
@@ -0,0 +1,50 @@
+# trading_platform_backend/tests/test_indexes.py
+
+# Declared Beanie indexes and the query-plan audit helpers
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from app.models import MongoOrder, MongoPriceTick, MongoUser, MongoUserStats
+from scripts.audit_query_plans import QUERY_SHAPES, find_stages
+
+pytestmark = pytest.mark.anyio
+
+
+async def index_keys(model) -> set:
+    information = await model.get_motor_collection().index_information()
+    return {tuple(index["key"]) for index in information.values()}
+
+
+async def test_init_beanie_builds_the_declared_indexes(mongo_repository):
+    assert {
+        (("user_id", 1), ("status", 1)),
+        (("user_id", 1), ("start_time", -1), ("_id", -1)),
+        (("status", 1), ("start_time", 1)),
+        (("start_time", -1),),
+    } <= await index_keys(MongoOrder)
+    assert (("symbol", 1), ("timestamp", 1), ("_id", 1)) in await index_keys(MongoPriceTick)
+    assert (("wins", -1),) in await index_keys(MongoUserStats)
+
+
+async def test_usernames_are_unique(mongo_repository):
+    await mongo_repository.create_user("alice", "alice@example.com", "x")
+    with pytest.raises(DuplicateKeyError):
+        await MongoUser(username="alice", email="other@example.com", hashed_password="x").insert()
+
+
+def test_find_stages_walks_the_whole_plan():
+    plan = {
+        "stage": "FETCH",
+        "inputStage": {"stage": "OR", "inputStages": [{"stage": "IXSCAN"}, {"stage": "COLLSCAN"}]},
+    }
+    assert find_stages(plan) == ["FETCH", "OR", "IXSCAN", "COLLSCAN"]
+    assert find_stages({}) == []
+
+
+def test_query_shapes_use_declared_fields():
+    for description, model, query_filter, sort, scan_expected in QUERY_SHAPES:
+        fields = set(model.model_fields) | {"_id"}
+        filter_fields = {key for key in query_filter if not key.startswith("$")}
+        assert filter_fields <= fields, description
+        assert {key for key, _ in sort or ()} <= fields, description
@@ -0,0 +1,94 @@
+# trading_platform_backend/tests/test_inference_service.py
+
+# Process-pool inference service: results, admission, timeouts, crashed workers and HTTP mapping
+
+import asyncio
+import os
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.inference_service import InferenceError, InferenceQueueFull, InferenceService, InferenceTimeout
+
+pytestmark = pytest.mark.anyio
+
+
+# Jobs run in spawned workers, which import this module: they live at module level and the
+# module keeps its imports light
+def square(x: float) -> float:
+    return x * x
+
+
+def fail(message: str):
+    raise ValueError(message)
+
+
+def sleep(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def crash():
+    os._exit(1)
+
+
+@pytest.fixture
+async def service():
+    service = InferenceService(name="test", max_workers=1, max_queue=1, job_timeout=30)
+    yield service
+    await service.shutdown()
+
+
+async def test_runs_jobs_in_a_worker_process(service):
+    assert await service.run(square, 3.0) == 9.0
+    assert await service.run(os.getpid) != os.getpid()
+    assert service.stats["completed"] == 2 and service.pending == 0
+
+
+async def test_job_errors_propagate(service):
+    with pytest.raises(ValueError, match="bad input"):
+        await service.run(fail, "bad input")
+    assert service.stats["failed"] == 1
+    assert await service.run(square, 2.0) == 4.0
+
+
+async def test_full_queue_fails_fast(service):
+    running = [asyncio.create_task(service.run(sleep, 0.5)) for _ in range(2)]  # One running, one queued
+    await asyncio.sleep(0)
+    with pytest.raises(InferenceQueueFull):
+        await service.run(square, 1.0)
+    assert await asyncio.gather(*running) == [0.5, 0.5]
+    assert service.stats["rejected"] == 1
+
+
+async def test_hung_job_times_out_and_recycles_the_pool(service):
+    with pytest.raises(InferenceTimeout):
+        await service.run(sleep, 30.0, timeout=0.5)
+    assert service.stats["timeouts"] == 1 and service.stats["recycles"] == 1
+    assert await service.run(square, 4.0) == 16.0
+
+
+async def test_crashed_worker_is_replaced(service):
+    with pytest.raises(InferenceError, match="crashed"):
+        await service.run(crash)
+    assert service.stats["recycles"] == 1
+    assert await service.run(square, 5.0) == 25.0
+
+
+@pytest.mark.parametrize("error, status_code", [
+    (InferenceQueueFull("busy"), 503),
+    (InferenceError("Prediction worker crashed"), 503),
+    (InferenceTimeout("timed out"), 504),
+    (ValueError("Not enough data"), 400),
+])
+async def test_prediction_routes_map_inference_failures(monkeypatch, error, status_code):
+    from app.routes import predictions
+
+    async def failing(symbol, source):
+        raise error
+
+    monkeypatch.setattr(predictions, "predict_price_lstm", failing)
+    with pytest.raises(HTTPException) as raised:
+        await predictions._predict_lstm("BTC/USD", "mongo")
+    assert raised.value.status_code == status_code
@@ -0,0 +1,83 @@
+# trading_platform_backend/tests/test_leaderboard.py
+
+# Leaderboard rankings kept from order events and rebuilt from the user stats
+
+import pytest
+
+from app.services import stats_service
+from app.services.leaderboard import MIN_SETTLED_FOR_WIN_RATE, Leaderboard
+from app.services.repository import OrderRecord, UserRecord
+
+pytestmark = pytest.mark.anyio
+
+
+def settle(board: Leaderboard, user: UserRecord, status: str, amount: float = 10.0, payout: float = 0.0):
+    order = OrderRecord(user.id, "BTC", amount, "rise", 30, 1.0, id="o")
+    board.order_placed(order, user)
+    board.order_settled(OrderRecord(user.id, "BTC", amount, "rise", 30, 1.0, status=status, payout=payout), user)
+
+
+def ranking(board: Leaderboard, metric: str, offset: int = 0, limit: int = 10) -> list:
+    return [entry["username"] for entry in board.page(metric, offset, limit)[1]]
+
+
+def test_event_updates_move_users_between_ranks():
+    board = Leaderboard()
+    alice, bob = UserRecord("a", "alice", "a@example.com"), UserRecord("b", "bob", "b@example.com")
+    settle(board, alice, "win", payout=20.0)
+    settle(board, bob, "win", payout=20.0)
+    settle(board, bob, "win", payout=20.0)
+    assert ranking(board, "wins") == ["bob", "alice"]
+    assert ranking(board, "net_payout") == ["bob", "alice"]
+
+    settle(board, alice, "win", payout=20.0)
+    settle(board, alice, "win", amount=100.0, payout=200.0)
+    assert ranking(board, "wins") == ["alice", "bob"]
+    total, [first, second] = board.page("net_payout")
+    assert total == 2
+    assert (first["username"], first["rank"], first["net_payout"]) == ("alice", 1, pytest.approx(120.0))
+    assert (first["orders"], first["wins"], first["losses"]) == (3, 3, 0)
+    assert second["rank"] == 2
+
+
+def test_win_rate_ranks_only_users_with_enough_settled_orders():
+    board = Leaderboard()
+    alice, bob = UserRecord("a", "alice", "a@example.com"), UserRecord("b", "bob", "b@example.com")
+    settle(board, bob, "win", payout=20.0)  # 100% over a single order
+    for i in range(MIN_SETTLED_FOR_WIN_RATE):
+        settle(board, alice, "win" if i % 2 else "lose", payout=20.0 if i % 2 else 0.0)
+
+    total, [entry] = board.page("win_rate")
+    assert total == 1
+    assert (entry["username"], entry["win_rate"]) == ("alice", pytest.approx(0.5))
+    assert board.page("wins")[1][1]["win_rate"] is None
+
+
+def test_pages_are_rank_slices():
+    board = Leaderboard()
+    for i in range(5):
+        user = UserRecord(str(i), f"user{i}", f"{i}@example.com")
+        for _ in range(i):
+            settle(board, user, "win", payout=20.0)
+    assert ranking(board, "wins", offset=1, limit=2) == ["user3", "user2"]
+    assert [entry["rank"] for entry in board.page("wins", offset=1, limit=2)[1]] == [2, 3]
+    assert ranking(board, "wins", offset=10) == []
+
+
+async def test_rebuild_matches_the_stored_stats(repository):
+    board = Leaderboard()
+    for name, outcomes in (("alice", ["win", "lose"]), ("bob", ["win", "win"])):
+        user = await repository.create_user(name, f"{name}@example.com", "x", balance=100.0)
+        for status in outcomes:
+            order = await repository.insert_order(OrderRecord(user.id, "BTC", 10.0, "rise", 30, 1.0))
+            await stats_service.record_order_placed(order, user)
+            settled = await repository.settle_order(order.id, status, 20.0 if status == "win" else 0.0)
+            await stats_service.record_order_settled(settled, user)
+            board.order_placed(order, user)
+            board.order_settled(settled, user)
+
+    rebuilt = Leaderboard()
+    await rebuilt.rebuild()
+    for metric in ("wins", "net_payout", "win_rate"):
+        assert rebuilt.page(metric) == board.page(metric)
+    assert ranking(rebuilt, "wins") == ["bob", "alice"]
@@ -0,0 +1,79 @@
+# trading_platform_backend/tests/test_loop_diagnostics.py
+
+# Event loop stall detection and the opt-in request profiler
+
+import asyncio
+import pstats
+import time
+
+import pytest
+
+from app.services.loop_watchdog import LoopWatchdog
+from app.services.request_profiler import ProfilerMiddleware
+
+pytestmark = pytest.mark.anyio
+
+
+def block_the_loop(seconds: float):
+    time.sleep(seconds)
+
+
+async def test_stalls_are_recorded_with_the_blocking_stack():
+    watchdog = LoopWatchdog(threshold=0.1, interval=0.02)
+    watchdog.start()
+    try:
+        await asyncio.sleep(0.1)
+        block_the_loop(0.4)
+        await asyncio.sleep(0.1)
+    finally:
+        watchdog.stop()
+
+    assert watchdog.stats["max_stall_seconds"] >= 0.3
+    stall = max(watchdog.recent_stalls, key=lambda stall: stall["duration_seconds"])
+    assert watchdog.stats["stalls"] == len(watchdog.recent_stalls)
+    assert any("block_the_loop" in frame for frame in stall["stack"])
+
+
+async def endpoint(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def call(middleware, path="/api/orders", headers=(), scope_type="http"):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    await middleware({"type": scope_type, "method": "GET", "path": path, "headers": list(headers)}, None, send)
+    return sent
+
+
+async def test_requested_profiles_are_written(tmp_path):
+    middleware = ProfilerMiddleware(endpoint, tmp_path, sample_rate=0.0, slow_threshold=60.0, token="secret")
+    sent = await call(middleware, headers=[(b"x-profile", b"secret")])
+    assert sent[-1]["body"] == b"ok"
+    [profile] = tmp_path.glob("*.prof")
+    assert "_GET_api_orders_" in profile.name
+    assert pstats.Stats(str(profile)).total_calls > 0
+
+    await call(middleware, headers=[(b"x-profile", b"wrong")])
+    await call(middleware, scope_type="websocket")
+    assert len(list(tmp_path.glob("*.prof"))) == 1
+
+
+async def test_the_header_is_ignored_without_a_token(tmp_path):
+    middleware = ProfilerMiddleware(endpoint, tmp_path, sample_rate=0.0, token="")
+    await call(middleware, headers=[(b"x-profile", b"")])
+    assert not tmp_path.exists() or not list(tmp_path.glob("*.prof"))
+
+
+async def test_sampled_requests_are_kept_only_when_slow(tmp_path):
+    fast = ProfilerMiddleware(endpoint, tmp_path / "fast", sample_rate=1.0, slow_threshold=60.0)
+    await call(fast)
+    assert not (tmp_path / "fast").exists()
+
+    slow = ProfilerMiddleware(endpoint, tmp_path / "slow", sample_rate=1.0, slow_threshold=0.0)
+    await call(slow, path="/")
+    [profile] = (tmp_path / "slow").glob("*.prof")
+    assert "_GET_root_" in profile.name
@@ -0,0 +1,38 @@
+# trading_platform_backend/tests/test_lstm_engine.py
+
+# NumPy LSTM engine against the Keras model it was exported from
+
+import numpy as np
+import pytest
+
+from app.services.lstm_engine import LstmEngine, export_lstm_weights
+
+tf = pytest.importorskip("tensorflow")
+
+
+@pytest.fixture(scope="module")
+def keras_model():
+    from app.services.lstm_model import build_lstm_model
+
+    return build_lstm_model(5)
+
+
+def test_forward_pass_matches_keras(tmp_path, keras_model):
+    export_lstm_weights(keras_model, tmp_path / "weights.npz")
+    engine = LstmEngine.load(tmp_path / "weights.npz")
+    assert [layer["kind"] for layer in engine.layers] == ["LSTM", "LSTM", "Dense", "Dense"]  # Dropout skipped
+
+    X = np.random.default_rng(3).random((8, 5)).astype(np.float32)
+    expected = keras_model.predict(X[..., np.newaxis], verbose=0)
+    assert engine.predict(X).shape == (8, 1)
+    assert engine.predict(X) == pytest.approx(expected, abs=1e-5)
+    assert engine.predict(X[..., np.newaxis]) == pytest.approx(expected, abs=1e-5)
+
+
+def test_unsupported_layers_and_activations_are_rejected(tmp_path):
+    model = tf.keras.Sequential([tf.keras.Input((5, 1)), tf.keras.layers.GRU(4), tf.keras.layers.Dense(1)])
+    with pytest.raises(ValueError, match="GRU"):
+        export_lstm_weights(model, tmp_path / "weights.npz")
+
+    with pytest.raises(ValueError, match="softsign"):
+        LstmEngine([{"kind": "Dense", "activation": "softsign"}])
@@ -0,0 +1,93 @@
+# trading_platform_backend/tests/test_metrics.py
+
+# Prometheus text exposition of the in-process metrics, and the feed tick counters
+
+import json
+
+import pytest
+
+from app import utils
+from app.services import metrics as metrics_module
+from app.services.metrics import MetricsRegistry, ticks_received, ticks_recorded
+
+pytestmark = pytest.mark.anyio
+
+
+def test_counters_and_gauges_render_with_labels():
+    registry = MetricsRegistry()
+    counter = registry.counter("orders_total", "Orders", ["symbol"])
+    gauge = registry.gauge("clients", "Clients")
+    counter.inc("BTC")
+    counter.inc("BTC", amount=2.0)
+    counter.inc('EUR"USD')
+    gauge.set(3.0)
+    gauge.dec()
+
+    assert registry.render().splitlines() == [
+        "# HELP trading_orders_total Orders",
+        "# TYPE trading_orders_total counter",
+        'trading_orders_total{symbol="BTC"} 3.0',
+        'trading_orders_total{symbol="EUR\\"USD"} 1.0',
+        "# HELP trading_clients Clients",
+        "# TYPE trading_clients gauge",
+        "trading_clients 2.0",
+    ]
+    with pytest.raises(ValueError):
+        registry.gauge("clients", "Clients again")
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+    samples = [line for line in registry.render().splitlines() if not line.startswith("#")]
+    assert samples == [
+        'trading_latency_seconds_bucket{le="0.1"} 2.0',  # Bounds are inclusive
+        'trading_latency_seconds_bucket{le="1.0"} 3.0',
+        'trading_latency_seconds_bucket{le="+Inf"} 4.0',
+        "trading_latency_seconds_count 4.0",
+        "trading_latency_seconds_sum 2.65",
+    ]
+
+
+def test_moving_average_weights_by_time(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(metrics_module.time, "monotonic", lambda: now[0])
+    average = MetricsRegistry().ewma("recent_seconds", "Recent", tau=1.0)
+    average.observe(1.0)
+    now[0] += 1000.0  # Long after: the new observation replaces the average
+    average.observe(3.0)
+    assert average.value() == pytest.approx(3.0)
+    now[0] += 1e-9  # Immediately after: barely moves
+    average.observe(100.0)
+    assert average.value() == pytest.approx(3.0, abs=1e-6)
+    now[0] += average.stale_after + 1.0
+    assert average.value() == 0.0
+
+
+def test_collectors_export_numeric_stats():
+    registry = MetricsRegistry()
+    registry.register_collector("inference", lambda: {"submitted": 4, "busy": True, "name": "x"}, pool="inference")
+    registry.register_collector("inference", lambda: {"submitted": 1}, pool="training")
+    registry.register_collector("broken", lambda: 1 / 0)
+    assert registry.render().splitlines() == [
+        "# TYPE trading_inference_submitted gauge",
+        'trading_inference_submitted{pool="inference"} 4.0',
+        'trading_inference_submitted{pool="training"} 1.0',
+    ]
+
+
+async def test_every_received_tick_is_counted_before_the_throttle(repository):
+    utils.last_update_times.pop("LTC", None)
+    received = ticks_received._values.get(("binance", "LTC"), 0.0)
+    recorded = ticks_recorded._values.get(("binance", "LTC"), 0.0)
+    message = json.dumps({"e": "trade", "s": "LTCUSDT", "p": "70.5"})
+
+    for _ in range(3):
+        await utils.handle_message(message)
+
+    assert ticks_received._values[("binance", "LTC")] == received + 3
+    assert ticks_recorded._values[("binance", "LTC")] == recorded + 1
+    assert await repository.get_price("LTC") == 70.5
+    assert "trading_ticks_received_total{source=\"binance\",symbol=\"LTC\"}" in metrics_module.metrics.render()
@@ -0,0 +1,131 @@
+# trading_platform_backend/tests/test_model_registry.py
+
+# LSTM model registry: versioning across processes, pruning, resident engines and drift
+
+import threading
+
+import numpy as np
+import pytest
+
+from app.services.model_registry import WEIGHTS_FILE, ModelRegistry
+
+tf = pytest.importorskip("tensorflow")
+
+META = {"trained_at": "2024-01-01T00:00:00", "time_steps": 5, "data_min": 100.0, "data_max": 200.0}
+
+
+@pytest.fixture(scope="module")
+def keras_model():
+    from app.services.lstm_model import build_lstm_model
+
+    return build_lstm_model(5)
+
+
+@pytest.fixture(scope="module")
+def scaler():
+    from sklearn.preprocessing import MinMaxScaler
+
+    return MinMaxScaler().fit(np.array([[100.0], [200.0]]))
+
+
+def test_versions_are_numbered_per_symbol(tmp_path, keras_model, scaler):
+    registry = ModelRegistry(tmp_path)
+    assert registry.latest_meta("BTC/USD") is None
+    assert registry.save("BTC/USD", keras_model, scaler, META) == 1
+    assert registry.save("BTC/USD", keras_model, scaler, META) == 2
+    assert registry.save("ETH/USD", keras_model, scaler, META) == 1
+    assert registry.versions("BTC/USD") == [1, 2]
+    assert registry.latest_meta("BTC/USD")["version"] == 2
+    assert (tmp_path / "lstm" / "BTC_USD" / "v2" / WEIGHTS_FILE).exists()
+
+
+def test_versions_registered_elsewhere_refresh_the_cached_metadata(tmp_path, keras_model, scaler):
+    serving, training = ModelRegistry(tmp_path), ModelRegistry(tmp_path)
+    training.save("BTC/USD", keras_model, scaler, META)
+    assert serving.latest_meta("BTC/USD")["version"] == 1
+    training.save("BTC/USD", keras_model, scaler, {**META, "samples": 7})
+    assert serving.latest_meta("BTC/USD") == {**META, "samples": 7, "symbol": "BTC/USD", "version": 2}
+
+
+def test_concurrent_saves_get_distinct_versions(tmp_path, keras_model, scaler, monkeypatch):
+    # Keras saving is not thread-safe; the version pick and rename under the flock is what's tested
+    monkeypatch.setattr(keras_model, "save", lambda path: path.write_bytes(b""))
+    registries = [ModelRegistry(tmp_path, keep_versions=100) for _ in range(4)]
+    versions = []
+    threads = [
+        threading.Thread(target=lambda r=registry: versions.extend(
+            r.save("BTC/USD", keras_model, scaler, META) for _ in range(3)
+        ))
+        for registry in registries
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(versions) == list(range(1, 13))
+    assert registries[0].versions("BTC/USD") == list(range(1, 13))
+
+
+def test_old_versions_are_pruned(tmp_path, keras_model, scaler):
+    registry = ModelRegistry(tmp_path, keep_versions=2)
+    for _ in range(4):
+        registry.save("BTC/USD", keras_model, scaler, META)
+    assert registry.versions("BTC/USD") == [3, 4]
+    assert sorted(path.name for path in (tmp_path / "lstm" / "BTC_USD").iterdir()) == [".lock", "v3", "v4"]
+    assert registry.load("BTC/USD", 1) is None
+    with pytest.raises(ValueError):
+        registry.engine("BTC/USD", 1)
+
+
+def test_engines_stay_resident_until_a_newer_version_is_used(tmp_path, keras_model, scaler):
+    registry = ModelRegistry(tmp_path)
+    registry.save("BTC/USD", keras_model, scaler, META)
+    first = registry.engine("BTC/USD", 1)
+    assert registry.engine("BTC/USD", 1) is first
+    registry.save("BTC/USD", keras_model, scaler, META)
+    assert registry.engine("BTC/USD", 2)["version"] == 2
+    assert list(registry._engines) == [("BTC/USD", 2)]
+
+
+def test_missing_weights_are_reported(tmp_path, keras_model, scaler):
+    registry = ModelRegistry(tmp_path)
+    registry.save("BTC/USD", keras_model, scaler, META)
+    (tmp_path / "lstm" / "BTC_USD" / "v1" / WEIGHTS_FILE).unlink()
+    with pytest.raises(ValueError, match="export_lstm_weights"):
+        registry.load("BTC/USD")
+
+
+def test_predictions_match_the_keras_model(tmp_path, keras_model, scaler):
+    registry = ModelRegistry(tmp_path)
+    registry.save("BTC/USD", keras_model, scaler, META)
+    prices = [120.0, 140.0, 130.0, 150.0, 160.0, 170.0]
+
+    window = scaler.transform(np.array(prices[-5:]).reshape(-1, 1)).reshape(1, 5, 1)
+    expected = scaler.inverse_transform(keras_model.predict(window, verbose=0))[0][0]
+    assert registry.predict(registry.engine("BTC/USD", 1), prices) == pytest.approx(expected, rel=1e-4)
+
+
+def test_drift_flags_until_a_new_version_is_registered(tmp_path, keras_model, scaler):
+    registry = ModelRegistry(tmp_path)
+    registry.save("BTC/USD", keras_model, scaler, META)
+    meta = registry.latest_meta("BTC/USD")
+    assert not registry.check_drift("BTC/USD", meta, [150.0] * 20)
+    assert not registry.check_drift("BTC/USD", meta, [150.0] * 18 + [250.0] * 2)  # Within the tolerance
+    assert registry.check_drift("BTC/USD", meta, [150.0] * 10 + [250.0] * 10)
+    assert "BTC/USD" in registry.drifted_symbols
+
+    registry.save("BTC/USD", keras_model, scaler, {**META, "data_max": 300.0})
+    assert "BTC/USD" not in registry.drifted_symbols
+
+
+def test_train_registers_a_servable_version(tmp_path):
+    registry = ModelRegistry(tmp_path)
+    with pytest.raises(ValueError):
+        registry.train("BTC/USD", [100.0] * 5, epochs=1)
+
+    prices = list(100.0 + np.sin(np.arange(60) / 5.0) * 10.0)
+    assert registry.train("BTC/USD", prices, epochs=1) == 1
+    meta = registry.latest_meta("BTC/USD")
+    assert (meta["samples"], meta["epochs"]) == (60, 1)
+    assert meta["data_min"] == pytest.approx(min(prices), rel=1e-6)
+    assert np.isfinite(registry.predict(registry.engine("BTC/USD", 1), prices))
@@ -0,0 +1,86 @@
+# trading_platform_backend/tests/test_mongo_client.py
+
+# Shared Mongo client: pool settings, pool usage counters and per-workload write concerns
+
+from types import SimpleNamespace
+
+import pytest
+
+from app import database
+from app.database import PoolMetrics, WRITE_CONCERNS, with_write_concern
+from app.services import mongo_repository
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def shared_client(monkeypatch):
+    monkeypatch.setattr(database, "MONGO_URI", "mongodb://localhost:27017")  # The client connects lazily
+    monkeypatch.setattr(database, "client", None)
+    yield
+    database.close_mongo()
+
+
+async def test_one_client_is_shared_until_closed(shared_client):
+    db = database.connect_mongo()
+    client = database.client
+    assert database.connect_mongo().client is client
+    assert db.name == database.MONGO_DB_NAME
+    assert client.options.pool_options.max_pool_size == database.MONGO_MAX_POOL_SIZE
+    assert client.options.pool_options.min_pool_size == database.MONGO_MIN_POOL_SIZE
+    assert database.mongo_pool_metrics in client.options.event_listeners
+
+    database.close_mongo()
+    assert database.client is None
+    assert database.connect_mongo().client is not client
+
+
+async def test_workloads_write_with_their_own_concern(shared_client):
+    collection = database.connect_mongo()["orders"]
+    assert with_write_concern(collection, "ledger").write_concern.document == {
+        "w": "majority", "j": True, "wtimeout": database.MONGO_LEDGER_WTIMEOUT_MS
+    }
+    assert with_write_concern(collection, "ticks").write_concern == WRITE_CONCERNS["ticks"]
+    assert not WRITE_CONCERNS["ticks"].document.get("j")
+    assert collection.write_concern.document == {}  # The shared handle is untouched
+
+    model = SimpleNamespace(get_motor_collection=lambda: collection)
+    assert mongo_repository._ledger(model).write_concern == WRITE_CONCERNS["ledger"]
+    assert mongo_repository._ticks(model).write_concern == WRITE_CONCERNS["ticks"]
+    with pytest.raises(KeyError):
+        with_write_concern(collection, "analytics")
+
+
+def test_pool_events_update_the_counters():
+    metrics = PoolMetrics()
+    for _ in range(2):
+        metrics.connection_created(SimpleNamespace())
+    metrics.connection_checked_out(SimpleNamespace(duration=0.25))
+    metrics.connection_checked_out(SimpleNamespace(duration=0.05))
+    metrics.connection_checked_out(SimpleNamespace())  # Drivers without a checkout duration
+    metrics.connection_checked_in(SimpleNamespace())
+    metrics.connection_check_out_failed(SimpleNamespace())
+    metrics.connection_closed(SimpleNamespace())
+    metrics.pool_cleared(SimpleNamespace())
+
+    stats = metrics.snapshot()
+    assert stats["checkout_wait_seconds"] == pytest.approx(0.3)
+    assert {name: value for name, value in stats.items() if name != "checkout_wait_seconds"} == {
+        "connections_open": 1,
+        "connections_in_use": 2,
+        "connections_created": 2,
+        "checkouts": 3,
+        "checkout_failures": 1,
+        "max_checkout_wait_seconds": 0.25,
+        "pool_clears": 1,
+    }
+    stats["checkouts"] = 0
+    assert metrics.stats["checkouts"] == 3  # Snapshots are copies
+
+
+def test_pool_stats_include_the_limits():
+    stats = database.mongo_pool_stats()
+    assert (stats["max_pool_size"], stats["min_pool_size"]) == (
+        database.MONGO_MAX_POOL_SIZE, database.MONGO_MIN_POOL_SIZE
+    )
+    assert set(database.mongo_pool_metrics.stats) <= set(stats)
@@ -0,0 +1,132 @@
+# trading_platform_backend/tests/test_order_settlement.py
+
+# Order evaluation: settlement, retries and release of the house exposure
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import utils
+from app.schemas import OrderCreate
+from app.services import trading_service
+from app.services.admission import AdmissionControl
+from app.services.exposure import ExposureBook
+from app.services.repository import OrderRecord
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def book(monkeypatch, tmp_path):
+    exposure = ExposureBook(max_exposure=1000.0)
+    monkeypatch.setattr(trading_service, "exposure_book", exposure)
+    monkeypatch.setattr(trading_service, "admission_control", AdmissionControl(tmp_path / "admission"))
+    monkeypatch.setattr(trading_service, "schedule_evaluation", lambda delay, order_id: scheduled.append(order_id))
+    scheduled.clear()
+    return exposure
+
+
+scheduled = []  # Order ids whose evaluation was (re)scheduled
+
+
+async def place(repository, prediction="rise", amount=100.0, symbol="BTC"):
+    user = await repository.create_user(f"user_{len(repository._users)}", "u@example.com", "x", balance=1000.0)
+    utils.record_tick(symbol, 100.0, "test")
+    order = OrderCreate(symbol=symbol, amount=amount, prediction=prediction, trade_time=30)
+    placed = await trading_service.place_order_with_real_time_price(order, user.id)
+    return user, placed["id"]
+
+
+def staked(book, symbol="BTC") -> float:
+    totals = book.snapshot(symbol).get(symbol)
+    return totals["rise"] + totals["fall"] if totals else 0.0
+
+
+async def test_winning_order_is_paid_and_releases_its_stake(repository, book):
+    user, order_id = await place(repository)
+    assert staked(book) == 100.0 and scheduled == [order_id]
+    utils.record_tick("BTC", 101.0, "test")
+
+    await trading_service.evaluate_order_outcome_with_real_time_price(order_id)
+
+    order = await repository.get_order(order_id)
+    assert order.status == "win"
+    assert (await repository.get_user(user.id)).balance == pytest.approx(900.0 + 100.0 * 1.02)
+    assert staked(book) == 0.0
+
+
+async def test_stake_is_released_when_another_process_settled_the_order(repository, book):
+    _, order_id = await place(repository)
+    await repository.settle_order(order_id, "lose", 0)  # Settled by another worker
+
+    await trading_service.evaluate_order_outcome_with_real_time_price(order_id)
+
+    assert staked(book) == 0.0
+
+
+async def test_stake_is_released_when_the_settlement_race_is_lost(repository, book, monkeypatch):
+    _, order_id = await place(repository)
+    utils.record_tick("BTC", 99.0, "test")
+    settle_order = repository.settle_order
+
+    async def settled_elsewhere(order_id, status, payout):
+        await settle_order(order_id, "win", 102.0)  # Another worker wins between get_order and settle_order
+        return await settle_order(order_id, status, payout)
+
+    monkeypatch.setattr(repository, "settle_order", settled_elsewhere)
+    await trading_service.evaluate_order_outcome_with_real_time_price(order_id)
+
+    assert staked(book) == 0.0
+    assert (await repository.get_order(order_id)).status == "win"
+
+
+async def test_stake_is_released_when_the_user_is_gone(repository, book):
+    user, order_id = await place(repository)
+    del repository._users[user.id]
+
+    await trading_service.evaluate_order_outcome_with_real_time_price(order_id)
+
+    assert staked(book) == 0.0
+
+
+async def test_missing_price_retries_and_keeps_the_stake(repository, book):
+    _, order_id = await place(repository)
+    del utils.latest_prices["BTC"]
+    scheduled.clear()
+
+    await trading_service.evaluate_order_outcome_with_real_time_price(order_id)
+
+    assert scheduled == [order_id]
+    assert staked(book) == 100.0
+    assert (await repository.get_order(order_id)).status == "pending"
+
+
+async def test_storage_error_retries_and_keeps_the_stake(repository, book, monkeypatch):
+    _, order_id = await place(repository)
+    scheduled.clear()
+
+    async def failing(*args, **kwargs):
+        raise ConnectionError("storage unavailable")
+
+    settle_order = repository.settle_order
+    monkeypatch.setattr(repository, "settle_order", failing)
+    await trading_service.evaluate_order_outcome_with_real_time_price(order_id)
+    assert scheduled == [order_id]
+    assert staked(book) == 100.0
+
+    monkeypatch.setattr(repository, "settle_order", settle_order)
+    await trading_service.evaluate_order_outcome_with_real_time_price(order_id)
+    assert staked(book) == 0.0
+
+
+async def test_resume_pending_orders_schedules_overdue_and_running_orders(repository, book, monkeypatch):
+    user = await repository.create_user("resumed", "r@example.com", "x", balance=0.0)
+    now = datetime.utcnow()
+    overdue = await repository.insert_order(OrderRecord(user.id, "ETH", 10.0, "rise", 30, 1.0, now - timedelta(minutes=5)))
+    running = await repository.insert_order(OrderRecord(user.id, "ETH", 10.0, "fall", 60, 1.0, now - timedelta(seconds=20)))
+    delays = {}
+    monkeypatch.setattr(trading_service, "schedule_evaluation", lambda delay, order_id: delays.update({order_id: delay}))
+
+    assert await trading_service.resume_pending_orders() == 2
+    assert delays[overdue.id] == 0.0
+    assert 35.0 < delays[running.id] <= 40.0
@@ -0,0 +1,104 @@
+# trading_platform_backend/tests/test_pagination.py
+
+# Keyset cursor pagination and NDJSON streaming of order listings
+
+import json
+from datetime import datetime, timedelta
+
+import orjson
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.models import MongoOrder
+from app.routes.trading import export_orders_by_user, get_order_by_user
+from app.services.pagination import (
+    NEXT_CURSOR_HEADER, apply_cursor, decode_cursor, encode_cursor, keyset_sort, stream_ndjson
+)
+
+pytestmark = pytest.mark.anyio
+
+START = datetime(2024, 1, 1)
+
+
+async def insert_orders(user_id: ObjectId, count: int) -> list:
+    """
+    Insert `count` orders, two per start_time so pages must break ties on `_id`.
+    :return: The order ids, newest first
+    """
+    documents = [
+        {"_id": ObjectId(), "user_id": user_id, "symbol": "BTC", "amount": 10.0, "prediction": "rise",
+         "trade_time": 30, "start_time": START + timedelta(minutes=i // 2), "locked_price": 1.0, "status": "pending"}
+        for i in range(count)
+    ]
+    await MongoOrder.get_motor_collection().insert_many(documents)
+    newest_first = sorted(documents, key=lambda document: (document["start_time"], document["_id"]), reverse=True)
+    return [str(document["_id"]) for document in newest_first]
+
+
+def test_cursor_round_trip():
+    last_id = ObjectId()
+    assert decode_cursor(encode_cursor(START, last_id)) == (START, last_id)
+    assert decode_cursor(encode_cursor(12.5, last_id)) == (12.5, last_id)
+    assert "=" not in encode_cursor("alice", last_id)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor(1, ObjectId())[:-4]])
+def test_invalid_cursor_is_a_bad_request(cursor):
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(cursor)
+    assert raised.value.status_code == 400
+
+
+def test_apply_cursor_keeps_the_existing_filter():
+    last_id = ObjectId()
+    cursor = encode_cursor(5, last_id)
+    assert apply_cursor({}, "wins", None, descending=True) == {}
+    assert apply_cursor({}, "wins", cursor, descending=False) == {
+        "$or": [{"wins": {"$gt": 5}}, {"wins": 5, "_id": {"$gt": last_id}}]
+    }
+    assert apply_cursor({"status": "win"}, "wins", cursor, descending=True)["$and"][0] == {"status": "win"}
+
+
+async def test_pages_cover_every_order_once_newest_first(mongo_repository):
+    user_id = ObjectId()
+    expected = await insert_orders(user_id, 7)
+    await insert_orders(ObjectId(), 3)  # Another user's orders
+
+    seen, cursor = [], None
+    while True:
+        response = await get_order_by_user(str(user_id), limit=3, cursor=cursor)
+        seen += [order["id"] for order in orjson.loads(response.body)]
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+    assert seen == expected
+
+
+async def test_unknown_user_is_not_found(mongo_repository):
+    with pytest.raises(HTTPException) as raised:
+        await get_order_by_user(str(ObjectId()), limit=3, cursor=None)
+    assert raised.value.status_code == 404
+
+
+async def test_export_streams_one_order_per_line(mongo_repository):
+    user_id = ObjectId()
+    expected = await insert_orders(user_id, 5)
+
+    response = await export_orders_by_user(str(user_id))
+    assert response.media_type == "application/x-ndjson"
+    lines = [line async for line in response.body_iterator]
+    rows = [json.loads(line) for line in lines]
+    assert all(line.endswith("\n") for line in lines)
+    assert [row["id"] for row in rows] == expected
+    assert rows[0]["start_time"] == (START + timedelta(minutes=2)).isoformat()
+
+
+async def test_stream_ndjson_applies_the_projection(mongo_repository):
+    user_id = ObjectId()
+    newest_first = await insert_orders(user_id, 3)
+
+    stream = stream_ndjson(MongoOrder.get_motor_collection(), {"user_id": user_id},
+                           keyset_sort("start_time", descending=False), projection={"symbol": 1}, batch_size=1)
+    rows = [json.loads(line) async for line in stream]
+    assert rows == [{"symbol": "BTC", "id": order_id} for order_id in reversed(newest_first)]
@@ -0,0 +1,121 @@
+# trading_platform_backend/tests/test_prediction_cache.py
+
+# Single-flight prediction cache: coalescing, expiry, eviction, failures and cancellation
+
+import asyncio
+
+import pytest
+
+from app import utils
+from app.services import prediction_service
+from app.services.prediction_service import PredictionCache, _cache_key
+
+pytestmark = pytest.mark.anyio
+
+
+class Computation:
+    """
+    A prediction that completes when released, counting how often it was started.
+    """
+
+    def __init__(self, value: float = 1.0):
+        self.value = value
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self) -> float:
+        self.calls += 1
+        await self.release.wait()
+        return self.value
+
+
+async def test_concurrent_requests_share_one_computation():
+    cache, compute = PredictionCache(), Computation(42.0)
+    waiters = [asyncio.create_task(cache.get_or_compute("key", compute)) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert cache.snapshot()["in_flight"] == 1
+    compute.release.set()
+    assert await asyncio.gather(*waiters) == [42.0] * 5
+    assert compute.calls == 1
+    assert await cache.get_or_compute("key", compute) == 42.0
+    assert cache.snapshot() == {"hits": 1, "misses": 1, "coalesced": 4, "evictions": 0, "entries": 1, "in_flight": 0}
+
+
+async def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(prediction_service.time, "monotonic", lambda: now[0])
+    cache, compute = PredictionCache(ttl=5.0), Computation()
+    compute.release.set()
+    await cache.get_or_compute("key", compute)
+    now[0] += 4.9
+    await cache.get_or_compute("key", compute)
+    assert compute.calls == 1
+    now[0] += 0.2
+    await cache.get_or_compute("key", compute)
+    assert compute.calls == 2
+
+
+async def test_least_recently_used_entries_are_evicted():
+    cache = PredictionCache(maxsize=2)
+    computations = {key: Computation(value) for value, key in enumerate("abc")}
+    for computation in computations.values():
+        computation.release.set()
+    await cache.get_or_compute("a", computations["a"])
+    await cache.get_or_compute("b", computations["b"])
+    await cache.get_or_compute("a", computations["a"])  # "b" is now the least recently used
+    await cache.get_or_compute("c", computations["c"])
+    await cache.get_or_compute("a", computations["a"])
+    await cache.get_or_compute("b", computations["b"])
+    assert (computations["a"].calls, computations["b"].calls) == (1, 2)
+    assert cache.stats["evictions"] == 2
+
+
+async def test_failures_are_not_cached():
+    cache, attempts = PredictionCache(), []
+
+    async def flaky() -> float:
+        attempts.append(None)
+        if len(attempts) == 1:
+            raise ValueError("Not enough data to perform prediction")
+        return 7.0
+
+    with pytest.raises(ValueError):
+        await cache.get_or_compute("key", flaky)
+    assert await cache.get_or_compute("key", flaky) == 7.0
+    assert len(attempts) == 2
+
+
+async def test_a_cancelled_caller_does_not_cancel_the_others():
+    cache, compute = PredictionCache(), Computation(3.0)
+    leaving = asyncio.create_task(cache.get_or_compute("key", compute))
+    staying = asyncio.create_task(cache.get_or_compute("key", compute))
+    await asyncio.sleep(0)
+    leaving.cancel()
+    await asyncio.sleep(0)
+    compute.release.set()
+    assert await staying == 3.0
+    assert leaving.cancelled()
+    assert cache.snapshot()["entries"] == 1
+
+
+def test_keys_change_with_each_tick(in_process_models):
+    before = _cache_key("CACHE1", "arima", "mongo")
+    utils.record_tick("CACHE1", 100.0, "test")
+    assert _cache_key("CACHE1", "arima", "mongo") != before
+    assert _cache_key("CACHE1", "arima", "mongo") != _cache_key("CACHE1", "arima", "sqlalchemy")
+
+
+async def test_concurrent_forecasts_read_the_history_once(repository, in_process_models, monkeypatch):
+    await repository.insert_ticks([("CACHE2", 1_700_000_000.0 + i, 100.0 + (i % 7) * 0.3) for i in range(60)])
+    reads = []
+    recent_prices = repository.recent_prices
+
+    async def counted(symbol, limit=100):
+        reads.append(symbol)
+        return await recent_prices(symbol, limit)
+
+    monkeypatch.setattr(repository, "recent_prices", counted)
+    forecasts = await asyncio.gather(*(prediction_service.forecast_prices_arima("CACHE2") for _ in range(5)))
+    assert len(set(forecasts)) == 1
+    assert reads == ["CACHE2"]
+    assert prediction_service.prediction_cache.stats["coalesced"] == 4
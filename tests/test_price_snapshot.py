@@ -0,0 +1,102 @@
+# trading_platform_backend/tests/test_price_snapshot.py
+
+# Memory-mapped price journal: warm restarts, shared slots and stale restored prices
+
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app import utils
+from app.schemas import OrderCreate
+from app.services import trading_service
+from app.services.admission import AdmissionControl
+from app.services.price_snapshot import PriceSnapshot
+
+pytestmark = pytest.mark.anyio
+
+
+def test_ticks_survive_a_restart(tmp_path):
+    journal = PriceSnapshot(tmp_path / "snapshot.bin", slots=4, ticks=4)
+    for seq in range(1, 7):  # Wraps the ring of four ticks
+        journal.record("BTC", seq, 1000.0 + seq, 100.0 + seq)
+    journal.record("ETH", 1, 2000.0, 50.0)
+    journal.close()
+
+    restarted = PriceSnapshot(tmp_path / "snapshot.bin", slots=4, ticks=4)
+    entries = restarted.load()
+    assert entries["BTC"] == (6, 1006.0, 106.0, [(seq, 1000.0 + seq, 100.0 + seq) for seq in range(3, 7)])
+    assert entries["ETH"] == (1, 2000.0, 50.0, [(1, 2000.0, 50.0)])
+    assert restarted.restored == {"BTC": 1006.0, "ETH": 2000.0}
+    assert restarted.stats["restored"] == 2
+    restarted.close()
+
+
+def test_another_layout_starts_an_empty_journal(tmp_path):
+    journal = PriceSnapshot(tmp_path / "snapshot.bin", slots=4, ticks=4)
+    journal.record("BTC", 1, 1000.0, 100.0)
+    journal.close()
+
+    resized = PriceSnapshot(tmp_path / "snapshot.bin", slots=4, ticks=8)
+    assert resized.load() == {}
+    resized.close()
+
+
+def test_processes_sharing_the_file_claim_distinct_slots(tmp_path):
+    first = PriceSnapshot(tmp_path / "snapshot.bin", slots=2, ticks=4)
+    second = PriceSnapshot(tmp_path / "snapshot.bin", slots=2, ticks=4)
+    first.record("BTC", 1, 1000.0, 100.0)
+    second.record("ETH", 1, 1000.0, 50.0)  # Sees the slot claimed by `first`
+    second.record("BTC", 2, 1001.0, 101.0)
+    first.record("LTC", 1, 1000.0, 20.0)  # No slot left
+    assert first.stats["full"] == 1
+
+    entries = PriceSnapshot(tmp_path / "snapshot.bin", slots=2, ticks=4).load()
+    assert {symbol: entry[2] for symbol, entry in entries.items()} == {"BTC": 101.0, "ETH": 50.0}
+    first.close()
+    second.close()
+
+
+def test_restored_prices_go_stale_until_a_live_tick(tmp_path):
+    journal = PriceSnapshot(tmp_path / "snapshot.bin", max_age=5.0)
+    journal.record("BTC", 1, 1000.0, 100.0)
+    journal.load()
+    assert journal.age("BTC", now=1004.0) == 4.0
+    assert not journal.is_stale("BTC", now=1004.0)
+    assert journal.is_stale("BTC", now=1006.0)
+    assert journal.staleness()["BTC"]["stale"]
+
+    journal.record("BTC", 2, 1007.0, 101.0)
+    assert journal.age("BTC") is None and not journal.is_stale("BTC", now=2000.0)
+    assert journal.staleness() == {}
+    journal.close()
+
+
+def test_live_state_is_seeded_from_the_journal(scratch_price_snapshot):
+    for price in (10.0, 11.0, 12.0):
+        utils.record_tick("SNAP1", price, "test")
+    scratch_price_snapshot.close()
+    del utils.latest_prices["SNAP1"], utils.tick_versions["SNAP1"], utils.recent_ticks["SNAP1"]
+
+    assert utils.restore_price_snapshot() >= 1
+    assert (utils.latest_prices["SNAP1"], utils.tick_versions["SNAP1"]) == (12.0, 3)
+    assert [tick[2] for tick in utils.recent_ticks["SNAP1"]] == [10.0, 11.0, 12.0]
+    assert "SNAP1" in scratch_price_snapshot.restored
+
+    utils.record_tick("SNAP1", 13.0, "test")
+    assert utils.tick_versions["SNAP1"] == 4 and "SNAP1" not in scratch_price_snapshot.restored
+
+
+async def test_orders_are_refused_on_a_stale_restored_price(repository, scratch_price_snapshot, monkeypatch, tmp_path):
+    monkeypatch.setattr(trading_service, "admission_control", AdmissionControl(tmp_path / "admission"))
+    user = await repository.create_user("snap_user", "snap@example.com", "x", balance=1000.0)
+    utils.record_tick("ETH", 100.0, "test")
+    scratch_price_snapshot.restored["ETH"] = time.time() - scratch_price_snapshot.max_age - 1.0
+
+    rejections = trading_service.order_rejections._values.get(("stale_price",), 0.0)
+    order = OrderCreate(symbol="ETH", amount=10.0, prediction="rise", trade_time=30)
+    with pytest.raises(HTTPException) as rejected:
+        await trading_service.place_order_with_real_time_price(order, user.id)
+    assert rejected.value.status_code == 404
+    assert trading_service.order_rejections._values[("stale_price",)] == rejections + 1
+    assert (await repository.get_user(user.id)).balance == 1000.0
@@ -0,0 +1,79 @@
+# trading_platform_backend/tests/test_read_models.py
+
+# Projected listings of /users/orders: filters, row shapes and cursors
+
+from datetime import date, datetime
+
+import orjson
+import pytest
+from bson import ObjectId
+
+from app.models import MongoOrder
+from app.routes.trading import get_users_with_orders
+from app.services.pagination import NEXT_CURSOR_HEADER
+
+pytestmark = pytest.mark.anyio
+
+
+async def users_with_orders(**params):
+    query = dict(page=1, limit=10, sort_by=None, sort_order="asc", status=None, search=None, start_date=None,
+                 end_date=None, order_status=None, min_balance=None, max_balance=None, cursor=None, orders_limit=20)
+    response = await get_users_with_orders(**{**query, **params})
+    return orjson.loads(response.body), response.headers
+
+
+async def insert_order(user_id: str, start_time: datetime, status: str = "pending"):
+    await MongoOrder.get_motor_collection().insert_one({
+        "user_id": ObjectId(user_id), "symbol": "BTC", "amount": 10.0, "prediction": "rise", "trade_time": 30,
+        "start_time": start_time, "locked_price": 1.0, "status": status,
+    })
+
+
+async def test_rows_carry_only_the_listed_fields(mongo_repository):
+    user = await mongo_repository.create_user("alice", "alice@example.com", "secret", balance=50.0)
+    await insert_order(user.id, datetime(2024, 1, 2, 12))
+
+    [row], _ = await users_with_orders()
+    assert set(row) == {"username", "email", "balance", "orders", "orders_next_cursor"}
+    assert set(row["orders"][0]) == {
+        "order_id", "symbol", "amount", "prediction", "trade_time", "locked_price", "status"
+    }
+    assert row["orders_next_cursor"] is None
+
+
+async def test_date_range_includes_the_whole_end_date(mongo_repository):
+    user = await mongo_repository.create_user("alice", "alice@example.com", "x")
+    for start_time in (datetime(2024, 1, 1, 23, 59), datetime(2024, 1, 2), datetime(2024, 1, 2, 23, 59, 59),
+                       datetime(2024, 1, 3)):
+        await insert_order(user.id, start_time)
+
+    [row], _ = await users_with_orders(start_date=date(2024, 1, 2), end_date=date(2024, 1, 2))
+    assert len(row["orders"]) == 2
+
+
+async def test_order_filters_and_balance_range(mongo_repository):
+    alice = await mongo_repository.create_user("alice", "alice@example.com", "x", balance=50.0)
+    await mongo_repository.create_user("bob", "bob@example.com", "x", balance=500.0)
+    await insert_order(alice.id, datetime(2024, 1, 1), "win")
+    await insert_order(alice.id, datetime(2024, 1, 2), "lose")
+
+    rows, _ = await users_with_orders(max_balance=100.0, order_status="win")
+    assert [row["username"] for row in rows] == ["alice"]
+    assert [order["status"] for order in rows[0]["orders"]] == ["win"]
+
+
+async def test_cursors_page_users_and_their_orders(mongo_repository):
+    for name in ("alice", "bob", "carol"):
+        user = await mongo_repository.create_user(name, f"{name}@example.com", "x")
+        for day in (1, 2, 3):
+            await insert_order(user.id, datetime(2024, 1, day))
+
+    names, cursor = [], None
+    while True:
+        rows, headers = await users_with_orders(limit=2, cursor=cursor, orders_limit=2)
+        names += [row["username"] for row in rows]
+        assert all(row["orders_next_cursor"] for row in rows)  # A third order remains per user
+        cursor = headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+    assert names == ["alice", "bob", "carol"]
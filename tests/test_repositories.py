@@ -0,0 +1,166 @@
+# trading_platform_backend/tests/test_repositories.py
+
+# Behaviour shared by every storage repository
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.models import MongoOrder, MongoUser
+from app.services import repository as repository_module
+from app.services.repository import InMemoryRepository, OrderRecord, get_repository, use_repository
+
+pytestmark = pytest.mark.anyio
+
+
+async def funded_user(repository, balance=100.0):
+    return await repository.create_user("trader", "trader@example.com", "x", balance=balance)
+
+
+async def pending_order(repository, user, amount=10.0, symbol="BTC", prediction="rise"):
+    return await repository.insert_order(OrderRecord(user.id, symbol, amount, prediction, 30, 1.0))
+
+
+async def test_settle_order_credits_the_payout_once(any_repository):
+    user = await funded_user(any_repository)
+    order = await pending_order(any_repository, user)
+
+    settled = await any_repository.settle_order(order.id, "win", 10.2)
+    assert settled.status == "win" and settled.payout == 10.2
+    assert await any_repository.settle_order(order.id, "lose", 0) is None
+    assert (await any_repository.get_user(user.id)).balance == pytest.approx(110.2)
+    assert await any_repository.reconcile_payouts() == 0
+
+
+async def test_losing_settlement_leaves_the_balance(any_repository):
+    user = await funded_user(any_repository)
+    order = await pending_order(any_repository, user)
+
+    assert (await any_repository.settle_order(order.id, "lose", 0)).status == "lose"
+    assert (await any_repository.get_user(user.id)).balance == pytest.approx(100.0)
+
+
+async def test_interrupted_mongo_credit_is_reconciled_exactly_once(mongo_repository, monkeypatch):
+    user = await funded_user(mongo_repository)
+    order = await pending_order(mongo_repository, user)
+    users = MongoUser.get_motor_collection()
+    update_one = type(users).update_one
+
+    async def crash_after_increment(collection, query, update, *args, **kwargs):
+        result = await update_one(collection, query, update, *args, **kwargs)
+        if "$inc" in update:
+            raise ConnectionError("connection lost after the balance update")
+        return result
+
+    with monkeypatch.context() as patched:
+        patched.setattr(type(users), "update_one", crash_after_increment)
+        settled = await mongo_repository.settle_order(order.id, "win", 10.2)
+
+    assert settled.status == "win"
+    assert (await MongoOrder.get_motor_collection().find_one({"_id": ObjectId(order.id)}))["credited"] is False
+    assert (await mongo_repository.get_user(user.id)).balance == pytest.approx(110.2)
+
+    assert await mongo_repository.reconcile_payouts() == 1  # Already incremented: only completes the bookkeeping
+    assert await mongo_repository.reconcile_payouts() == 0
+    assert (await mongo_repository.get_user(user.id)).balance == pytest.approx(110.2)
+    assert (await users.find_one({"_id": ObjectId(user.id)}))["pending_credits"] == []
+
+
+async def test_mongo_credit_never_applied_is_reconciled(mongo_repository, monkeypatch):
+    user = await funded_user(mongo_repository)
+    order = await pending_order(mongo_repository, user)
+
+    async def unreachable(order_document):
+        raise ConnectionError("connection lost before the balance update")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(mongo_repository, "_credit", unreachable)
+        await mongo_repository.settle_order(order.id, "win", 10.2)
+    assert (await mongo_repository.get_user(user.id)).balance == pytest.approx(100.0)
+
+    assert await mongo_repository.reconcile_payouts() == 1
+    assert (await mongo_repository.get_user(user.id)).balance == pytest.approx(110.2)
+
+
+async def test_users(any_repository):
+    user = await funded_user(any_repository)
+    assert await any_repository.get_user(user.id) == user
+    assert await any_repository.find_user_by_username("trader") == user
+    assert await any_repository.find_user_by_username("nobody") is None
+    assert await any_repository.get_user("not-an-id") is None
+    assert await any_repository.get_users([user.id, str(ObjectId()), "42"]) == {user.id: user}
+    with pytest.raises(Exception):
+        await any_repository.create_user("trader", "other@example.com", "x")
+
+
+async def test_balance_changes_are_conditional_and_atomic(any_repository):
+    user = await funded_user(any_repository, balance=100.0)
+    assert (await any_repository.adjust_balance(user.id, 25.0)).balance == pytest.approx(125.0)
+    assert await any_repository.adjust_balance(user.id, -200.0, min_balance=200.0) is None
+    assert await any_repository.adjust_balance(str(ObjectId()), 5.0) is None
+
+    # Concurrent debits of 30 each: only as many as the balance covers may succeed
+    results = await asyncio.gather(*(any_repository.adjust_balance(user.id, -30.0, min_balance=30.0) for _ in range(6)))
+    assert sum(result is not None for result in results) == 4
+    assert (await any_repository.get_user(user.id)).balance == pytest.approx(5.0)
+
+
+async def test_prices(any_repository):
+    assert await any_repository.get_price("BTC") is None
+    await any_repository.upsert_price("BTC", 1.0)
+    await any_repository.upsert_price("ETH", 2.0)
+    await any_repository.upsert_price("BTC", 3.0)
+    assert await any_repository.get_price("BTC") == 3.0
+    assert await any_repository.list_prices() == {"BTC": 3.0, "ETH": 2.0}
+
+
+async def test_ticks(any_repository):
+    start = datetime(2024, 1, 1).timestamp() - datetime(1970, 1, 1).timestamp()  # Naive UTC as Unix seconds
+    await any_repository.insert_ticks([("BTC", start + 2, 102.0), ("BTC", start, 100.0), ("ETH", start, 9.0)])
+    await any_repository.insert_ticks([("BTC", start + 1, 101.0), ("BTC", start + 3.5, 103.0)])
+
+    assert await any_repository.tick_symbols() == ["BTC", "ETH"]
+    assert await any_repository.recent_prices("BTC", limit=3) == [101.0, 102.0, 103.0]
+    assert await any_repository.recent_prices("XRP") == []
+    timestamps, prices = await any_repository.load_ticks(
+        "BTC", datetime(2024, 1, 1, 0, 0, 1), datetime(2024, 1, 1, 0, 0, 3, 500000)
+    )
+    assert timestamps.dtype == prices.dtype == "float64"
+    assert timestamps.tolist() == pytest.approx([start + 1, start + 2])
+    assert prices.tolist() == [101.0, 102.0]
+
+
+async def test_order_queries(any_repository):
+    user = await funded_user(any_repository)
+    now = datetime.utcnow()
+    overdue = await any_repository.insert_order(
+        OrderRecord(user.id, "BTC", 10.0, "rise", 30, 1.0, start_time=now - timedelta(hours=2)))
+    await pending_order(any_repository, user, amount=20.0, prediction="fall")
+    await pending_order(any_repository, user, amount=5.0, symbol="ETH")
+    settled = await pending_order(any_repository, user, amount=40.0)
+    await any_repository.settle_order(settled.id, "lose", 0)
+    old = await any_repository.insert_order(
+        OrderRecord(user.id, "BTC", 50.0, "rise", 30, 1.0, start_time=now - timedelta(hours=2)))
+    await any_repository.settle_order(old.id, "win", 51.0)
+
+    fetched = await any_repository.get_order(overdue.id)
+    assert (fetched.user_id, fetched.amount, fetched.status) == (user.id, 10.0, "pending")
+    assert await any_repository.count_pending_orders(user.id) == 3
+    active = await any_repository.active_orders(now - timedelta(hours=1))
+    assert sorted(order.amount for order in active) == [5.0, 10.0, 20.0, 40.0]
+    assert sorted(await any_repository.pending_exposure()) == [
+        ("BTC", "fall", 20.0, 1), ("BTC", "rise", 10.0, 1), ("ETH", "rise", 5.0, 1)
+    ]
+
+
+def test_repositories_are_created_once_per_backend(monkeypatch):
+    monkeypatch.setattr(repository_module, "_repositories", {})
+    memory = get_repository("memory")
+    assert get_repository("memory") is memory
+    seeded = InMemoryRepository()
+    use_repository(seeded, "memory")
+    assert get_repository("memory") is seeded
+    with pytest.raises(ValueError, match="Unknown storage backend"):
+        get_repository("redis")
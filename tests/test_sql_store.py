@@ -0,0 +1,97 @@
+# trading_platform_backend/tests/test_sql_store.py
+
+# Async SQLAlchemy backend: driver and pool selection, bulk writes and history queries
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import inspect, select
+
+from app.database import _engine_options, async_database_url
+from app.models import Order, TradingPair, User
+from app.services import sql_store
+
+pytestmark = pytest.mark.anyio
+
+START = datetime(2024, 1, 1)
+
+
+@pytest.fixture
+async def session(sql_repository):
+    async with sql_repository._sessions() as session:
+        session.add(User(id=1, username="alice", email="alice@example.com", hashed_password="x"))
+        await session.commit()
+        yield session
+
+
+def order_row(start_time: datetime, **values) -> dict:
+    return {"user_id": 1, "symbol": "BTC", "amount": 10.0, "prediction": "rise", "trade_time": 30,
+            "start_time": start_time, "locked_price": 1.0, "status": "pending", **values}
+
+
+@pytest.mark.parametrize("url, driver", [
+    ("sqlite:///./trading.db", "sqlite+aiosqlite"),
+    ("postgresql://user@db/trading", "postgresql+asyncpg"),
+    ("postgresql+asyncpg://user@db/trading", "postgresql+asyncpg"),
+])
+def test_sync_urls_get_an_async_driver(url, driver):
+    assert async_database_url(url).drivername == driver
+
+
+def test_pool_options_per_database():
+    assert "poolclass" in _engine_options(async_database_url("sqlite:///:memory:"))
+    file_options = _engine_options(async_database_url("sqlite:///./trading.db"))
+    assert file_options["poolclass"].__name__ == "AsyncAdaptedQueuePool" and "pool_pre_ping" not in file_options
+    assert _engine_options(async_database_url("postgresql://user@db/trading"))["pool_pre_ping"]
+
+
+async def test_trading_pairs_are_upserted_in_one_statement(session):
+    assert await sql_store.upsert_trading_pairs(session, {}) == 0
+    await sql_store.upsert_trading_pairs(session, {"BTC": 1.0, "ETH": 2.0})
+    await sql_store.upsert_trading_pairs(session, {"BTC": 3.0})
+    await session.commit()
+    pairs = dict((await session.execute(select(TradingPair.symbol, TradingPair.price))).all())
+    assert pairs == {"BTC": 3.0, "ETH": 2.0}
+
+
+async def test_order_upserts_only_change_the_settlement(session):
+    await sql_store.bulk_insert_orders(session, [order_row(START), order_row(START + timedelta(seconds=1))])
+    await session.commit()
+    first, second = (await session.execute(select(Order).order_by(Order.id))).scalars()
+
+    await sql_store.upsert_orders(session, [
+        order_row(START, id=first.id, status="win", payout=10.2, amount=999.0),
+        order_row(START + timedelta(seconds=2)),
+    ])
+    await session.commit()
+    session.expire_all()
+    orders = (await session.execute(select(Order).order_by(Order.id))).scalars().all()
+    assert [(order.status, order.payout, order.amount) for order in orders] == [
+        ("win", 10.2, 10.0), ("pending", None, 10.0), ("pending", None, 10.0)
+    ]
+    history = await sql_store.order_history(session, 1, limit=2)
+    assert [order.start_time for order in history] == [START + timedelta(seconds=2), START + timedelta(seconds=1)]
+
+
+async def test_tick_history_is_time_ordered(session):
+    ticks = [("BTC", START + timedelta(seconds=s), float(s)) for s in (3, 1, 2, 2)] + [("ETH", START, 9.0)]
+    assert await sql_store.bulk_insert_ticks(session, ticks) == 5
+    await session.commit()
+
+    assert await sql_store.recent_prices(session, "BTC", limit=3) == [2.0, 2.0, 3.0]
+    assert await sql_store.recent_prices(session, "BTC") == [1.0, 2.0, 2.0, 3.0]
+    history = await sql_store.price_history(session, "BTC", START + timedelta(seconds=2), START + timedelta(seconds=3))
+    assert history == [(START + timedelta(seconds=2), 2.0), (START + timedelta(seconds=2), 2.0)]
+
+
+async def test_query_shapes_have_indexes(sql_repository):
+    async with sql_repository._sessions() as session:
+        indexes = await session.run_sync(
+            lambda sync_session: {
+                table: {index["name"]: index["column_names"] for index in inspect(sync_session.bind).get_indexes(table)}
+                for table in ("orders", "price_ticks")
+            }
+        )
+    assert indexes["orders"]["ix_orders_user_status"] == ["user_id", "status"]
+    assert indexes["orders"]["ix_orders_status_start_time"] == ["status", "start_time"]
+    assert indexes["price_ticks"]["ix_price_ticks_symbol_timestamp"] == ["symbol", "timestamp", "id"]
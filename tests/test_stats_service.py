@@ -0,0 +1,74 @@
+# trading_platform_backend/tests/test_stats_service.py
+
+# Materialized per-user order statistics kept on placement and settlement
+
+import pytest
+
+from app.services import repository as repository_module
+from app.services import stats_service
+from app.services.repository import OrderRecord, use_repository
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def installed(any_repository, monkeypatch):
+    monkeypatch.setattr(repository_module, "_repositories", {})
+    use_repository(any_repository)
+    return any_repository
+
+
+async def trade(repository, user, status, amount=10.0, payout=0.0):
+    order = await repository.insert_order(OrderRecord(user.id, "BTC", amount, "rise", 30, 1.0))
+    await stats_service.record_order_placed(order, user)
+    settled = await repository.settle_order(order.id, status, payout)
+    await stats_service.record_order_settled(settled, user)
+
+
+async def test_counters_follow_placement_and_settlement(installed):
+    alice = await installed.create_user("alice", "alice@example.com", "x", balance=100.0)
+    bob = await installed.create_user("bob", "bob@example.com", "x", balance=100.0)
+    await trade(installed, alice, "win", payout=10.2)
+    await trade(installed, alice, "lose", amount=20.0)
+    await trade(installed, bob, "lose")
+
+    stats = {row["username"]: row for row in await installed.user_stats()}
+    assert stats["alice"]["user_id"] == alice.id
+    assert (stats["alice"]["orders"], stats["alice"]["wins"], stats["alice"]["losses"]) == (2, 1, 1)
+    assert stats["alice"]["total_staked"] == pytest.approx(30.0)
+    assert stats["alice"]["total_paid_out"] == pytest.approx(10.2)
+    assert (stats["bob"]["orders"], stats["bob"]["wins"], stats["bob"]["losses"]) == (1, 0, 1)
+
+
+async def test_pending_orders_count_without_an_outcome(repository):
+    user = await repository.create_user("alice", "alice@example.com", "x", balance=100.0)
+    order = await repository.insert_order(OrderRecord(user.id, "BTC", 10.0, "rise", 30, 1.0))
+    await stats_service.record_order_placed(order, user)
+
+    [stats] = await repository.user_stats()
+    assert (stats["orders"], stats["wins"], stats["losses"]) == (1, 0, 0)
+
+
+async def test_storage_errors_never_fail_the_order(repository, monkeypatch):
+    user = await repository.create_user("alice", "alice@example.com", "x", balance=100.0)
+    order = await repository.insert_order(OrderRecord(user.id, "BTC", 10.0, "rise", 30, 1.0))
+
+    async def broken(user, increments):
+        raise RuntimeError("stats store down")
+
+    monkeypatch.setattr(repository, "increment_user_stats", broken)
+    await stats_service.record_order_placed(order, user)  # Logged, not raised
+
+
+async def test_query_user_stats_filters_on_wins_and_losses(mongo_repository, monkeypatch):
+    monkeypatch.setattr(repository_module, "_repositories", {})
+    use_repository(mongo_repository)
+    alice = await mongo_repository.create_user("alice", "alice@example.com", "x", balance=100.0)
+    bob = await mongo_repository.create_user("bob", "bob@example.com", "x", balance=100.0)
+    await trade(mongo_repository, alice, "win", payout=10.2)
+    await trade(mongo_repository, alice, "win", payout=10.2)
+    await trade(mongo_repository, bob, "lose")
+
+    assert [stats.username for stats in await stats_service.query_user_stats(min_wins=1)] == ["alice"]
+    assert [stats.username for stats in await stats_service.query_user_stats(max_wins=0, min_losses=1)] == ["bob"]
+    assert len(await stats_service.query_user_stats()) == 2
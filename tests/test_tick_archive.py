@@ -0,0 +1,83 @@
+# trading_platform_backend/tests/test_tick_archive.py
+
+# Parquet tick archive: daily compaction, partition layout and time-range reads
+
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from app.services.tick_archive import TickArchive
+
+pytest.importorskip("pyarrow")
+pytestmark = pytest.mark.anyio
+
+DAY = date(2024, 3, 1)
+DAY_START = datetime(2024, 3, 1).replace(tzinfo=timezone.utc).timestamp()
+
+
+async def seed(repository, symbol: str, days: int = 3):
+    ticks = [(symbol, DAY_START + day * 86400 + hour * 3600 + 0.25, 100.0 + day * 24 + hour)
+             for day in range(days) for hour in range(24)]
+    await repository.insert_ticks(ticks)
+
+
+async def test_completed_days_are_compacted_once(repository, tmp_path):
+    await seed(repository, "EUR/USD")
+    archive = TickArchive(tmp_path)
+    today = DAY + timedelta(days=2)  # The third day is still open
+    assert await archive.compact(repository, today=today) == 2
+    assert await archive.compact(repository, today=today) == 0
+    assert archive.stats == {"files_written": 2, "ticks_archived": 48, "failed_runs": 0}
+
+    assert archive.symbols() == ["EUR/USD"]
+    assert archive.days("EUR/USD") == [DAY, DAY + timedelta(days=1)]
+    assert archive.path("EUR/USD", DAY) == tmp_path / "symbol=EUR%2FUSD" / "date=2024-03-01" / "ticks.parquet"
+    assert archive.path("EUR/USD", DAY).exists()
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+async def test_archived_ticks_match_the_repository(repository, tmp_path):
+    await seed(repository, "ARCH1")
+    archive = TickArchive(tmp_path)
+    await archive.compact(repository, today=DAY + timedelta(days=3))
+
+    timestamps, prices = archive.load("ARCH1")
+    expected_timestamps, expected_prices = await repository.load_ticks("ARCH1")
+    assert timestamps.dtype == prices.dtype == np.float64
+    assert np.array_equal(timestamps, expected_timestamps) and np.array_equal(prices, expected_prices)
+
+    start, end = datetime(2024, 3, 1, 22), datetime(2024, 3, 2, 2)
+    timestamps, prices = archive.load("ARCH1", start, end)
+    expected_timestamps, expected_prices = await repository.load_ticks("ARCH1", start, end)
+    assert prices.tolist() == expected_prices.tolist() == [122.0, 123.0, 124.0, 125.0]
+    assert np.array_equal(timestamps, expected_timestamps)
+
+    frame = archive.load_frame("ARCH1", start, end)
+    assert list(frame.columns) == ["timestamp", "price"] and len(frame) == 4
+
+
+def test_reads_outside_the_archive_are_empty(tmp_path):
+    archive = TickArchive(tmp_path / "missing")
+    assert archive.symbols() == [] and archive.days("ARCH2") == []
+    timestamps, prices = archive.load("ARCH2", datetime(2024, 1, 1), datetime(2024, 1, 2))
+    assert len(timestamps) == len(prices) == 0
+
+
+def test_files_are_cut_into_row_groups(tmp_path, monkeypatch):
+    import pyarrow.parquet as pq
+
+    from app.services import tick_archive
+
+    monkeypatch.setattr(tick_archive, "ARCHIVE_ROW_GROUP_SIZE", 100)
+    archive = TickArchive(tmp_path)
+    timestamps = DAY_START + np.arange(1000, dtype=np.float64)
+    path = archive.write_day("ARCH3", DAY, timestamps, np.arange(1000, dtype=np.float64))
+    metadata = pq.ParquetFile(path).metadata
+    assert metadata.num_row_groups == 10
+    statistics = metadata.row_group(3).column(0).statistics
+    assert statistics.has_min_max
+
+    start = datetime.fromtimestamp(DAY_START + 450, tz=timezone.utc).replace(tzinfo=None)
+    _, prices = archive.load("ARCH3", start, start + timedelta(seconds=3))
+    assert prices.tolist() == [450.0, 451.0, 452.0]
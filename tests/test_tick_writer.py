@@ -0,0 +1,80 @@
+# trading_platform_backend/tests/test_tick_writer.py
+
+# Buffered tick writer: batch flushes, requeue after a failed write and overflow accounting
+
+import asyncio
+
+import pytest
+
+from app.services.tick_store import TickWriter
+
+pytestmark = pytest.mark.anyio
+
+
+class Outage:
+    """
+    Makes the repository's tick inserts fail until the outage ends.
+    """
+
+    def __init__(self, repository, monkeypatch):
+        self.active = True
+        insert_ticks = repository.insert_ticks
+
+        async def failing(ticks):
+            if self.active:
+                raise ConnectionError("database unavailable")
+            await insert_ticks(ticks)
+
+        monkeypatch.setattr(repository, "insert_ticks", failing)
+
+
+async def test_flush_writes_one_batch(repository):
+    writer = TickWriter()
+    assert await writer.flush() == 0
+    for i in range(3):
+        writer.add("TW1", 1_700_000_000.0 + i, 100.0 + i)
+    assert await writer.flush() == 3
+    assert (writer.pending, writer.stats["written"]) == (0, 3)
+    assert await repository.recent_prices("TW1") == [100.0, 101.0, 102.0]
+
+
+async def test_failed_batches_are_requeued_in_order(repository, monkeypatch):
+    outage = Outage(repository, monkeypatch)
+    writer = TickWriter()
+    writer.add("TW2", 1.0, 1.0)
+    writer.add("TW2", 2.0, 2.0)
+    assert await writer.flush() == 0
+    writer.add("TW2", 3.0, 3.0)  # Arrives during the outage, after the requeued batch
+    assert writer.pending == 3 and writer.stats["failed_flushes"] == 1
+
+    outage.active = False
+    assert await writer.flush() == 3
+    assert await repository.recent_prices("TW2") == [1.0, 2.0, 3.0]
+    assert writer.stats == {"written": 3, "dropped": 0, "failed_flushes": 1}
+
+
+async def test_overflow_drops_the_oldest_ticks(repository, monkeypatch):
+    outage = Outage(repository, monkeypatch)
+    writer = TickWriter(maxlen=3)
+    for i in range(4):
+        writer.add("TW3", float(i), float(i))
+    assert writer.stats["dropped"] == 1
+    await writer.flush()
+    writer.add("TW3", 4.0, 4.0)
+    writer.add("TW3", 5.0, 5.0)
+    assert writer.stats["dropped"] == 3
+
+    outage.active = False
+    await writer.flush()
+    assert await repository.recent_prices("TW3") == [3.0, 4.0, 5.0]
+
+
+async def test_pending_ticks_are_flushed_on_cancellation(repository):
+    writer = TickWriter()
+    job = asyncio.create_task(writer.flush_periodically(interval=60))
+    await asyncio.sleep(0)
+    writer.add("TW4", 1.0, 7.0)
+    job.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await job
+    assert await repository.recent_prices("TW4") == [7.0]